@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+异步数据通路基准测试
+
+在本地 TOS 模拟服务上注入固定延迟，以不同并发度通过 call_tool 执行大量小对象的
+tos_get_object，分别走 SDK 通路（TosClientV2 + 工作线程池）和异步通路
+（TOS_ASYNC_HTTP，httpx 直接在事件循环上发送），报告吞吐量、延迟分位数以及进程
+线程数的峰值。模拟服务运行在单独的子进程中，不与被测客户端争用 GIL，线程数也只统计
+客户端进程。
+
+模拟服务只支持 HTTP/1.1，因此这里比较的是线程池与事件循环的调度开销；对真实
+TOS 访问域名且安装了 h2 时，异步通路还会在少量连接上多路复用。
+
+用法::
+
+    python benchmarks/bench_async.py --requests 2000 --concurrency 64,256,1024
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("TOS_ACCESS_KEY", "fake-ak")
+os.environ.setdefault("TOS_SECRET_KEY", "fake-sk")
+
+from fake_tos import FAKE_DOMAIN, FAKE_REGION, FakeTosServer  # noqa: E402
+
+os.environ.setdefault("TOS_REGION", FAKE_REGION)
+
+
+def _serve(latency: float, size: int, ready, stop):
+    with FakeTosServer(latency=latency) as fake:
+        fake.store.put("bench", "object.json", b"x" * size, "application/json")
+        ready.put(fake.address)
+        stop.wait()
+
+
+async def _load(call_tool, concurrency: int, total: int):
+    args = {"bucket_name": "bench", "object_key": "object.json"}
+    latencies = []
+    peak_threads = threading.active_count()
+    queue = iter(range(total))
+
+    async def _worker():
+        nonlocal peak_threads
+        for _ in queue:
+            start = time.perf_counter()
+            result = await call_tool("tos_get_object", args)
+            latencies.append(time.perf_counter() - start)
+            peak_threads = max(peak_threads, threading.active_count())
+            if "失败" in result[0].text:
+                raise RuntimeError(result[0].text)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies), peak_threads
+
+
+async def _run(args, address):
+    from tos_mcp_server.async_client import AsyncTosClient
+    from tos_mcp_server.client import create_client, set_async_client, set_client
+    from tos_mcp_server.config import get_config
+    from tos_mcp_server.server import call_tool
+
+    logging.getLogger("tos_mcp_server").setLevel(logging.WARNING)
+    config = get_config()
+    host, port = address
+    fake_config = dataclasses.replace(config, endpoint=f"http://{FAKE_DOMAIN}", region=FAKE_REGION,
+                                      proxy_host=host, proxy_port=port, max_retry_count=0,
+                                      max_connections=max(args.concurrency))
+    set_client(create_client(fake_config))
+    set_async_client(AsyncTosClient(fake_config))
+
+    print(f"requests={args.requests} latency={args.latency:.3f}s size={args.size}B "
+          f"workers={config.max_workers}")
+    print(f"  {'path':<5} {'conc':>5} {'req/s':>9} {'p50':>9} {'p99':>9} {'threads':>8}")
+    for concurrency in args.concurrency:
+        for path in ("async", "sdk"):
+            config.async_http = path == "async"
+            await _load(call_tool, concurrency, concurrency)  # 预热连接
+            elapsed, latencies, threads = await _load(call_tool, concurrency, args.requests)
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            print(f"  {path:<5} {concurrency:>5} {args.requests / elapsed:>9.1f} {p50:>7.1f}ms "
+                  f"{p99:>7.1f}ms {threads:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="异步数据通路基准测试")
+    parser.add_argument("--requests", "-n", type=int, default=2000, help="每种配置的请求总数")
+    parser.add_argument("--concurrency", "-c", type=lambda v: [int(x) for x in v.split(",")],
+                        default=[64, 256], help="逗号分隔的并发度列表")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟服务注入的单请求延迟（秒）")
+    parser.add_argument("--size", type=int, default=1024, help="对象大小（字节）")
+    args = parser.parse_args()
+
+    ready, stop = multiprocessing.Queue(), multiprocessing.Event()
+    server = multiprocessing.Process(target=_serve, args=(args.latency, args.size, ready, stop), daemon=True)
+    server.start()
+    try:
+        asyncio.run(_run(args, ready.get()))
+    finally:
+        stop.set()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
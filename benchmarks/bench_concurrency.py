@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+并发 tos_get_object 基准测试
+
+在本地 TOS 模拟服务上注入固定延迟，分别串行和并发执行 N 次 tos_get_object，
+并发总耗时应接近单个最慢请求的耗时，而不是 N 倍。
+
+用法::
+
+    python benchmarks/bench_concurrency.py --requests 16 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("TOS_ACCESS_KEY", "fake-ak")
+os.environ.setdefault("TOS_SECRET_KEY", "fake-sk")
+
+from fake_tos import FAKE_REGION, FakeTosServer  # noqa: E402
+
+os.environ.setdefault("TOS_REGION", FAKE_REGION)
+
+
+async def _run(n: int, latency: float, size: int):
+    from tos_mcp_server.client import set_client
+    from tos_mcp_server.server import call_tool
+
+    with FakeTosServer(latency=latency) as fake:
+        fake.store.put("bench", "object.bin", os.urandom(size))
+        set_client(fake.make_client())
+        args = {"bucket_name": "bench", "object_key": "object.bin", "return_as_base64": True}
+
+        # 预热连接
+        await call_tool("tos_get_object", args)
+
+        start = time.perf_counter()
+        for _ in range(n):
+            await call_tool("tos_get_object", args)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*(call_tool("tos_get_object", args) for _ in range(n)))
+        concurrent = time.perf_counter() - start
+
+    print(f"requests={n} latency={latency:.3f}s size={size}B")
+    print(f"  serial:     {serial:.3f}s")
+    print(f"  concurrent: {concurrent:.3f}s  (speedup x{serial / concurrent:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并发 tos_get_object 基准测试")
+    parser.add_argument("--requests", "-n", type=int, default=16, help="请求数量")
+    parser.add_argument("--latency", type=float, default=0.2, help="模拟服务注入的单请求延迟（秒）")
+    parser.add_argument("--size", type=int, default=64 * 1024, help="对象大小（字节）")
+    args = parser.parse_args()
+    asyncio.run(_run(args.requests, args.latency, args.size))
+
+
+if __name__ == "__main__":
+    main()
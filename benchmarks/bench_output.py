@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+响应格式基准测试
+
+在本地 TOS 模拟服务上放入 N 个对象，以 pretty / compact / columnar 三种输出格式
+分别执行 tos_list_objects（单页 N 个键），报告响应字节数、序列化耗时以及整次工具
+调用的耗时（中位数）。
+
+用法::
+
+    python benchmarks/bench_output.py --keys 1000 --runs 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("TOS_ACCESS_KEY", "fake-ak")
+os.environ.setdefault("TOS_SECRET_KEY", "fake-sk")
+
+from fake_tos import FAKE_REGION, FakeTosServer  # noqa: E402
+
+os.environ.setdefault("TOS_REGION", FAKE_REGION)
+
+FORMATS = ("pretty", "compact", "columnar")
+
+
+async def _run(keys: int, runs: int):
+    from tos_mcp_server.client import set_client
+    from tos_mcp_server.output import columnar, dumps
+    from tos_mcp_server.server import call_tool
+
+    with FakeTosServer() as fake:
+        for i in range(keys):
+            fake.store.put("bench", f"logs/2024/01/{i:06d}.json", b"{}")
+        set_client(fake.make_client())
+        args = {"bucket_name": "bench", "max_keys": keys}
+        await call_tool("tos_list_objects", args)  # 预热
+
+        print(f"keys={keys} runs={runs}")
+        print(f"  {'format':<9} {'bytes':>9} {'ratio':>6} {'serialize':>10} {'call':>9}")
+        baseline = None
+        for fmt in FORMATS:
+            call_times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                result = await call_tool("tos_list_objects", dict(args, output_format=fmt))
+                call_times.append(time.perf_counter() - start)
+            text = result[0].text
+            size = len(text.encode("utf-8"))
+            baseline = baseline or size
+
+            # 单独测量序列化：从响应还原出结果字典后按相同格式重新输出
+            data = json.loads(text)
+            if fmt == "columnar":
+                columns = data["objects"]
+                data["objects"] = [dict(zip(columns, row)) for row in zip(*columns.values())]
+            serialize_times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                dumps(dict(data, objects=columnar(data["objects"])) if fmt == "columnar" else data, fmt)
+                serialize_times.append(time.perf_counter() - start)
+
+            print(f"  {fmt:<9} {size:>9} {size / baseline:>6.2f} "
+                  f"{statistics.median(serialize_times) * 1000:>8.2f}ms "
+                  f"{statistics.median(call_times) * 1000:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="响应格式基准测试")
+    parser.add_argument("--keys", "-k", type=int, default=1000, help="列举的对象数量")
+    parser.add_argument("--runs", "-n", type=int, default=20, help="每种格式的重复次数")
+    args = parser.parse_args()
+    asyncio.run(_run(args.keys, args.runs))
+
+
+if __name__ == "__main__":
+    main()
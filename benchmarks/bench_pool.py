@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+连接池大小负载基准测试
+
+在本地 TOS 模拟服务上同时注入请求延迟和建连延迟（模拟 TCP/TLS 握手），用不同的
+TOS_MAX_CONNECTIONS 创建客户端，以固定并发度通过 call_tool 执行 tos_get_object，
+报告吞吐量、延迟分位数以及模拟服务实际接受的连接数。连接池小于并发度时，超出的
+连接用完即被丢弃，每个请求都要重新建连。
+
+模拟服务与客户端运行在同一进程中，CPU 核数较少时吞吐量和 p50 主要受 CPU 限制，
+连接池的效果主要体现在建连次数和 p99 上。
+
+用法::
+
+    python benchmarks/bench_pool.py --concurrency 16 --requests 960 --pool-sizes 1,4,8,16,32
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("TOS_ACCESS_KEY", "fake-ak")
+os.environ.setdefault("TOS_SECRET_KEY", "fake-sk")
+
+from fake_tos import FAKE_DOMAIN, FAKE_REGION, FakeTosServer  # noqa: E402
+
+os.environ.setdefault("TOS_REGION", FAKE_REGION)
+
+
+async def _load(call_tool, concurrency: int, total: int):
+    args = {"bucket_name": "bench", "object_key": "object.bin", "return_as_base64": True}
+    latencies = []
+    queue = iter(range(total))
+
+    async def _worker():
+        for _ in queue:
+            start = time.perf_counter()
+            await call_tool("tos_get_object", args)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+async def _run(args):
+    os.environ["TOS_MAX_WORKERS"] = str(max(args.concurrency, 1))
+
+    from tos_mcp_server.client import create_client, set_client
+    from tos_mcp_server.config import TosConfig
+    from tos_mcp_server.server import call_tool
+
+    # 连接池小于并发度正是要测量的场景，屏蔽对应的告警
+    logging.getLogger("tos_mcp_server.client").setLevel(logging.ERROR)
+
+    with FakeTosServer(latency=args.latency, connect_latency=args.connect_latency) as fake:
+        fake.store.put("bench", "object.bin", os.urandom(args.size))
+        host, port = fake.address
+        base = dataclasses.replace(TosConfig.from_env(), endpoint=f"http://{FAKE_DOMAIN}", region=FAKE_REGION,
+                                   proxy_host=host, proxy_port=port, max_retry_count=0)
+
+        print(f"concurrency={args.concurrency} requests={args.requests} latency={args.latency:.3f}s "
+              f"connect_latency={args.connect_latency:.3f}s size={args.size}B")
+        print(f"  {'pool':>5} {'req/s':>9} {'p50':>9} {'p99':>9} {'connections':>12}")
+        for pool_size in args.pool_sizes:
+            set_client(create_client(dataclasses.replace(base, max_connections=pool_size)))
+            await _load(call_tool, args.concurrency, args.concurrency)  # 预热
+            before = fake.connection_count
+            elapsed, latencies = await _load(call_tool, args.concurrency, args.requests)
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            print(f"  {pool_size:>5} {args.requests / elapsed:>9.1f} {p50:>7.1f}ms {p99:>7.1f}ms "
+                  f"{fake.connection_count - before:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="连接池大小负载基准测试")
+    parser.add_argument("--concurrency", "-c", type=int, default=16, help="并发请求数")
+    parser.add_argument("--requests", "-n", type=int, default=960, help="每种连接池大小的请求总数")
+    parser.add_argument("--pool-sizes", type=lambda v: [int(x) for x in v.split(",")],
+                        default=[1, 4, 8, 16, 32], help="逗号分隔的连接池大小列表")
+    parser.add_argument("--latency", type=float, default=0.05, help="模拟服务注入的单请求延迟（秒）")
+    parser.add_argument("--connect-latency", type=float, default=0.1, help="模拟服务注入的建连延迟（秒）")
+    parser.add_argument("--size", type=int, default=16 * 1024, help="对象大小（字节）")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+启动耗时基准测试
+
+以 stdio 方式反复启动 MCP Server 子进程，测量从启动进程到收到 initialize 响应、
+tools/list 响应，以及第一次需要 TOS 客户端的工具调用（tos_presigned_url，本地签名，
+不访问网络）返回的耗时。配置加载、SDK 导入和客户端创建都被推迟到第一次工具调用，
+因此前两项不应包含 TOS SDK 的开销。
+
+用法::
+
+    python benchmarks/bench_startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+def _send(proc: subprocess.Popen, message: dict):
+    proc.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+    proc.stdin.flush()
+
+
+def _wait_response(proc: subprocess.Popen, request_id: int) -> dict:
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("服务进程意外退出")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def _run_once() -> dict:
+    env = dict(os.environ)
+    env.setdefault("TOS_ACCESS_KEY", "fake-ak")
+    env.setdefault("TOS_SECRET_KEY", "fake-sk")
+    env["PYTHONPATH"] = SRC_DIR + os.pathsep + env.get("PYTHONPATH", "")
+
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "tos_mcp_server"], env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        _send(proc, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "bench", "version": "0"}
+        }})
+        _wait_response(proc, 1)
+        initialize = time.perf_counter() - start
+        _send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+        _send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        _wait_response(proc, 2)
+        list_tools = time.perf_counter() - start
+
+        _send(proc, {"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": {
+            "name": "tos_presigned_url",
+            "arguments": {"bucket_name": "bench", "object_key": "object.bin"}
+        }})
+        _wait_response(proc, 3)
+        first_call = time.perf_counter() - start
+    finally:
+        proc.stdin.close()
+        proc.terminate()
+        proc.wait()
+    return {"initialize": initialize, "list_tools": list_tools, "first_call": first_call}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Server 启动耗时基准测试")
+    parser.add_argument("--runs", "-n", type=int, default=10, help="启动次数")
+    args = parser.parse_args()
+
+    _run_once()  # 预热文件系统缓存与字节码
+    results = [_run_once() for _ in range(args.runs)]
+
+    print(f"runs={args.runs}")
+    for name in ("initialize", "list_tools", "first_call"):
+        values = [r[name] * 1000 for r in results]
+        print(f"  {name:<11} median {statistics.median(values):7.1f}ms  min {min(values):7.1f}ms  max {max(values):7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
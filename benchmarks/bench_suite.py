@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+离线基准测试套件
+
+在进程内启动本地 TOS 模拟服务（可注入延迟与带宽），以给定并发度和对象大小通过
+call_tool 逐个驱动 MCP 工具，报告每个工具的吞吐量、延迟分位数、失败次数以及运行
+期间的进程 RSS 峰值（包含模拟服务占用的内存）。
+
+--json 把结果写入文件，--compare 与之前保存的结果对比吞吐量和 p50 的变化，
+便于在没有网络的环境中发现性能回退。
+
+用法::
+
+    python benchmarks/bench_suite.py --concurrency 8 --requests 200 --size 4096
+    python benchmarks/bench_suite.py --tools tos_get_object,tos_put_object --size 1048576 --bandwidth 50
+    python benchmarks/bench_suite.py --json baseline.json
+    python benchmarks/bench_suite.py --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("TOS_ACCESS_KEY", "fake-ak")
+os.environ.setdefault("TOS_SECRET_KEY", "fake-sk")
+
+from fake_tos import FAKE_REGION, FakeTosServer, FakeTosStore, fake_endpoint  # noqa: E402
+
+os.environ.setdefault("TOS_REGION", FAKE_REGION)
+
+BUCKET = "bench"
+
+
+class RssSampler:
+    """后台线程定期采样进程 RSS，记录区间内的峰值（非 Linux 平台退化为 ru_maxrss）"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def current() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self) -> "RssSampler":
+        self.peak = self.current()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+class Scenario:
+    """一个工具的压测场景：setup 在模拟存储中准备数据，make_args(i) 生成第 i 次调用的参数"""
+
+    def __init__(self, tool: str, make_args: Callable[[int], Dict[str, Any]],
+                 setup: Optional[Callable[[FakeTosStore, int], None]] = None):
+        self.tool = tool
+        self.make_args = make_args
+        self.setup = setup
+
+
+def _scenarios(opts, workdir: str) -> List[Scenario]:
+    size = opts.size
+    payload = b"x" * size
+
+    def _objects(store: FakeTosStore, _n: int):
+        for i in range(16):
+            store.put(BUCKET, f"objects/{i}", payload, "text/plain")
+
+    def _listing(store: FakeTosStore, _n: int):
+        for i in range(opts.keys):
+            store.put(BUCKET, f"list/{i // 100:03d}/{i:06d}.json", b"{}", "application/json")
+
+    def _per_call(prefix: str, count: int = 1):
+        def _setup(store: FakeTosStore, n: int):
+            for i in range(n):
+                for j in range(count):
+                    store.put(BUCKET, f"{prefix}/{i}/{j}", payload)
+        return _setup
+
+    def _empty_buckets(store: FakeTosStore, n: int):
+        for i in range(n):
+            store.create_bucket(f"empty-{i:06d}")
+
+    def _media(store: FakeTosStore, _n: int):
+        store.put(BUCKET, "media/image.jpg", payload, "image/jpeg")
+        store.put(BUCKET, "media/video.mp4", payload, "video/mp4")
+
+    return [
+        Scenario("tos_list_buckets", lambda i: {}),
+        Scenario("tos_create_bucket", lambda i: {"bucket_name": f"created-{i:06d}"}),
+        Scenario("tos_get_bucket_meta", lambda i: {"bucket_name": BUCKET}),
+        Scenario("tos_delete_bucket", lambda i: {"bucket_name": f"empty-{i:06d}"}, _empty_buckets),
+        Scenario("tos_put_object", lambda i: {"bucket_name": BUCKET, "object_key": f"put/{i}",
+                                              "content": payload.decode("ascii")}),
+        Scenario("tos_get_object", lambda i: {"bucket_name": BUCKET, "object_key": f"objects/{i % 16}"},
+                 _objects),
+        Scenario("tos_batch_get", lambda i: {"bucket_name": BUCKET, "include_content": True,
+                                             "object_keys": [f"objects/{j}" for j in range(16)]}, _objects),
+        Scenario("tos_download_object", lambda i: {"bucket_name": BUCKET, "object_key": f"objects/{i % 16}",
+                                                   "file_path": os.path.join(workdir, f"download-{i}.bin")},
+                 _objects),
+        Scenario("tos_list_objects", lambda i: {"bucket_name": BUCKET, "prefix": "list/", "max_keys": 1000},
+                 _listing),
+        Scenario("tos_scan_prefix", lambda i: {"bucket_name": BUCKET, "prefix": "list/"}, _listing),
+        Scenario("tos_delete_object", lambda i: {"bucket_name": BUCKET, "object_key": f"delete/{i}/0"},
+                 _per_call("delete")),
+        Scenario("tos_delete_objects", lambda i: {"bucket_name": BUCKET, "prefix": f"delete-many/{i}/"},
+                 _per_call("delete-many", 10)),
+        Scenario("tos_copy_object", lambda i: {"src_bucket": BUCKET, "src_key": f"objects/{i % 16}",
+                                               "dst_key": f"copy/{i}"}, _objects),
+        Scenario("tos_copy_prefix", lambda i: {"src_bucket": BUCKET, "src_prefix": f"copy-src/{i}/",
+                                               "dst_prefix": f"copy-dst/{i}/"}, _per_call("copy-src", 10)),
+        Scenario("tos_presigned_url", lambda i: {"bucket_name": BUCKET, "object_key": f"objects/{i % 16}"}),
+        Scenario("tos_image_info", lambda i: {"bucket_name": BUCKET, "object_key": "media/image.jpg"}, _media),
+        Scenario("tos_image_process", lambda i: {"bucket_name": BUCKET, "object_key": "media/image.jpg",
+                                                 "process": "image/resize,w_100", "save_bucket": BUCKET,
+                                                 "save_key": f"processed/{i}.jpg"}, _media),
+        Scenario("tos_image_process_batch", lambda i: {"bucket_name": BUCKET, "prefix": f"images/{i}/",
+                                                       "process": "image/resize,w_100",
+                                                       "save_key_template": f"thumbs/{i}/" + "{rel}"},
+                 _per_call("images", 10)),
+        Scenario("tos_video_info", lambda i: {"bucket_name": BUCKET, "object_key": "media/video.mp4"}, _media),
+        Scenario("tos_video_snapshot", lambda i: {"bucket_name": BUCKET, "object_key": "media/video.mp4",
+                                                  "time": 1000, "save_bucket": BUCKET,
+                                                  "save_key": f"snapshots/{i}.jpg"}, _media),
+        Scenario("tos_cache_stats", lambda i: {}),
+        Scenario("tos_server_stats", lambda i: {"include_buckets": False}),
+    ]
+
+
+_FAILED_STATUSES = ("error", "failed")
+
+
+def _failed_items(data: Any) -> int:
+    """按 status 字段统计 JSON 结果中失败的条目数，兼容 columnar 格式下的并行数组"""
+    if isinstance(data, list):
+        return sum(_failed_items(item) for item in data)
+    if not isinstance(data, dict):
+        return 0
+    status = data.get("status")
+    if isinstance(status, list):
+        count = sum(1 for s in status if s in _FAILED_STATUSES)
+    else:
+        count = 1 if status in _FAILED_STATUSES else 0
+    return count + sum(_failed_items(value) for key, value in data.items()
+                       if key != "status" and isinstance(value, (dict, list)))
+
+
+def _failed_count(data: Any) -> int:
+    """批量工具在顶层给出 failed / errors 汇总时直接采用，避免与条目明细重复计数；
+    嵌套层级中的同名字段（如 tos_server_stats 的累计错误数）不视为本次调用失败"""
+    if isinstance(data, dict):
+        totals = [data[name] for name in ("failed", "errors")
+                  if isinstance(data.get(name), int) and not isinstance(data.get(name), bool)]
+        if totals:
+            return max(totals)
+    return _failed_items(data)
+
+
+def _failures(result) -> int:
+    """返回一次调用的失败数：错误文本计 1，JSON 结果按失败条目计数"""
+    text = getattr(result[0], "text", "") if result else ""
+    if text.startswith(("{", "[")):
+        try:
+            return _failed_count(json.loads(text))
+        except ValueError:
+            pass
+    return 1 if "失败" in text or "错误" in text else 0
+
+
+async def _drive(call_tool, scenario: Scenario, start: int, count: int, concurrency: int):
+    latencies: List[float] = []
+    failures: List[str] = []
+    failed = 0
+    queue = iter(range(start, start + count))
+
+    async def _worker():
+        nonlocal failed
+        for i in queue:
+            t0 = time.perf_counter()
+            result = await call_tool(scenario.tool, scenario.make_args(i))
+            latencies.append(time.perf_counter() - t0)
+            count = _failures(result)
+            if count:
+                failed += count
+                failures.append(result[0].text)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    return time.perf_counter() - t0, sorted(latencies), failed, failures
+
+
+def _percentile(values: List[float], p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+async def _run(opts) -> List[Dict[str, Any]]:
+    with FakeTosServer(latency=opts.latency, bandwidth=opts.bandwidth * 1024 * 1024) as fake, \
+            tempfile.TemporaryDirectory(prefix="tos-bench-") as workdir:
+        host, port = fake.address
+        os.environ.update(TOS_ENDPOINT=fake_endpoint(), TOS_PROXY_HOST=host, TOS_PROXY_PORT=str(port),
+                          TOS_MAX_RETRY_COUNT="0", TOS_ASYNC_HTTP="true" if opts.async_http else "false")
+        from tos_mcp_server.server import call_tool
+
+        fake.store.create_bucket(BUCKET)
+        scenarios = _scenarios(opts, workdir)
+        if opts.tools:
+            wanted = set(opts.tools)
+            unknown = wanted - {s.tool for s in scenarios}
+            if unknown:
+                raise SystemExit(f"未知工具: {', '.join(sorted(unknown))}")
+            scenarios = [s for s in scenarios if s.tool in wanted]
+
+        print(f"concurrency={opts.concurrency} requests={opts.requests} size={opts.size}B "
+              f"latency={opts.latency * 1000:.1f}ms bandwidth={opts.bandwidth or '∞'}MB/s "
+              f"async_http={opts.async_http}")
+        print(f"  {'tool':<24} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'fail':>5} {'rss':>8}")
+        results = []
+        for scenario in scenarios:
+            if scenario.setup is not None:
+                scenario.setup(fake.store, opts.requests + opts.concurrency)
+            # 预热：建立连接、解析桶地域、创建线程池
+            await _drive(call_tool, scenario, opts.requests, opts.concurrency, opts.concurrency)
+            with RssSampler() as rss:
+                elapsed, latencies, failed, failures = await _drive(call_tool, scenario, 0, opts.requests,
+                                                            opts.concurrency)
+            row = {
+                "tool": scenario.tool,
+                "requests": opts.requests,
+                "concurrency": opts.concurrency,
+                "size": opts.size,
+                "req_per_s": round(opts.requests / elapsed, 1),
+                "p50_ms": round(statistics.median(latencies) * 1000, 2),
+                "p95_ms": round(_percentile(latencies, 0.95), 2),
+                "p99_ms": round(_percentile(latencies, 0.99), 2),
+                "failures": failed,
+                "peak_rss_mb": round(rss.peak / 1024 / 1024, 1)
+            }
+            results.append(row)
+            print(f"  {row['tool']:<24} {row['req_per_s']:>9.1f} {row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms "
+                  f"{row['p99_ms']:>7.1f}ms {row['failures']:>5} {row['peak_rss_mb']:>6.1f}MB")
+            if failures:
+                print(f"    首个失败: {' '.join(failures[0].split())[:200]}")
+        return results
+
+
+def _compare(results: List[Dict[str, Any]], baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {row["tool"]: row for row in json.load(f)["results"]}
+    print(f"对比 {baseline_path}:")
+    print(f"  {'tool':<24} {'req/s':>9} {'Δ':>8} {'p50':>9} {'Δ':>8}")
+    for row in results:
+        base = baseline.get(row["tool"])
+        if base is None:
+            continue
+        d_rate = (row["req_per_s"] / base["req_per_s"] - 1) * 100 if base["req_per_s"] else 0.0
+        d_p50 = (row["p50_ms"] / base["p50_ms"] - 1) * 100 if base["p50_ms"] else 0.0
+        print(f"  {row['tool']:<24} {row['req_per_s']:>9.1f} {d_rate:>+7.1f}% {row['p50_ms']:>7.1f}ms {d_p50:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线基准测试套件")
+    parser.add_argument("--tools", type=lambda v: [t.strip() for t in v.split(",") if t.strip()],
+                        help="逗号分隔的工具名，默认全部")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="并发调用数")
+    parser.add_argument("--requests", "-n", type=int, default=200, help="每个工具的调用次数")
+    parser.add_argument("--size", type=int, default=4096, help="对象大小（字节）")
+    parser.add_argument("--keys", type=int, default=1000, help="列举类工具的对象数量")
+    parser.add_argument("--latency", type=float, default=0.005, help="模拟服务注入的单请求延迟（秒）")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="模拟服务每条连接的带宽（MB/s），0 表示不限")
+    parser.add_argument("--async-http", action="store_true", help="启用 TOS_ASYNC_HTTP 异步数据通路")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", help="与之前 --json 保存的结果对比")
+    opts = parser.parse_args()
+
+    results = asyncio.run(_run(opts))
+    if opts.json:
+        with open(opts.json, "w", encoding="utf-8") as f:
+            json.dump({"options": {k: v for k, v in vars(opts).items() if k not in ("json", "compare")},
+                       "results": results}, f, ensure_ascii=False, indent=2)
+    if opts.compare:
+        _compare(results, opts.compare)
+
+
+if __name__ == "__main__":
+    main()
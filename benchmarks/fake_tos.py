@@ -0,0 +1,597 @@
+"""
+本地 TOS 模拟服务
+
+在进程内启动一个 HTTP 服务，实现 TOS Python SDK 用到的一小部分 API，用于在没有
+火山引擎账号和网络的情况下对 MCP 工具进行基准测试。
+
+SDK 使用虚拟主机风格的 URL (bucket.endpoint/key)，为避免依赖 DNS，模拟服务同时
+充当 HTTP 代理：客户端以 proxy_host/proxy_port 指向本服务，桶名从 Host 头中解析。
+
+桶可以位于不同的模拟地域，各地域的访问域名由 fake_endpoint(region) 给出；从错误
+地域的域名访问桶时返回 301 并在 x-tos-bucket-region 头中给出桶所在地域。
+
+可注入的网络条件：latency 为每个请求的固定延迟，connect_latency 为每条新连接的
+建连延迟，bandwidth 为每条连接收发请求体 / 响应体的带宽上限（字节/秒，0 表示不限）。
+"""
+
+import base64
+import email.utils
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import tos
+from tos.utils import Crc64
+
+FAKE_DOMAIN = "tos-fake.local"
+FAKE_REGION = "cn-fake"
+
+# 限速时每次收发的块大小
+_THROTTLE_CHUNK = 64 * 1024
+
+
+def fake_endpoint(region: str = FAKE_REGION) -> str:
+    """模拟地域的访问域名，默认地域为 FAKE_DOMAIN，其余为 <region>.FAKE_DOMAIN"""
+    return f"http://{FAKE_DOMAIN}" if region == FAKE_REGION else f"http://{region}.{FAKE_DOMAIN}"
+
+
+class FakeObject:
+    """内存中的对象"""
+
+    def __init__(self, data: bytes, content_type: str):
+        self.data = data
+        self.content_type = content_type
+        self.etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        crc = Crc64()
+        crc.update(data)
+        self.crc64 = crc.crc
+        self.last_modified = time.time()
+
+
+class FakeTosStore:
+    """模拟服务的内存存储"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: Dict[str, Dict[str, FakeObject]] = {}
+        self.regions: Dict[str, str] = {}
+        self.uploads: Dict[str, dict] = {}
+
+    def create_bucket(self, bucket: str, region: str = FAKE_REGION):
+        with self.lock:
+            self.buckets.setdefault(bucket, {})
+            self.regions[bucket] = region
+
+    def put(self, bucket: str, key: str, data: bytes,
+            content_type: str = "application/octet-stream") -> FakeObject:
+        obj = FakeObject(data, content_type)
+        with self.lock:
+            self.buckets.setdefault(bucket, {})[key] = obj
+        return obj
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 缓冲写出并关闭 Nagle 算法：响应体超过写缓冲时响应头与响应体仍会分两次发送，
+    # Nagle 与客户端的延迟 ACK 叠加会让每个请求多出约 40ms 的停顿
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    server: "_FakeHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        # 每个新连接模拟一次建连（TCP/TLS 握手）开销
+        super().setup()
+        with self.server.store.lock:
+            self.server.connection_count += 1
+        if self.server.connect_latency > 0:
+            time.sleep(self.server.connect_latency)
+
+    # 请求解析
+    def _parse(self) -> Tuple[Optional[str], str, Dict[str, str]]:
+        parts = urlsplit(self.path)
+        host = (self.headers.get("Host") or parts.netloc).split(":")[0]
+        name = host[:-len(FAKE_DOMAIN) - 1] if host.endswith("." + FAKE_DOMAIN) else ""
+        self.region = FAKE_REGION
+        head, _, last = name.rpartition(".")
+        if last and last in self.server.store.regions.values():
+            self.region, name = last, head
+        elif name in self.server.store.regions.values():
+            self.region, name = name, ""
+        with self.server.store.lock:
+            self.server.region_requests[self.region] += 1
+        key = unquote(parts.path.lstrip("/"))
+        query = {k: v[0] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+        return name or None, key, query
+
+    def _wrong_region(self, bucket: Optional[str]) -> bool:
+        """桶不在当前访问域名对应的地域时返回 301，响应头中带上桶所在地域"""
+        region = self.server.store.regions.get(bucket, FAKE_REGION) if bucket else FAKE_REGION
+        if bucket is None or bucket not in self.server.store.buckets or region == self.region:
+            return False
+        if self.command == "HEAD":
+            self._send(301, headers={"x-tos-bucket-region": region, "Content-Length": "0"}, send_body=False)
+        else:
+            self._json(301, {"Code": "PermanentRedirect", "Message": "PermanentRedirect", "RequestId": "fake"},
+                       {"x-tos-bucket-region": region})
+        return True
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return b""
+        if self.server.bandwidth <= 0:
+            return self.rfile.read(length)
+        buf = bytearray()
+        while len(buf) < length:
+            chunk = self.rfile.read(min(_THROTTLE_CHUNK, length - len(buf)))
+            if not chunk:
+                break
+            buf += chunk
+            time.sleep(len(chunk) / self.server.bandwidth)
+        return bytes(buf)
+
+    def _write_body(self, body: bytes):
+        if self.server.bandwidth <= 0:
+            self.wfile.write(body)
+            return
+        for offset in range(0, len(body), _THROTTLE_CHUNK):
+            chunk = body[offset:offset + _THROTTLE_CHUNK]
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            time.sleep(len(chunk) / self.server.bandwidth)
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None,
+              send_body: bool = True):
+        self.send_response(status)
+        headers = dict(headers or {})
+        headers.setdefault("x-tos-request-id", "fake-" + str(time.monotonic_ns()))
+        headers.setdefault("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        if send_body and body:
+            self._write_body(body)
+
+    def _json(self, status: int, data: dict, headers: Optional[Dict[str, str]] = None):
+        self._send(status, json.dumps(data).encode("utf-8"), {"Content-Type": "application/json", **(headers or {})})
+
+    def _error(self, status: int, code: str, message: str = ""):
+        self._json(status, {"Code": code, "Message": message or code, "RequestId": "fake"})
+
+    def _delay(self):
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+
+    def _should_fail(self) -> bool:
+        return self.server.error_rate > 0 and random.random() < self.server.error_rate
+
+    def _object_headers(self, obj: FakeObject) -> Dict[str, str]:
+        return {
+            "Content-Type": obj.content_type,
+            "ETag": obj.etag,
+            "Last-Modified": email.utils.formatdate(obj.last_modified, usegmt=True),
+            "x-tos-storage-class": "STANDARD",
+            "x-tos-hash-crc64ecma": str(obj.crc64),
+        }
+
+    def _get_object(self, bucket_name: str, key: str, head: bool = False):
+        store = self.server.store
+        bucket = store.buckets.get(bucket_name)
+        if bucket is None:
+            return self._error(404, "NoSuchBucket")
+        obj = bucket.get(key)
+        if obj is None:
+            if head:
+                return self._send(404, headers={"Content-Length": "0"}, send_body=False)
+            return self._error(404, "NoSuchKey")
+        if_match = self.headers.get("If-Match")
+        if if_match and if_match.strip('"') != obj.etag.strip('"'):
+            return self._error(412, "PreconditionFailed")
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match and if_none_match.strip('"') == obj.etag.strip('"'):
+            return self._send(304, headers={"ETag": obj.etag, "Content-Length": "0"}, send_body=False)
+        headers = self._object_headers(obj)
+        data = obj.data
+        status = 200
+        rng = self.headers.get("Range")
+        if rng and rng.startswith("bytes="):
+            start_s, _, end_s = rng[6:].partition("-")
+            start = int(start_s)
+            end = min(int(end_s), len(data) - 1) if end_s else len(data) - 1
+            if start >= len(data):
+                return self._error(416, "InvalidRange")
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            data = data[start:end + 1]
+            status = 206
+        headers["Content-Length"] = str(len(data))
+        self._send(status, data, headers, send_body=not head)
+
+    # HTTP 方法
+    def do_GET(self):
+        self._delay()
+        bucket, key, query = self._parse()
+        if self._wrong_region(bucket):
+            return
+        store = self.server.store
+        if bucket is None:
+            buckets = [{"Name": name, "Location": store.regions.get(name, FAKE_REGION),
+                        "CreationDate": "2024-01-01T00:00:00.000Z"}
+                       for name in sorted(store.buckets)]
+            return self._json(200, {"Owner": {"ID": "fake"}, "Buckets": buckets})
+        if not key:
+            if query.get("list-type") == "2":
+                return self._list_objects_v2(bucket, query)
+            return self._error(400, "InvalidRequest")
+        if "x-tos-process" in query:
+            return self._process(bucket, key, query)
+        if "uploadId" in query:
+            return self._list_parts(query["uploadId"])
+        if self._should_fail():
+            return self._error(500, "InternalError")
+        self._get_object(bucket, key)
+
+    def _process(self, bucket_name: str, key: str, query: Dict[str, str]):
+        """模拟图片/视频处理：info 类操作返回 JSON，其余返回原始数据并按需延迟回写"""
+        store = self.server.store
+        obj = store.buckets.get(bucket_name, {}).get(key)
+        if obj is None:
+            return self._error(404, "NoSuchKey")
+        process = query["x-tos-process"]
+        if process == "image/info":
+            return self._json(200, {"FileSize": {"value": str(len(obj.data))},
+                                    "Format": {"value": "jpg"},
+                                    "ImageWidth": {"value": "640"},
+                                    "ImageHeight": {"value": "480"}},
+                              {"ETag": obj.etag})
+        if process == "video/info":
+            return self._json(200, {"format": {"duration": str(self.server.video_duration),
+                                               "size": str(len(obj.data))},
+                                    "streams": [{"codec_type": "video", "width": 1280, "height": 720}]},
+                              {"ETag": obj.etag})
+        save_bucket = query.get("x-tos-save-bucket")
+        save_object = query.get("x-tos-save-object")
+        if save_bucket and save_object:
+            target_bucket = base64.b64decode(save_bucket).decode("utf-8")
+            target_key = base64.b64decode(save_object).decode("utf-8")
+            data = obj.data
+
+            def _persist():
+                store.put(target_bucket, target_key, data, "image/jpeg")
+
+            if self.server.process_delay > 0:
+                timer = threading.Timer(self.server.process_delay, _persist)
+                timer.daemon = True
+                timer.start()
+            else:
+                _persist()
+        self._send(200, obj.data, {"Content-Type": "image/jpeg"})
+
+    def do_HEAD(self):
+        self._delay()
+        bucket, key, _ = self._parse()
+        if self._wrong_region(bucket):
+            return
+        if bucket is None:
+            return self._send(400, send_body=False)
+        if not key:
+            if bucket not in self.server.store.buckets:
+                return self._send(404, headers={"Content-Length": "0"}, send_body=False)
+            return self._send(200, headers={"x-tos-bucket-region": self.region,
+                                            "x-tos-storage-class": "STANDARD"})
+        self._get_object(bucket, key, head=True)
+
+    def do_PUT(self):
+        self._delay()
+        bucket, key, query = self._parse()
+        if self._wrong_region(bucket):
+            return
+        body = self._body()
+        store = self.server.store
+        if bucket is None:
+            return self._error(400, "InvalidRequest")
+        if not key:
+            store.create_bucket(bucket, self.region)
+            return self._send(200)
+        if bucket not in store.buckets:
+            return self._error(404, "NoSuchBucket")
+        if self._should_fail():
+            return self._error(500, "InternalError")
+        if self.headers.get("x-tos-copy-source"):
+            return self._copy(bucket, key, query)
+        if "uploadId" in query:
+            return self._upload_part(query, body)
+        obj = store.put(bucket, key, body, self.headers.get("Content-Type") or "application/octet-stream")
+        self._send(200, headers={"ETag": obj.etag, "x-tos-hash-crc64ecma": str(obj.crc64)})
+
+    def do_POST(self):
+        self._delay()
+        bucket, key, query = self._parse()
+        if self._wrong_region(bucket):
+            return
+        body = self._body()
+        store = self.server.store
+        if bucket not in store.buckets:
+            return self._error(404, "NoSuchBucket")
+        if self._should_fail():
+            return self._error(500, "InternalError")
+        if "delete" in query and not key:
+            return self._delete_multi(bucket, body)
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            with store.lock:
+                store.uploads[upload_id] = {
+                    "bucket": bucket, "key": key, "parts": {},
+                    "content_type": self.headers.get("Content-Type") or "application/octet-stream",
+                }
+            return self._json(200, {"Bucket": bucket, "Key": key, "UploadId": upload_id})
+        if "uploadId" in query:
+            return self._complete_upload(query["uploadId"], body)
+        self._error(400, "InvalidRequest")
+
+    def _delete_multi(self, bucket_name: str, body: bytes):
+        store = self.server.store
+        request = json.loads(body or b"{}")
+        deleted = []
+        with store.lock:
+            bucket = store.buckets[bucket_name]
+            for item in request.get("Objects", []):
+                bucket.pop(item["Key"], None)
+                deleted.append({"Key": item["Key"]})
+        self._json(200, {"Deleted": [] if request.get("Quiet") else deleted, "Error": []})
+
+    # 服务端复制
+    def _copy(self, bucket_name: str, key: str, query: Dict[str, str]):
+        store = self.server.store
+        src_bucket, _, src_key = self.headers["x-tos-copy-source"].lstrip("/").partition("/")
+        src = store.buckets.get(src_bucket, {}).get(unquote(src_key))
+        if src is None:
+            return self._error(404, "NoSuchKey")
+        if_match = self.headers.get("x-tos-copy-source-if-match")
+        if if_match and if_match.strip('"') != src.etag.strip('"'):
+            return self._error(412, "PreconditionFailed")
+        last_modified = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+        if "uploadId" in query:
+            upload = store.uploads.get(query["uploadId"])
+            if upload is None:
+                return self._error(404, "NoSuchUpload")
+            data = src.data
+            rng = self.headers.get("x-tos-copy-source-range")
+            if rng and rng.startswith("bytes="):
+                start, _, end = rng[6:].partition("-")
+                data = data[int(start):int(end) + 1]
+            part = FakeObject(data, "")
+            upload["parts"][int(query["partNumber"])] = part
+            return self._json(200, {"ETag": part.etag, "LastModified": last_modified})
+        obj = store.put(bucket_name, key, src.data, src.content_type)
+        self._json(200, {"ETag": obj.etag, "LastModified": last_modified})
+
+    # 分片上传
+    def _upload_part(self, query: Dict[str, str], body: bytes):
+        upload = self.server.store.uploads.get(query["uploadId"])
+        if upload is None:
+            return self._error(404, "NoSuchUpload")
+        part = FakeObject(body, "")
+        upload["parts"][int(query["partNumber"])] = part
+        self._send(200, headers={"ETag": part.etag, "x-tos-hash-crc64ecma": str(part.crc64)})
+
+    def _list_parts(self, upload_id: str):
+        upload = self.server.store.uploads.get(upload_id)
+        if upload is None:
+            return self._error(404, "NoSuchUpload")
+        parts = [{"PartNumber": n, "ETag": p.etag, "Size": len(p.data)}
+                 for n, p in sorted(upload["parts"].items())]
+        self._json(200, {"Bucket": upload["bucket"], "Key": upload["key"], "UploadId": upload_id,
+                         "IsTruncated": False, "Parts": parts})
+
+    def _complete_upload(self, upload_id: str, body: bytes):
+        store = self.server.store
+        upload = store.uploads.get(upload_id)
+        if upload is None:
+            return self._error(404, "NoSuchUpload")
+        requested = json.loads(body or b"{}").get("Parts", [])
+        chunks = []
+        for item in requested:
+            part = upload["parts"].get(item["PartNumber"])
+            if part is None or part.etag.strip('"') != item["ETag"].strip('"'):
+                return self._error(400, "InvalidPart")
+            chunks.append(part.data)
+        obj = store.put(upload["bucket"], upload["key"], b"".join(chunks), upload["content_type"])
+        with store.lock:
+            store.uploads.pop(upload_id, None)
+        self._send(200, json.dumps({"Bucket": upload["bucket"], "Key": upload["key"], "ETag": obj.etag}).encode(),
+                   {"Content-Type": "application/json", "x-tos-hash-crc64ecma": str(obj.crc64)})
+
+    def do_DELETE(self):
+        self._delay()
+        bucket, key, query = self._parse()
+        if self._wrong_region(bucket):
+            return
+        store = self.server.store
+        if "uploadId" in query:
+            with store.lock:
+                store.uploads.pop(query["uploadId"], None)
+            return self._send(204)
+        with store.lock:
+            if bucket not in store.buckets:
+                return self._error(404, "NoSuchBucket")
+            if key:
+                store.buckets[bucket].pop(key, None)
+            else:
+                if store.buckets[bucket]:
+                    return self._error(409, "BucketNotEmpty")
+                del store.buckets[bucket]
+        self._send(204)
+
+    def _list_objects_v2(self, bucket_name: str, query: Dict[str, str]):
+        bucket = self.server.store.buckets.get(bucket_name)
+        if bucket is None:
+            return self._error(404, "NoSuchBucket")
+        prefix = query.get("prefix", "")
+        delimiter = query.get("delimiter", "")
+        max_keys = int(query.get("max-keys") or 1000)
+        after = query.get("continuation-token") or query.get("start-after") or ""
+        contents, prefixes = [], []
+        seen_prefixes = set()
+        truncated = False
+        last = None
+        for key in sorted(k for k in list(bucket) if k.startswith(prefix) and k > after):
+            if delimiter:
+                idx = key.find(delimiter, len(prefix))
+                if idx >= 0:
+                    common = key[:idx + len(delimiter)]
+                    if common in seen_prefixes:
+                        continue
+                    if len(contents) + len(prefixes) >= max_keys:
+                        truncated = True
+                        break
+                    seen_prefixes.add(common)
+                    prefixes.append({"Prefix": common})
+                    # 跳过该公共前缀下的所有键
+                    last = common + "\uffff"
+                    continue
+            if len(contents) + len(prefixes) >= max_keys:
+                truncated = True
+                break
+            obj = bucket[key]
+            contents.append({
+                "Key": key,
+                "LastModified": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(obj.last_modified)),
+                "ETag": obj.etag,
+                "Size": len(obj.data),
+                "StorageClass": "STANDARD",
+            })
+            last = key
+        result = {
+            "Name": bucket_name,
+            "Prefix": prefix,
+            "MaxKeys": max_keys,
+            "Delimiter": delimiter,
+            "IsTruncated": truncated,
+            "KeyCount": len(contents) + len(prefixes),
+            "Contents": contents,
+            "CommonPrefixes": prefixes,
+        }
+        if truncated:
+            result["NextContinuationToken"] = last
+        self._json(200, result)
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    store: FakeTosStore
+    latency: float
+    connect_latency: float
+    connection_count: int
+    bandwidth: float
+    region_requests: Counter
+    error_rate: float
+    process_delay: float
+    video_duration: float
+
+
+class FakeTosServer:
+    """在后台线程中运行的 TOS 模拟服务
+
+    用法::
+
+        with FakeTosServer(latency=0.2) as fake:
+            client = fake.make_client()
+    """
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0,
+                 process_delay: float = 0.0, video_duration: float = 10.0, error_rate: float = 0.0,
+                 connect_latency: float = 0.0, bandwidth: float = 0.0):
+        self.store = FakeTosStore()
+        self._httpd = _FakeHTTPServer((host, port), _Handler)
+        self._httpd.store = self.store
+        self._httpd.latency = latency
+        self._httpd.process_delay = process_delay
+        self._httpd.error_rate = error_rate
+        self._httpd.video_duration = video_duration
+        self._httpd.connect_latency = connect_latency
+        self._httpd.bandwidth = bandwidth
+        self._httpd.connection_count = 0
+        self._httpd.region_requests = Counter()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._httpd.server_address[:2]
+
+    @property
+    def latency(self) -> float:
+        return self._httpd.latency
+
+    @latency.setter
+    def latency(self, value: float):
+        self._httpd.latency = value
+
+    @property
+    def bandwidth(self) -> float:
+        return self._httpd.bandwidth
+
+    @bandwidth.setter
+    def bandwidth(self, value: float):
+        self._httpd.bandwidth = value
+
+    @property
+    def connection_count(self) -> int:
+        """累计建立的连接数"""
+        return self._httpd.connection_count
+
+    @property
+    def region_requests(self) -> Counter:
+        """各模拟地域访问域名收到的请求数"""
+        return self._httpd.region_requests
+
+    @property
+    def error_rate(self) -> float:
+        return self._httpd.error_rate
+
+    @error_rate.setter
+    def error_rate(self, value: float):
+        self._httpd.error_rate = value
+
+    def start(self) -> "FakeTosServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-tos", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeTosServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def client_kwargs(self) -> dict:
+        """构造指向模拟服务的 TosClientV2 所需参数"""
+        host, port = self.address
+        return {
+            "ak": "fake-ak",
+            "sk": "fake-sk",
+            "endpoint": f"http://{FAKE_DOMAIN}",
+            "region": FAKE_REGION,
+            "proxy_host": host,
+            "proxy_port": port,
+            "max_retry_count": 0,
+        }
+
+    def make_client(self, **kwargs):
+        params = self.client_kwargs()
+        params.update(kwargs)
+        return tos.TosClientV2(**params)
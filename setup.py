@@ -7,8 +7,9 @@ setup(
     author="TOS MCP Team",
     packages=find_packages(),
     install_requires=[
-        "tos>=2.6.0",
-        "mcp>=0.3.0"
+        "tos>=2.8.1,<2.9",
+        "mcp>=1.10.0",
+        "jsonschema>=4.20.0"
     ],
     python_requires=">=3.8",
     entry_points={
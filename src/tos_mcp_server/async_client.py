@@ -0,0 +1,240 @@
+"""
+异步 TOS 客户端
+
+TosClientV2 基于同步的 requests，每个进行中的请求都要占用一个工作线程和一条连接。
+启用 TOS_ASYNC_HTTP 后，热点操作（GET / HEAD / 小对象 PUT / 列举 / 预签名）改由本
+模块直接在事件循环上通过 httpx.AsyncClient 发送：所有请求共享一个连接池，安装了 h2
+时在同一条 HTTP/2 连接上多路复用，不再经过线程池。
+
+签名、请求构造以及响应解析都复用 TOS SDK 的实现（tos.auth.Auth、tos.http.Request 和
+models2 中的输出模型），返回值与 TosClientV2 对应方法的返回值一致，出错时同样抛出
+TosServerError / TosClientError，调用方无需区分两条路径。SDK 中以下划线开头的私有
+辅助函数（URL、请求头与列举参数的拼装）随版本变化，这里按相同规则单独实现。
+"""
+
+import json
+import asyncio
+import logging
+import itertools
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+from requests.structures import CaseInsensitiveDict
+from tos import exceptions
+from tos.auth import Auth
+from tos.consts import SLEEP_BASE_TIME, UNSIGNED_PAYLOAD
+from tos.http import Request
+from tos.models2 import (GetObjectOutput, HeadObjectOutput, ListObjectType2Output, PreSignedURLOutput,
+                         PutObjectOutput)
+from tos.utils import get_value
+
+from .config import TosConfig
+from .metrics import record_tos_request
+from .resilience import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# HTTP/1.1 下连接池的分片上限。httpcore 每次分配连接都要遍历池中所有连接并逐个检查
+# 空闲连接是否可读，连接数较多时开销随之线性增长；拆成多个小连接池轮流使用可以避免。
+_MAX_POOL_SHARDS = 64
+
+
+def _split_endpoint(endpoint: str) -> Tuple[str, str]:
+    """拆分为 (协议前缀, 主机)，未写协议时按 https 处理"""
+    for scheme in ("http://", "https://"):
+        if endpoint.startswith(scheme):
+            return scheme, endpoint[len(scheme):]
+    return "https://", endpoint
+
+
+def _virtual_host(bucket: Optional[str], host: str) -> str:
+    return f"{bucket}.{host}" if bucket else host
+
+
+def _object_url(scheme: str, host: str, bucket: Optional[str], key: Optional[str]) -> str:
+    """虚拟主机风格的请求 URL：bucket.host/key"""
+    url = _virtual_host(bucket, host)
+    if key:
+        url += "/" + quote(key, "/~")
+    return scheme + url
+
+
+def _object_headers(if_match: Optional[str] = None, if_none_match: Optional[str] = None,
+                    range_start: Optional[int] = None, range_end: Optional[int] = None) -> Dict[str, str]:
+    """GET / HEAD 对象的条件请求头与 Range 头"""
+    headers = {}
+    if if_match:
+        headers["If-Match"] = if_match
+    if if_none_match:
+        headers["If-None-Match"] = if_none_match
+    if range_start is not None or range_end is not None:
+        if range_start is not None and range_end is not None and range_start > range_end:
+            raise exceptions.TosClientError("invalid range format")
+        headers["Range"] = "bytes={}-{}".format("" if range_start is None else range_start,
+                                                "" if range_end is None else range_end)
+    return headers
+
+
+def _list_v2_params(prefix: Optional[str], delimiter: Optional[str], start_after: Optional[str],
+                    continuation_token: Optional[str], max_keys: Optional[int]) -> Dict[str, Any]:
+    """ListObjectsV2 的查询参数"""
+    params: Dict[str, Any] = {"list-type": "2", "fetch-owner": "true"}
+    for name, value in (("delimiter", delimiter), ("max-keys", max_keys), ("start-after", start_after),
+                        ("continuation-token", continuation_token), ("prefix", prefix)):
+        if value:
+            params[name] = value
+    return params
+
+
+def http2_available() -> bool:
+    """是否安装了 HTTP/2 所需的 h2 包（pip install 'httpx[http2]'）"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _BufferedResponse:
+    """已完整读入内存的响应，接口与 tos.http.Response 一致，可直接交给 SDK 的输出模型解析"""
+
+    def __init__(self, resp: httpx.Response):
+        self.status = resp.status_code
+        self.headers = CaseInsensitiveDict(resp.headers)
+        self.content_length = get_value(self.headers, "content-length", int)
+        self.request_id = self.headers.get("x-tos-request-id", "")
+        self._body = resp.content
+        self.offset = 0
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        end = len(self._body) if amt is None else min(len(self._body), self.offset + amt)
+        data = self._body[self.offset:end]
+        self.offset = end
+        return data
+
+    def json_read(self) -> Any:
+        return json.loads(self.read().decode("utf-8"))
+
+
+class AsyncTosClient:
+    """基于 httpx.AsyncClient 的 TOS 客户端，只实现热点操作"""
+
+    def __init__(self, config: TosConfig):
+        if not config.access_key or not config.secret_key:
+            raise ValueError("TOS_ACCESS_KEY 和 TOS_SECRET_KEY 环境变量必须设置")
+        self.endpoint = config.endpoint
+        self.region = config.region
+        self.max_retry_count = config.max_retry_count
+        self._scheme, self._host = _split_endpoint(config.endpoint)
+        self._auth = Auth(config.access_key, config.secret_key, config.region)
+
+        http2 = config.http2 and http2_available()
+        if config.http2 and not http2:
+            logger.info("未安装 h2，异步客户端使用 HTTP/1.1（pip install 'httpx[http2]' 启用 HTTP/2）")
+        proxy = f"http://{config.proxy_host}:{config.proxy_port}" if config.proxy_host else None
+        # HTTP/2 在少量连接上多路复用，使用单个连接池即可
+        shards = 1 if http2 else max(1, min(_MAX_POOL_SHARDS, config.max_connections))
+        per_shard = -(-config.max_connections // shards)
+        ssl_context = httpx.create_ssl_context()
+        self._pools = [
+            httpx.AsyncClient(
+                http2=http2,
+                proxy=proxy,
+                verify=ssl_context,
+                limits=httpx.Limits(max_connections=per_shard, max_keepalive_connections=per_shard),
+                timeout=httpx.Timeout(config.socket_timeout, connect=config.connect_timeout),
+                follow_redirects=False
+            )
+            for _ in range(shards)
+        ]
+        self._next_pool = itertools.cycle(self._pools)
+        self.http2 = http2
+        logger.info(f"异步 TOS 客户端已创建，endpoint: {config.endpoint}，HTTP/2: {http2}")
+
+    def _build(self, method: str, bucket: Optional[str], key: Optional[str] = None,
+               params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+               data: Optional[bytes] = None) -> Request:
+        return Request(method,
+                       _object_url(self._scheme, self._host, bucket, key),
+                       "/" + key if key else "/",
+                       _virtual_host(bucket, self._host),
+                       data=data,
+                       params={k: v for k, v in (params or {}).items() if v is not None},
+                       headers=CaseInsensitiveDict(headers or {}))
+
+    async def _request(self, method: str, bucket: Optional[str], key: Optional[str] = None,
+                       params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                       data: Optional[bytes] = None) -> _BufferedResponse:
+        """签名并发送请求，对 429 / 5xx 和网络错误按带全抖动的指数退避重试"""
+        for attempt in range(self.max_retry_count + 1):
+            req = self._build(method, bucket, key, params, headers, data)
+            req.headers["x-tos-content-sha256"] = UNSIGNED_PAYLOAD
+            if attempt:
+                req.headers["x-sdk-retry-count"] = f"attempt={attempt}; max={self.max_retry_count}"
+            self._auth.sign_request(req)
+            # Host 由 httpx 根据 URL 生成（HTTP/2 下为 :authority），与签名时使用的值一致
+            send_headers = {k: v for k, v in req.headers.items() if k.lower() != "host"}
+            retryable = attempt < self.max_retry_count
+            record_tos_request()
+            try:
+                http_resp = await next(self._next_pool).request(method, req.get_request_url(),
+                                                                headers=send_headers, content=req.data)
+                resp = _BufferedResponse(http_resp)
+            except httpx.TransportError as e:
+                if not retryable:
+                    # 保留具体的错误类型（连接、TLS、超时等），不要统一报告为超时
+                    raise exceptions.TosClientError(f"http request failed: {type(e).__name__}: {e}", e)
+                await asyncio.sleep(backoff_delay(attempt + 1, SLEEP_BASE_TIME, 60))
+                continue
+            if resp.status < 300:
+                return resp
+            if not retryable or not (resp.status == 429 or resp.status >= 500):
+                raise exceptions.make_server_error(resp)
+            delay = backoff_delay(attempt + 1, SLEEP_BASE_TIME, 60)
+            if "retry-after" in resp.headers and resp.headers["retry-after"].isdigit():
+                delay = max(delay, int(resp.headers["retry-after"]))
+            await asyncio.sleep(delay)
+
+    async def get_object(self, bucket: str, key: str, range_start: Optional[int] = None,
+                         range_end: Optional[int] = None, if_match: Optional[str] = None,
+                         if_none_match: Optional[str] = None) -> GetObjectOutput:
+        """下载对象（响应体已完整读入内存）"""
+        headers = _object_headers(if_match, if_none_match, range_start, range_end)
+        resp = await self._request("GET", bucket, key, headers=headers)
+        return GetObjectOutput(resp)
+
+    async def head_object(self, bucket: str, key: str, if_match: Optional[str] = None) -> HeadObjectOutput:
+        """获取对象元数据"""
+        headers = _object_headers(if_match)
+        resp = await self._request("HEAD", bucket, key, headers=headers)
+        return HeadObjectOutput(resp)
+
+    async def put_object(self, bucket: str, key: str, content: bytes = b"",
+                         content_type: Optional[str] = None) -> PutObjectOutput:
+        """上传内存中的小对象"""
+        headers = {"Content-Length": str(len(content))}
+        if content_type:
+            headers["Content-Type"] = content_type
+        resp = await self._request("PUT", bucket, key, headers=headers, data=content)
+        return PutObjectOutput(resp)
+
+    async def list_objects_type2(self, bucket: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                                 continuation_token: Optional[str] = None, start_after: Optional[str] = None,
+                                 max_keys: int = 1000, **_kwargs) -> ListObjectType2Output:
+        """列举一页对象（ListObjectsV2）"""
+        params = _list_v2_params(prefix, delimiter, start_after, continuation_token, max_keys)
+        resp = await self._request("GET", bucket, params=params)
+        return ListObjectType2Output(resp)
+
+    def pre_signed_url(self, http_method, bucket: str, key: Optional[str] = None,
+                       expires: int = 3600) -> PreSignedURLOutput:
+        """生成预签名 URL（本地计算，不发送请求）"""
+        req = self._build(http_method.value, bucket, key)
+        signed_url = self._auth.sign_url(req, expires)
+        signed_header = dict(req.headers)
+        signed_header["host"] = signed_header.pop("Host")
+        return PreSignedURLOutput(signed_url, signed_header)
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(pool.aclose() for pool in self._pools))
@@ -0,0 +1,381 @@
+"""
+元数据与对象内容缓存
+
+同一会话中智能体经常重复查询相同的桶区域、图片/视频信息。这里提供一个进程内
+LRU 缓存：条目按 (类型, 桶, 对象键) 存放并记录对象 ETag，每种类型有独立的 TTL，
+按条目数和字节数淘汰。过期条目若带有 ETag，可以用一次 HEAD 请求确认对象未变后
+直接续期，而不必重新执行 info 处理。本服务自身的写操作会主动失效对应的键。
+
+对象内容缓存是可选的磁盘缓存：完整读取过的小对象按 (桶, 对象键, ETag) 落盘，
+再次读取时以 If-None-Match 发起条件请求，服务端返回 304 时直接从内存映射的缓存
+文件中切片返回，不再传输对象内容。缓存按总字节数 LRU 淘汰。
+"""
+
+import os
+import json
+import mmap
+import time
+import asyncio
+import hashlib
+import tempfile
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from .config import tos_config
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+
+class _Entry:
+    __slots__ = ("value", "etag", "size", "expires_at")
+
+    def __init__(self, value: Any, etag: Optional[str], size: int, expires_at: float):
+        self.value = value
+        self.etag = etag
+        self.size = size
+        self.expires_at = expires_at
+
+
+class MetadataCache:
+    """按类型设置 TTL、按条目数和字节数 LRU 淘汰的元数据缓存"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttls: Dict[str, float]):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._index: Dict[Tuple[str, str], Set[CacheKey]] = {}
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._generation = 0
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0, "invalidations": 0}
+
+    def enabled(self, kind: str) -> bool:
+        return self.max_entries > 0 and self.ttls.get(kind, 0) > 0
+
+    def _remove(self, cache_key: CacheKey) -> None:
+        entry = self._entries.pop(cache_key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        keys = self._index.get(cache_key[1:])
+        if keys is not None:
+            keys.discard(cache_key)
+            if not keys:
+                del self._index[cache_key[1:]]
+
+    def set(self, kind: str, bucket: str, key: str, value: Any, etag: Optional[str] = None) -> None:
+        """写入缓存条目，超出条目数或字节上限时淘汰最久未使用的条目"""
+        if not self.enabled(kind):
+            return
+        size = len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        cache_key = (kind, bucket, key)
+        self._remove(cache_key)
+        self._entries[cache_key] = _Entry(value, etag, size, time.monotonic() + self.ttls[kind])
+        self._index.setdefault((bucket, key), set()).add(cache_key)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    async def get_or_load(self, kind: str, bucket: str, key: str,
+                          loader: Callable[[], Awaitable[Tuple[Any, Optional[str]]]],
+                          revalidate: Optional[Callable[[], Awaitable[Optional[str]]]] = None) -> Any:
+        """读取缓存，未命中时调用 loader 加载 (value, etag)
+
+        过期条目若带有 ETag 且提供了 revalidate，先比对当前 ETag，一致则续期。
+        同一键的并发未命中只会触发一次加载。
+        """
+        if not self.enabled(kind):
+            value, _ = await loader()
+            return value
+
+        cache_key = (kind, bucket, key)
+        entry = self._entries.get(cache_key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(cache_key)
+            self._stats["hits"] += 1
+            return entry.value
+
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            self._stats["hits"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        generation = self._generation
+        try:
+            if entry is not None and entry.etag and revalidate is not None:
+                try:
+                    current = await revalidate()
+                except Exception as e:
+                    logger.debug(f"缓存条目校验失败，重新加载: {str(e)}")
+                    current = None
+                if current == entry.etag:
+                    self._stats["revalidated"] += 1
+                    if generation == self._generation and cache_key in self._entries:
+                        entry.expires_at = time.monotonic() + self.ttls[kind]
+                        self._entries.move_to_end(cache_key)
+                    future.set_result(entry.value)
+                    return entry.value
+
+            self._stats["misses"] += 1
+            value, etag = await loader()
+            # 加载期间发生过失效则不写入，避免缓存写操作之前的旧值
+            if generation == self._generation:
+                self.set(kind, bucket, key, value, etag)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # 已由本协程抛出，避免等待方不存在时出现未检索异常的警告
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    def invalidate(self, bucket: Optional[str] = None, key: Optional[str] = None,
+                   prefix: Optional[str] = None, kind: Optional[str] = None) -> int:
+        """失效匹配的条目，返回失效数量；未指定任何条件时清空缓存"""
+        self._generation += 1
+        if bucket is not None and key is not None:
+            targets = [k for k in self._index.get((bucket, key), ()) if kind is None or k[0] == kind]
+        else:
+            targets = [k for k in self._entries
+                       if (kind is None or k[0] == kind)
+                       and (bucket is None or k[1] == bucket)
+                       and (prefix is None or k[2].startswith(prefix))]
+        for cache_key in targets:
+            self._remove(cache_key)
+        self._stats["invalidations"] += len(targets)
+        return len(targets)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中统计与当前占用"""
+        lookups = self._stats["hits"] + self._stats["revalidated"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round((self._stats["hits"] + self._stats["revalidated"]) / lookups, 4) if lookups else None,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttls": dict(self.ttls)
+        }
+
+
+class ContentEntry:
+    """内容缓存条目，属性与 head_object 结果中用到的字段保持一致"""
+    __slots__ = ("bucket", "key", "etag", "content_type", "content_length", "last_modified", "path")
+
+    def __init__(self, bucket: str, key: str, etag: str, content_type: Optional[str],
+                 content_length: int, last_modified: Optional[str], path: str):
+        self.bucket = bucket
+        self.key = key
+        self.etag = etag
+        self.content_type = content_type
+        self.content_length = content_length
+        self.last_modified = last_modified
+        self.path = path
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if name != "path"}
+
+
+class ContentCache:
+    """按总字节数 LRU 淘汰的对象内容磁盘缓存
+
+    所有方法都会访问磁盘，应通过 run_sync 在工作线程中调用。
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_object_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], ContentEntry]" = OrderedDict()
+        self._bytes = 0
+        self._loaded = False
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_served": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and self.max_bytes > 0
+
+    def _file_path(self, bucket: str, key: str, etag: str) -> str:
+        digest = hashlib.sha256(f"{bucket}\0{key}\0{etag}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".bin")
+
+    def _ensure_loaded(self) -> None:
+        """首次使用时从缓存目录恢复索引，按文件修改时间还原 LRU 顺序"""
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                # 上次运行中断时遗留的临时文件
+                self._remove_path(os.path.join(self.directory, name))
+                continue
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                entry = ContentEntry(path=meta_path[:-5] + ".bin", **meta)
+                if os.path.getsize(entry.path) != entry.content_length:
+                    raise ValueError("缓存文件大小不符")
+                found.append((os.path.getmtime(meta_path), entry))
+            except (OSError, ValueError, TypeError):
+                self._remove_files(meta_path[:-5] + ".bin")
+        for _, entry in sorted(found, key=lambda item: item[0]):
+            self._entries[(entry.bucket, entry.key)] = entry
+            self._bytes += entry.content_length
+        self._loaded = True
+        self._evict()
+
+    @staticmethod
+    def _remove_path(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @classmethod
+    def _remove_files(cls, path: str) -> None:
+        for target in (path, path[:-4] + ".json"):
+            cls._remove_path(target)
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        """先写入唯一的临时文件再原子替换，多个线程同时写同一条目时互不干扰"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove_path(tmp_path)
+            raise
+
+    def _drop(self, cache_key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._bytes -= entry.content_length
+            self._remove_files(entry.path)
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+
+    def lookup(self, bucket: str, key: str) -> Optional[ContentEntry]:
+        """返回已缓存的条目（不校验是否过期，由调用方发起条件请求）"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._entries.get((bucket, key))
+
+    def read(self, entry: ContentEntry, start: int, end: int) -> bytes:
+        """通过内存映射读取缓存文件的 [start, end] 字节"""
+        end = min(end, entry.content_length - 1)
+        with self._lock:
+            if (entry.bucket, entry.key) in self._entries:
+                self._entries.move_to_end((entry.bucket, entry.key))
+            self._stats["hits"] += 1
+            self._stats["bytes_served"] += max(0, end - start + 1)
+        if end < start:
+            return b""
+        with open(entry.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[start:end + 1]
+
+    def store(self, bucket: str, key: str, etag: str, content_type: Optional[str],
+              last_modified: Optional[str], data: bytes) -> bool:
+        """写入完整对象内容，超过单对象上限时不缓存；写入失败只记录日志，返回 False"""
+        if not etag or len(data) > self.max_object_bytes or len(data) > self.max_bytes:
+            return False
+        path = self._file_path(bucket, key, etag)
+        entry = ContentEntry(bucket, key, etag, content_type, len(data), last_modified, path)
+        try:
+            with self._lock:
+                self._ensure_loaded()
+            self._write_atomic(path, data)
+            self._write_atomic(path[:-4] + ".json",
+                               json.dumps(entry.to_dict(), ensure_ascii=False).encode("utf-8"))
+        except OSError as e:
+            logger.warning(f"写入内容缓存失败 {bucket}/{key}: {str(e)}")
+            return False
+        with self._lock:
+            old = self._entries.pop((bucket, key), None)
+            if old is not None:
+                self._bytes -= old.content_length
+                if old.path != path:
+                    self._remove_files(old.path)
+            self._entries[(bucket, key)] = entry
+            self._bytes += entry.content_length
+            self._stats["stores"] += 1
+            self._evict()
+        return True
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def invalidate(self, bucket: str, key: str) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            self._drop((bucket, key))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_object_bytes": self.max_object_bytes,
+                "directory": self.directory
+            }
+
+
+_metadata_cache: Optional[MetadataCache] = None
+_content_cache: Optional[ContentCache] = None
+
+
+def get_metadata_cache() -> MetadataCache:
+    """获取（必要时创建）全局元数据缓存"""
+    global _metadata_cache
+    if _metadata_cache is None:
+        _metadata_cache = MetadataCache(
+            max_entries=tos_config.cache_max_entries,
+            max_bytes=tos_config.cache_max_bytes,
+            ttls={
+                "buckets": tos_config.bucket_cache_ttl,
+                "bucket_meta": tos_config.bucket_cache_ttl,
+                "image_info": tos_config.media_info_cache_ttl,
+                "video_info": tos_config.media_info_cache_ttl,
+            }
+        )
+    return _metadata_cache
+
+
+def get_content_cache() -> ContentCache:
+    """获取（必要时创建）全局对象内容缓存，未配置缓存目录时不启用"""
+    global _content_cache
+    if _content_cache is None:
+        _content_cache = ContentCache(
+            directory=tos_config.content_cache_dir,
+            max_bytes=tos_config.content_cache_max_bytes,
+            max_object_bytes=tos_config.content_cache_max_object_bytes
+        )
+    return _content_cache
@@ -0,0 +1,258 @@
+"""
+TOS 客户端管理
+
+MCP 宿主会频繁启动本服务，而 initialize / list_tools 并不需要 TOS SDK。这里把
+SDK 导入和 TosClientV2 的创建推迟到第一次真正访问客户端时：handlers 中的
+tos_client 是一个代理对象，首次访问其属性时才加载配置、导入 SDK 并创建客户端。
+
+除默认地域的客户端外，还按地域维护一个客户端池：每个桶的地域在首次访问时通过
+head_bucket 解析并缓存，之后对该桶的请求直接发往所在地域的访问域名，避免跨地域
+访问失败或绕行。
+
+启用 TOS_ASYNC_HTTP 时，热点操作改用 async_client 中基于 httpx 的异步客户端，同样
+按地域各维护一个，并与创建它的事件循环绑定。
+"""
+
+import sys
+import asyncio
+import logging
+import threading
+import dataclasses
+import importlib.util
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple
+
+from .config import TosConfig, get_config
+from .metrics import record_tos_request
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[Any] = None
+_client_lock = threading.Lock()
+
+# 地域 -> 客户端（不含默认地域），桶名 -> 地域
+_regional_clients: Dict[str, Any] = {}
+_bucket_regions: Dict[str, str] = {}
+
+# 地域 -> (事件循环, 异步客户端)，默认地域的键为 None
+_async_clients: Dict[Optional[str], Tuple[asyncio.AbstractEventLoop, Any]] = {}
+
+
+def lazy_import(name: str) -> ModuleType:
+    """延迟导入模块：返回的模块对象在首次访问属性时才真正执行导入"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"找不到模块: {name}")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+tos = lazy_import("tos")
+
+
+def create_client(config: TosConfig):
+    """按配置创建 TosClientV2（连接池、超时、重试与 DNS 缓存）"""
+    if not config.access_key or not config.secret_key:
+        raise ValueError("TOS_ACCESS_KEY 和 TOS_SECRET_KEY 环境变量必须设置")
+    if config.max_connections < config.max_workers:
+        # 连接池小于工作线程数时，超出的连接用完即关闭，高并发下会反复建连
+        logger.warning(f"TOS_MAX_CONNECTIONS ({config.max_connections}) 小于 "
+                       f"TOS_MAX_WORKERS ({config.max_workers})，并发请求将无法复用连接")
+    client = tos.TosClientV2(
+        ak=config.access_key,
+        sk=config.secret_key,
+        endpoint=config.endpoint,
+        region=config.region,
+        max_connections=config.max_connections,
+        connection_time=config.connect_timeout,
+        socket_timeout=config.socket_timeout,
+        max_retry_count=config.max_retry_count,
+        dns_cache_time=config.dns_cache_time,
+        proxy_host=config.proxy_host,
+        proxy_port=config.proxy_port
+    )
+    logger.info(f"TOS 客户端已创建，endpoint: {config.endpoint}，连接池: {config.max_connections}")
+    return instrument_client(client)
+
+
+def instrument_client(client):
+    """在 SDK 的 requests 会话上挂载响应钩子，把每个 HTTP 请求（含重试）计入当前工具调用"""
+    hooks = client.session.hooks["response"]
+    if record_tos_request not in hooks:
+        hooks.append(record_tos_request)
+    return client
+
+
+def get_client():
+    """获取（必要时创建）共享的 TosClientV2"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_client(get_config())
+    return _client
+
+
+def set_client(client) -> None:
+    """替换默认地域的客户端并清空地域路由（基准测试中指向模拟服务时使用）"""
+    global _client
+    with _client_lock:
+        _client = instrument_client(client)
+        _regional_clients.clear()
+        _bucket_regions.clear()
+        for loop, async_client in _async_clients.values():
+            _close_async_client(loop, async_client)
+        _async_clients.clear()
+
+
+def region_endpoint(config: TosConfig, region: str) -> str:
+    """地域对应的访问域名：TOS_REGION_ENDPOINTS 显式配置优先，默认地域使用 TOS_ENDPOINT，
+    其余地域按是否使用内网（TOS_USE_INTERNAL_ENDPOINT）生成"""
+    if region in config.region_endpoints:
+        return config.region_endpoints[region]
+    if region == config.region:
+        return config.endpoint
+    domain = "ivolces.com" if config.use_internal_endpoint else "volces.com"
+    return f"https://tos-{region}.{domain}"
+
+
+def get_regional_client(region: str):
+    """获取（必要时创建）指定地域的客户端"""
+    config = get_config()
+    if not region or region == config.region:
+        return get_client()
+    client = _regional_clients.get(region)
+    if client is None:
+        with _client_lock:
+            client = _regional_clients.get(region)
+            if client is None:
+                client = create_client(dataclasses.replace(config, region=region,
+                                                           endpoint=region_endpoint(config, region)))
+                _regional_clients[region] = client
+    return client
+
+
+def remember_bucket_region(bucket: str, region: Optional[str]) -> None:
+    """记录已知的桶地域（如 list_buckets、create_bucket 的结果），省去 head_bucket"""
+    if region:
+        _bucket_regions[bucket] = region
+
+
+def forget_bucket_region(bucket: str) -> None:
+    """桶被删除后清除其地域记录"""
+    _bucket_regions.pop(bucket, None)
+
+
+def bucket_region(bucket: str) -> Optional[str]:
+    """已缓存的桶地域，尚未解析时返回 None"""
+    return _bucket_regions.get(bucket)
+
+
+def resolve_bucket_region(bucket: str) -> str:
+    """通过默认客户端 head_bucket 解析桶所在地域并缓存，解析失败时返回默认地域"""
+    region = _bucket_regions.get(bucket)
+    if region is not None:
+        return region
+    config = get_config()
+    try:
+        region = get_client().head_bucket(bucket).region
+    except tos.exceptions.TosServerError as e:
+        # 跨地域访问或无 HeadBucket 权限时，响应头中仍可能带有桶所在地域
+        region = (e.header or {}).get("x-tos-bucket-region")
+        if region is None and e.status_code == 404:
+            # 桶不存在时不缓存，交由实际请求返回错误
+            return config.region
+    except Exception as e:
+        logger.warning(f"解析存储桶 {bucket} 所在地域失败: {str(e)}")
+        return config.region
+    region = region or config.region
+    _bucket_regions[bucket] = region
+    if region != config.region:
+        logger.info(f"存储桶 {bucket} 位于地域 {region}，请求将发往 {region_endpoint(config, region)}")
+    return region
+
+
+def cached_bucket_client(bucket: str):
+    """无需访问网络即可确定的桶客户端：未启用按桶路由或地域已缓存时返回，否则返回 None"""
+    if not get_config().bucket_routing:
+        return get_client()
+    region = _bucket_regions.get(bucket)
+    return None if region is None else get_regional_client(region)
+
+
+def get_bucket_client(bucket: str):
+    """获取桶所在地域的客户端（首次访问时会发起 head_bucket，需在工作线程中调用）"""
+    if not get_config().bucket_routing:
+        return get_client()
+    return get_regional_client(resolve_bucket_region(bucket))
+
+
+def get_async_client(region: Optional[str] = None):
+    """获取（必要时创建）指定地域的异步客户端，未启用 TOS_ASYNC_HTTP 时返回 None
+
+    只能在事件循环中调用；httpx 的连接池与创建它的事件循环绑定，循环变化时重新创建。
+    """
+    config = get_config()
+    if not config.async_http:
+        return None
+    if region == config.region:
+        region = None
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(region)
+    if entry is None or entry[0] is not loop:
+        from .async_client import AsyncTosClient
+        if entry is not None:
+            _close_async_client(*entry)
+        if region is not None:
+            config = dataclasses.replace(config, region=region, endpoint=region_endpoint(config, region))
+        entry = (loop, AsyncTosClient(config))
+        _async_clients[region] = entry
+    return entry[1]
+
+
+def set_async_client(client) -> None:
+    """替换默认地域的异步客户端（基准测试中指向模拟服务时使用）"""
+    entry = _async_clients.get(None)
+    if entry is not None and entry[1] is not client:
+        _close_async_client(*entry)
+    _async_clients[None] = (asyncio.get_running_loop(), client)
+
+
+def _close_async_client(loop: asyncio.AbstractEventLoop, client) -> None:
+    """在创建它的事件循环中关闭被替换的异步客户端
+
+    原循环已关闭时，其上的连接既不能再使用也无法正常关闭，只能随对象回收；因此服务
+    退出前应通过 close_async_clients 在循环关闭之前主动关闭。
+    """
+    if loop.is_closed():
+        logger.debug("异步客户端所属的事件循环已关闭，跳过关闭连接池")
+        return
+
+    def _done(future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"关闭异步客户端失败: {future.exception()}")
+
+    asyncio.run_coroutine_threadsafe(client.aclose(), loop).add_done_callback(_done)
+
+
+async def close_async_clients() -> None:
+    """关闭当前事件循环中创建的全部异步客户端（服务退出时调用）"""
+    loop = asyncio.get_running_loop()
+    for region, (owner, client) in list(_async_clients.items()):
+        if owner is loop:
+            del _async_clients[region]
+            await client.aclose()
+
+
+class ClientProxy:
+    """TosClientV2 的代理，首次访问属性时才创建客户端"""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_client(), name)
@@ -1,20 +1,76 @@
 """配置管理模块"""
 
 import os
-import sys
 import logging
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+def _parse_pairs(value: str) -> Dict[str, str]:
+    """解析 "name=value,name=value" 形式的环境变量"""
+    pairs = {}
+    for item in value.split(","):
+        name, sep, val = item.partition("=")
+        if sep and name.strip() and val.strip():
+            pairs[name.strip()] = val.strip()
+    return pairs
+
 @dataclass
 class TosConfig:
     """TOS MCP Server 配置类"""
-    access_key: str
-    secret_key: str
+    access_key: Optional[str]
+    secret_key: Optional[str]
     region: str
     endpoint: str
+    max_workers: int = 32
+    process_wait_timeout: float = 10.0
+    max_response_bytes: int = 1024 * 1024
+    multipart_threshold: int = 20 * 1024 * 1024
+    part_size: int = 8 * 1024 * 1024
+    part_concurrency: int = 4
+    part_retries: int = 3
+    copy_threshold: int = 256 * 1024 * 1024
+    copy_part_size: int = 64 * 1024 * 1024
+    cache_max_entries: int = 4096
+    cache_max_bytes: int = 16 * 1024 * 1024
+    bucket_cache_ttl: float = 300.0
+    media_info_cache_ttl: float = 600.0
+    content_cache_dir: str = ""
+    content_cache_max_bytes: int = 256 * 1024 * 1024
+    content_cache_max_object_bytes: int = 8 * 1024 * 1024
+    http_host: str = "127.0.0.1"
+    http_port: int = 8000
+    http_stateless: bool = False
+    max_sessions: int = 100
+    session_max_concurrency: int = 8
+    max_connections: int = 1024
+    connect_timeout: float = 10.0
+    socket_timeout: float = 30.0
+    max_retry_count: int = 3
+    dns_cache_time: int = 0
+    proxy_host: Optional[str] = None
+    proxy_port: Optional[int] = None
+    bucket_routing: bool = True
+    use_internal_endpoint: bool = False
+    region_endpoints: Dict[str, str] = field(default_factory=dict)
+    output_format: str = "pretty"
+    max_output_bytes: int = 0
+    resource_buckets: List[str] = field(default_factory=list)
+    resource_list_limit: int = 100
+    async_http: bool = False
+    http2: bool = True
+    metrics_enabled: bool = True
+    metrics_window: int = 1024
+    metrics_log_interval: float = 0.0
+    metrics_path: str = "/metrics"
+    hedge_percentiles: Dict[str, float] = field(default_factory=dict)
+    hedge_min_delay: float = 0.005
+    read_retries: Dict[str, int] = field(default_factory=dict)
+    retry_base_delay: float = 0.05
+    retry_max_delay: float = 2.0
+    retry_budget_ratio: float = 0.1
+    retry_budget_min_per_second: float = 10.0
     
     @classmethod
     def from_env(cls) -> "TosConfig":
@@ -22,18 +78,129 @@ class TosConfig:
         access_key = os.getenv("TOS_ACCESS_KEY")
         secret_key = os.getenv("TOS_SECRET_KEY")
         region = os.getenv("TOS_REGION", "cn-beijing")
-        endpoint = os.getenv("TOS_ENDPOINT", f"https://tos-{region}.volces.com")
+        use_internal_endpoint = os.getenv("TOS_USE_INTERNAL_ENDPOINT", "false").lower() in ("1", "true", "yes")
+        endpoint = os.getenv("TOS_ENDPOINT",
+                             f"https://tos-{region}.{'ivolces.com' if use_internal_endpoint else 'volces.com'}")
+        max_workers = int(os.getenv("TOS_MAX_WORKERS", "32"))
+        process_wait_timeout = float(os.getenv("TOS_PROCESS_WAIT_TIMEOUT", "10"))
+        max_response_bytes = int(os.getenv("TOS_MAX_RESPONSE_BYTES", str(1024 * 1024)))
+        multipart_threshold = int(os.getenv("TOS_MULTIPART_THRESHOLD", str(20 * 1024 * 1024)))
+        part_size = int(os.getenv("TOS_PART_SIZE", str(8 * 1024 * 1024)))
+        part_concurrency = int(os.getenv("TOS_PART_CONCURRENCY", "4"))
+        part_retries = int(os.getenv("TOS_PART_RETRIES", "3"))
+        copy_threshold = int(os.getenv("TOS_COPY_THRESHOLD", str(256 * 1024 * 1024)))
+        copy_part_size = int(os.getenv("TOS_COPY_PART_SIZE", str(64 * 1024 * 1024)))
+        cache_max_entries = int(os.getenv("TOS_CACHE_MAX_ENTRIES", "4096"))
+        cache_max_bytes = int(os.getenv("TOS_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+        bucket_cache_ttl = float(os.getenv("TOS_BUCKET_CACHE_TTL", "300"))
+        media_info_cache_ttl = float(os.getenv("TOS_MEDIA_INFO_CACHE_TTL", "600"))
+        content_cache_dir = os.getenv("TOS_CONTENT_CACHE_DIR", "")
+        content_cache_max_bytes = int(os.getenv("TOS_CONTENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        content_cache_max_object_bytes = int(os.getenv("TOS_CONTENT_CACHE_MAX_OBJECT_BYTES", str(8 * 1024 * 1024)))
+        http_host = os.getenv("TOS_HTTP_HOST", "127.0.0.1")
+        http_port = int(os.getenv("TOS_HTTP_PORT", "8000"))
+        http_stateless = os.getenv("TOS_HTTP_STATELESS", "false").lower() in ("1", "true", "yes")
+        max_sessions = int(os.getenv("TOS_MAX_SESSIONS", "100"))
+        session_max_concurrency = int(os.getenv("TOS_SESSION_MAX_CONCURRENCY", "8"))
+        max_connections = int(os.getenv("TOS_MAX_CONNECTIONS", "1024"))
+        connect_timeout = float(os.getenv("TOS_CONNECT_TIMEOUT", "10"))
+        socket_timeout = float(os.getenv("TOS_SOCKET_TIMEOUT", "30"))
+        max_retry_count = int(os.getenv("TOS_MAX_RETRY_COUNT", "3"))
+        dns_cache_time = int(os.getenv("TOS_DNS_CACHE_TIME", "0"))
+        proxy_host = os.getenv("TOS_PROXY_HOST") or None
+        proxy_port = int(os.getenv("TOS_PROXY_PORT")) if os.getenv("TOS_PROXY_PORT") else None
+        bucket_routing = os.getenv("TOS_BUCKET_ROUTING", "true").lower() in ("1", "true", "yes")
+        # 格式: cn-shanghai=https://tos-cn-shanghai.ivolces.com,cn-guangzhou=https://...
+        region_endpoints = _parse_pairs(os.getenv("TOS_REGION_ENDPOINTS", ""))
+        output_format = os.getenv("TOS_OUTPUT_FORMAT", "pretty").lower()
+        max_output_bytes = int(os.getenv("TOS_MAX_OUTPUT_BYTES", "0"))
+        resource_buckets = [b.strip() for b in os.getenv("TOS_RESOURCE_BUCKETS", "").split(",") if b.strip()]
+        resource_list_limit = int(os.getenv("TOS_RESOURCE_LIST_LIMIT", "100"))
+        async_http = os.getenv("TOS_ASYNC_HTTP", "false").lower() in ("1", "true", "yes")
+        http2 = os.getenv("TOS_HTTP2", "true").lower() in ("1", "true", "yes")
+        metrics_enabled = os.getenv("TOS_METRICS", "true").lower() in ("1", "true", "yes")
+        metrics_window = int(os.getenv("TOS_METRICS_WINDOW", "1024"))
+        metrics_log_interval = float(os.getenv("TOS_METRICS_LOG_INTERVAL", "0"))
+        metrics_path = os.getenv("TOS_METRICS_PATH", "/metrics")
+        # 格式: tos_get_object=0.95,tos_list_objects=0.9（工具名=触发对冲的延迟分位数）
+        hedge_percentiles = {k: float(v) for k, v in _parse_pairs(os.getenv("TOS_HEDGE_TOOLS", "")).items()}
+        hedge_min_delay = float(os.getenv("TOS_HEDGE_MIN_DELAY", "0.005"))
+        # 格式: tos_get_object=3,tos_image_info=2（工具名=最大重试次数）
+        read_retries = {k: int(v) for k, v in _parse_pairs(os.getenv("TOS_RETRY_TOOLS", "")).items()}
+        retry_base_delay = float(os.getenv("TOS_RETRY_BASE_DELAY", "0.05"))
+        retry_max_delay = float(os.getenv("TOS_RETRY_MAX_DELAY", "2"))
+        retry_budget_ratio = float(os.getenv("TOS_RETRY_BUDGET_RATIO", "0.1"))
+        retry_budget_min_per_second = float(os.getenv("TOS_RETRY_BUDGET_MIN_PER_SECOND", "10"))
         
-        if not access_key or not secret_key:
-            logger.error("TOS_ACCESS_KEY 和 TOS_SECRET_KEY 环境变量必须设置")
-            sys.exit(1)
-            
         return cls(
             access_key=access_key,
             secret_key=secret_key,
             region=region,
-            endpoint=endpoint
+            endpoint=endpoint,
+            max_workers=max_workers,
+            process_wait_timeout=process_wait_timeout,
+            max_response_bytes=max_response_bytes,
+            multipart_threshold=multipart_threshold,
+            part_size=part_size,
+            part_concurrency=part_concurrency,
+            part_retries=part_retries,
+            copy_threshold=copy_threshold,
+            copy_part_size=copy_part_size,
+            cache_max_entries=cache_max_entries,
+            cache_max_bytes=cache_max_bytes,
+            bucket_cache_ttl=bucket_cache_ttl,
+            media_info_cache_ttl=media_info_cache_ttl,
+            content_cache_dir=content_cache_dir,
+            content_cache_max_bytes=content_cache_max_bytes,
+            content_cache_max_object_bytes=content_cache_max_object_bytes,
+            http_host=http_host,
+            http_port=http_port,
+            http_stateless=http_stateless,
+            max_sessions=max_sessions,
+            session_max_concurrency=session_max_concurrency,
+            max_connections=max_connections,
+            connect_timeout=connect_timeout,
+            socket_timeout=socket_timeout,
+            max_retry_count=max_retry_count,
+            dns_cache_time=dns_cache_time,
+            proxy_host=proxy_host,
+            proxy_port=proxy_port,
+            bucket_routing=bucket_routing,
+            use_internal_endpoint=use_internal_endpoint,
+            region_endpoints=region_endpoints,
+            output_format=output_format,
+            max_output_bytes=max_output_bytes,
+            resource_buckets=resource_buckets,
+            resource_list_limit=resource_list_limit,
+            async_http=async_http,
+            http2=http2,
+            metrics_enabled=metrics_enabled,
+            metrics_window=metrics_window,
+            metrics_log_interval=metrics_log_interval,
+            metrics_path=metrics_path,
+            hedge_percentiles=hedge_percentiles,
+            hedge_min_delay=hedge_min_delay,
+            read_retries=read_retries,
+            retry_base_delay=retry_base_delay,
+            retry_max_delay=retry_max_delay,
+            retry_budget_ratio=retry_budget_ratio,
+            retry_budget_min_per_second=retry_budget_min_per_second
         )
 
+_config: Optional[TosConfig] = None
+
+def get_config() -> TosConfig:
+    """获取（首次调用时从环境变量加载）全局配置"""
+    global _config
+    if _config is None:
+        _config = TosConfig.from_env()
+    return _config
+
+class _LazyConfig:
+    """全局配置的代理：首次访问属性时才读取环境变量"""
+
+    def __getattr__(self, name: str):
+        return getattr(get_config(), name)
+
 # 全局配置实例
-tos_config = TosConfig.from_env()
\ No newline at end of file
+tos_config = _LazyConfig()
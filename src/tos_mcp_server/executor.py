@@ -0,0 +1,52 @@
+"""
+异步执行层
+
+TOS Python SDK (TosClientV2) 是同步阻塞的，直接在 async 处理器中调用会阻塞整个
+事件循环。这里提供一个有界线程池，所有 SDK 调用都通过 run_sync 调度到工作线程，
+使多个慢请求可以并行执行而不是在事件循环上排队。
+
+与 asyncio.to_thread 一样，run_sync 会把调用方的 contextvars 上下文带到工作线程，
+工作线程中的 SDK 请求因此能计入所属工具调用的指标。
+"""
+
+import asyncio
+import functools
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .config import tos_config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """获取（必要时创建）共享的 SDK 工作线程池"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=tos_config.max_workers,
+            thread_name_prefix="tos-worker"
+        )
+        logger.info(f"TOS 工作线程池已创建，线程数: {tos_config.max_workers}")
+    return _executor
+
+
+async def run_sync(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在工作线程池中执行同步函数并等待结果"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """关闭工作线程池"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
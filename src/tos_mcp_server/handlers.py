@@ -3,24 +3,113 @@ TOS MCP Server 功能处理器
 """
 
 import json
+import time
 import base64
+import bisect
+import asyncio
 import logging
-from typing import Any, Dict, List
+import mimetypes
+from collections import Counter
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+from urllib.parse import quote, unquote, urlsplit
 
-import tos
-from mcp.types import TextContent
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.server.lowlevel.server import request_ctx
+from mcp.types import (BlobResourceContents, ContentBlock, EmbeddedResource, ImageContent, Resource,
+                       ResourceTemplate, TextContent)
 
+from .cache import get_content_cache, get_metadata_cache
+from .client import (ClientProxy, bucket_region, cached_bucket_client, forget_bucket_region, get_async_client,
+                     get_bucket_client, remember_bucket_region, resolve_bucket_region, tos)
 from .config import tos_config
+from .executor import run_sync
+from .metrics import get_metrics, record_error
+from .resilience import call_read, resilience_stats
+from .output import columnar, dumps, fit_to_budget, output_format
+from .transfer import copy_object, download_object, upload_object
 
 logger = logging.getLogger(__name__)
 
-# 初始化 TOS 客户端
-tos_client = tos.TosClientV2(
-    ak=tos_config.access_key,
-    sk=tos_config.secret_key,
-    endpoint=tos_config.endpoint,
-    region=tos_config.region
-)
+T = TypeVar("T")
+
+# 默认地域的 TOS 客户端，首次使用时才创建
+tos_client = ClientProxy()
+
+def _failure(action: str, error: Exception) -> List[TextContent]:
+    """把异常转为“<操作>失败”文本响应，并在指标中记录本次调用的错误类别"""
+    record_error(error)
+    return [TextContent(type="text", text=f"{action}失败: {str(error)}")]
+
+def _brief_error(error: Exception) -> str:
+    """批量结果中单个条目的简短错误描述：TOS 服务端错误只保留状态码、错误码和消息"""
+    if isinstance(error, tos.exceptions.TosServerError):
+        return f"{error.status_code} {error.code}: {error.message}"
+    return str(error)
+
+async def _client_for(bucket_name: str):
+    """返回桶所在地域的客户端，地域尚未解析时在工作线程中 head_bucket"""
+    client = cached_bucket_client(bucket_name)
+    if client is None:
+        client = await run_sync(get_bucket_client, bucket_name)
+    return client
+
+async def _async_client_for(bucket_name: str):
+    """启用 TOS_ASYNC_HTTP 时返回桶所在地域的异步客户端，否则返回 None"""
+    if not tos_config.async_http:
+        return None
+    if not tos_config.bucket_routing:
+        return get_async_client()
+    region = bucket_region(bucket_name)
+    if region is None:
+        region = await run_sync(resolve_bucket_region, bucket_name)
+    return get_async_client(region)
+
+async def _call(bucket_name: str, method: str, *args, **kwargs):
+    """在桶所在地域执行 GET / HEAD / 列举等热点操作：启用异步客户端时直接在事件循环上
+    发送，否则在工作线程中调用 TosClientV2 的同名方法"""
+    async_client = await _async_client_for(bucket_name)
+    if async_client is not None:
+        return await getattr(async_client, method)(bucket_name, *args, **kwargs)
+    client = await _client_for(bucket_name)
+    return await run_sync(getattr(client, method), bucket_name, *args, **kwargs)
+
+async def _read_call(bucket_name: str, method: str, *args, **kwargs):
+    """幂等读操作的 _call：按当前工具的配置对冲或重试（见 resilience）"""
+    return await call_read(method, lambda: _call(bucket_name, method, *args, **kwargs))
+
+async def _read_processed(bucket_name: str, object_key: str, process: str) -> Tuple[Any, bytes]:
+    """以 process 参数 GET 对象（图片 / 视频信息等），在同一个工作线程调用中读完响应体，
+    返回 (响应, 响应体)"""
+    client = await _client_for(bucket_name)
+
+    def _get() -> Tuple[Any, bytes]:
+        resp = client.get_object(bucket_name, object_key, process=process)
+        return resp, resp.read()
+
+    return await call_read(process, lambda: run_sync(_get))
+
+async def _wait_for_object(bucket_name: str, object_key: str, timeout: float = None) -> bool:
+    """轮询 head_object 直到对象出现或超时，返回对象是否已存在"""
+    timeout = tos_config.process_wait_timeout if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while True:
+        try:
+            await _call(bucket_name, "head_object", object_key)
+            return True
+        except tos.exceptions.TosServerError as e:
+            if e.status_code != 404:
+                raise
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, 1.0)
+
+async def _current_etag(bucket_name: str, object_key: str) -> Optional[str]:
+    """HEAD 对象获取当前 ETag，用于校验过期的缓存条目"""
+    resp = await _read_call(bucket_name, "head_object", object_key)
+    return resp.etag
 
 # 桶管理功能实现
 async def create_bucket(args: Dict[str, Any]) -> List[TextContent]:
@@ -29,148 +118,736 @@ async def create_bucket(args: Dict[str, Any]) -> List[TextContent]:
     acl = args.get("acl", "private")
     
     try:
-        tos_client.create_bucket(bucket_name, tos.ACLType.ACL_Private if acl == "private" 
-                                       else tos.ACLType.ACL_Public_Read if acl == "public-read"
-                                       else tos.ACLType.ACL_Public_Read_Write)
+        await run_sync(tos_client.create_bucket, bucket_name,
+                       tos.ACLType.ACL_Private if acl == "private"
+                       else tos.ACLType.ACL_Public_Read if acl == "public-read"
+                       else tos.ACLType.ACL_Public_Read_Write)
+        remember_bucket_region(bucket_name, tos_config.region)
+        get_metadata_cache().invalidate(kind="buckets")
         return [TextContent(type="text", text=f"成功创建存储桶: {bucket_name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"创建存储桶失败: {str(e)}")]
+        return _failure("创建存储桶", e)
 
-async def list_buckets(_args: Dict[str, Any]) -> List[TextContent]:
+async def list_buckets(args: Dict[str, Any]) -> List[TextContent]:
     """列举存储桶"""
-    try:
-        resp = tos_client.list_buckets()
+    async def _load():
+        resp = await run_sync(tos_client.list_buckets)
         buckets = []
         for bucket in resp.buckets:
+            remember_bucket_region(bucket.name, bucket.location)
             buckets.append({
                 "name": bucket.name,
                 "creation_date": str(bucket.creation_date) if bucket.creation_date else None,
                 "location": bucket.location
             })
-        return [TextContent(type="text", text=json.dumps(buckets, indent=2, ensure_ascii=False))]
+        return buckets, None
+
+    try:
+        buckets = await get_metadata_cache().get_or_load("buckets", "", "", _load)
+        fmt = output_format(args)
+        return [TextContent(type="text", text=dumps(columnar(buckets) if fmt == "columnar" else buckets, fmt))]
     except Exception as e:
-        return [TextContent(type="text", text=f"列举存储桶失败: {str(e)}")]
+        return _failure("列举存储桶", e)
 
 async def get_bucket_meta(args: Dict[str, Any]) -> List[TextContent]:
     """获取存储桶元数据"""
     bucket_name = args["bucket_name"]
     
-    try:
-        resp = tos_client.head_bucket(bucket_name)
+    async def _load():
+        client = await _client_for(bucket_name)
+        resp = await run_sync(client.head_bucket, bucket_name)
         meta = {
             "bucket_name": bucket_name,
             "region": resp.region,
             "storage_class": str(resp.storage_class) if resp.storage_class else None
         }
-        return [TextContent(type="text", text=json.dumps(meta, indent=2, ensure_ascii=False))]
+        return meta, None
+
+    try:
+        meta = await get_metadata_cache().get_or_load("bucket_meta", bucket_name, "", _load)
+        return [TextContent(type="text", text=dumps(meta, output_format(args)))]
     except Exception as e:
-        return [TextContent(type="text", text=f"获取存储桶元数据失败: {str(e)}")]
+        return _failure("获取存储桶元数据", e)
 
 async def delete_bucket(args: Dict[str, Any]) -> List[TextContent]:
     """删除存储桶"""
     bucket_name = args["bucket_name"]
     
     try:
-        tos_client.delete_bucket(bucket_name)
+        client = await _client_for(bucket_name)
+        await run_sync(client.delete_bucket, bucket_name)
+        forget_bucket_region(bucket_name)
+        get_metadata_cache().invalidate(bucket=bucket_name)
+        get_metadata_cache().invalidate(kind="buckets")
         return [TextContent(type="text", text=f"成功删除存储桶: {bucket_name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"删除存储桶失败: {str(e)}")]
+        return _failure("删除存储桶", e)
 
 # 对象管理功能实现
 async def put_object(args: Dict[str, Any]) -> List[TextContent]:
-    """上传对象"""
+    """上传对象（大对象自动切换为并发分片上传）"""
     bucket_name = args["bucket_name"]
     object_key = args["object_key"]
-    content = args["content"]
+    content = args.get("content")
+    file_path = args.get("file_path")
     content_type = args.get("content_type", "application/octet-stream")
     is_base64 = args.get("is_base64", False)
+    upload_id = args.get("upload_id")
     
     try:
-        if is_base64:
-            content_bytes = base64.b64decode(content)
-        else:
-            content_bytes = content.encode('utf-8')
+        if (content is None) == (file_path is None):
+            return [TextContent(type="text", text="上传对象失败: content 和 file_path 必须且只能指定一个")]
+
+        content_bytes = None
+        if content is not None:
+            if is_base64:
+                content_bytes = base64.b64decode(content)
+            else:
+                content_bytes = content.encode('utf-8')
             
-        resp = tos_client.put_object(bucket_name, object_key, 
-                                   content=content_bytes, 
-                                   content_type=content_type,
-                                   content_length=len(content_bytes))
-        return [TextContent(type="text", text=f"成功上传对象: {object_key} (ETag: {resp.etag})")]
+        result = await upload_object(await _client_for(bucket_name), bucket_name, object_key,
+                                     data=content_bytes,
+                                     file_path=file_path,
+                                     content_type=content_type,
+                                     upload_id=upload_id,
+                                     async_client=await _async_client_for(bucket_name))
+        get_metadata_cache().invalidate(bucket=bucket_name, key=object_key)
+        if result["mode"] == "multipart":
+            return [TextContent(type="text", text=f"成功上传对象: {object_key} (ETag: {result['etag']}, "
+                                                  f"分片数: {result['part_count']}, 续传分片数: {result['resumed_parts']})")]
+        return [TextContent(type="text", text=f"成功上传对象: {object_key} (ETag: {result['etag']})")]
     except Exception as e:
-        return [TextContent(type="text", text=f"上传对象失败: {str(e)}")]
+        return _failure("上传对象", e)
+
+def _read_body(resp, limit: int, chunk_size: int = 64 * 1024) -> bytes:
+    """按固定大小分块读取响应体，最多读取 limit 字节"""
+    buf = bytearray()
+    while len(buf) < limit:
+        chunk = resp.read(min(chunk_size, limit - len(buf)))
+        if not chunk:
+            break
+        buf += chunk
+    return bytes(buf)
+
+def _parse_total_size(content_range: str, default: int) -> int:
+    """从 Content-Range (bytes start-end/total) 中解析对象总大小"""
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    return default
+
+def _decode_utf8(content: bytes, partial: bool) -> Tuple[Optional[str], int]:
+    """尝试以 UTF-8 解码，返回 (文本, 已解码字节数)，无法解码时文本为 None
+
+    分段读取时允许末尾存在被截断的多字节字符，截断部分留给下一段读取。
+    """
+    try:
+        return content.decode('utf-8'), len(content)
+    except UnicodeDecodeError as e:
+        if partial and e.reason == "unexpected end of data" and e.start > 0 and e.start >= len(content) - 3:
+            try:
+                return content[:e.start].decode('utf-8'), e.start
+            except UnicodeDecodeError:
+                pass
+        return None, 0
+
+async def _fetch_range(bucket_name: str, object_key: str, range_start: int,
+                       range_end: int) -> Tuple[bytes, int, Any]:
+    """读取对象的 [range_start, range_end] 字节，返回 (内容, 对象总大小, 响应元数据)
+
+    启用内容缓存时，已缓存的对象以 If-None-Match 发起条件请求，304 时直接读取缓存文件；
+    从 0 开始完整读到的小对象会写入缓存。
+    """
+    content_cache = get_content_cache()
+    cached = await run_sync(content_cache.lookup, bucket_name, object_key) if content_cache.enabled else None
+    if_none_match = cached.etag if cached else None
+    async_client = await _async_client_for(bucket_name)
+    client = await _client_for(bucket_name) if async_client is None else None
+
+    def _get_blocking():
+        resp = client.get_object(bucket_name, object_key, range_start=range_start, range_end=range_end,
+                                 if_none_match=if_none_match)
+        return resp, _read_body(resp, range_end - range_start + 1)
+
+    async def _get():
+        if async_client is None:
+            # GET 与读取响应体放在同一次工作线程调用中，被对冲取消时也不会遗留未读完的连接
+            return await run_sync(_get_blocking)
+        resp = await async_client.get_object(bucket_name, object_key, range_start=range_start,
+                                             range_end=range_end, if_none_match=if_none_match)
+        # 异步客户端的响应体已读入内存，无需切换到工作线程
+        return resp, _read_body(resp, range_end - range_start + 1)
+
+    try:
+        resp, content = await call_read("get_object", _get)
+        object_size = _parse_total_size(resp.content_range, resp.content_length)
+    except tos.exceptions.TosServerError as e:
+        if e.status_code == 304 and cached is not None:
+            if range_start > 0 and range_start >= cached.content_length:
+                raise ValueError(f"读取起始位置 {range_start} 超出对象大小 {cached.content_length}")
+            content = await run_sync(content_cache.read, cached, range_start, range_end)
+            return content, cached.content_length, cached
+        if e.status_code == 404 and cached is not None:
+            await run_sync(content_cache.invalidate, bucket_name, object_key)
+        if e.status_code != 416:
+            raise
+        # 范围超出对象大小，range_start 为 0 时说明是空对象
+        head = await _read_call(bucket_name, "head_object", object_key)
+        if range_start > 0:
+            raise ValueError(f"读取起始位置 {range_start} 超出对象大小 {head.content_length}")
+        return b"", head.content_length, head
+
+    if content_cache.enabled:
+        await run_sync(content_cache.record_miss)
+        stored = False
+        if range_start == 0 and len(content) == object_size:
+            stored = await run_sync(content_cache.store, bucket_name, object_key, resp.etag, resp.content_type,
+                                    str(resp.last_modified) if resp.last_modified else None, content)
+        if not stored and cached is not None and resp.etag != cached.etag:
+            # 条件请求返回 200 说明对象已变化，丢弃过期条目，避免之后的读取一直带着失效的 ETag
+            await run_sync(content_cache.invalidate, bucket_name, object_key)
+    return content, object_size, resp
+
+def _object_uri(bucket_name: str, object_key: str) -> str:
+    """对象的资源 URI: tos://bucket/key"""
+    return f"tos://{bucket_name}/{quote(object_key)}"
+
+def _parse_object_uri(uri: str) -> Tuple[str, str]:
+    """解析 tos://bucket/key 形式的资源 URI"""
+    parts = urlsplit(str(uri))
+    key = unquote(parts.path.lstrip("/"))
+    if parts.scheme != "tos" or not parts.netloc or not key:
+        raise ValueError(f"无效的资源 URI: {uri}，应为 tos://bucket/key")
+    return parts.netloc, key
+
+def _binary_content(bucket_name: str, object_key: str, content: bytes, content_type: Optional[str],
+                    range_start: int, object_size: int, last: int, fmt: str) -> List[ContentBlock]:
+    """二进制内容以 MCP 原生内容块返回：完整的图片为 ImageContent，其余为 EmbeddedResource
 
-async def get_object(args: Dict[str, Any]) -> List[TextContent]:
-    """下载对象"""
+    元数据（范围、游标等）放在前面的 TextContent 中，内容只做一次 base64 编码。
+    """
+    content_type = content_type or "application/octet-stream"
+    if tos_config.max_output_bytes > 0:
+        # base64 每 3 字节编码为 4 个字符，为元数据预留 1 KiB
+        content = content[:max(0, tos_config.max_output_bytes - 1024) // 4 * 3]
+    next_start = range_start + len(content)
+    is_truncated = next_start <= last
+    is_image = content_type.startswith("image/") and range_start == 0 and not is_truncated
+    uri = _object_uri(bucket_name, object_key)
+
+    result = {
+        "uri": uri,
+        "content_type": content_type,
+        "content_length": len(content),
+        "object_size": object_size,
+        "range_start": range_start,
+        "range_end": next_start - 1,
+        "encoding": "image" if is_image else "resource",
+        "is_truncated": is_truncated
+    }
+    if is_truncated:
+        result["next_range_start"] = next_start
+
+    data = base64.b64encode(content).decode("ascii")
+    if is_image:
+        block = ImageContent(type="image", data=data, mimeType=content_type)
+    else:
+        block = EmbeddedResource(type="resource",
+                                 resource=BlobResourceContents(uri=uri, mimeType=content_type, blob=data))
+    return [TextContent(type="text", text=dumps(result, fmt)), block]
+
+async def get_object(args: Dict[str, Any]) -> List[ContentBlock]:
+    """下载对象（支持按范围分段读取），二进制内容以图片或内嵌资源返回"""
     bucket_name = args["bucket_name"]
     object_key = args["object_key"]
     return_as_base64 = args.get("return_as_base64", False)
+    range_start = args.get("range_start", 0)
+    range_end = args.get("range_end")
+    max_bytes = args.get("max_bytes", tos_config.max_response_bytes)
+    fmt = output_format(args)
     
     try:
-        resp = tos_client.get_object(bucket_name, object_key)
-        content = resp.read()
-        
-        if return_as_base64:
-            content_str = base64.b64encode(content).decode('utf-8')
+        if range_start < 0 or max_bytes <= 0 or (range_end is not None and range_end < range_start):
+            return [TextContent(type="text", text="下载对象失败: 无效的读取范围")]
+
+        # 单次最多读取 max_bytes，剩余部分通过 next_range_start 继续读取；
+        # 响应文本不小于内容字节数，因此也不必读取超过输出预算的字节
+        if tos_config.max_output_bytes > 0:
+            max_bytes = min(max_bytes, tos_config.max_output_bytes)
+        request_end = range_start + max_bytes - 1
+        if range_end is not None:
+            request_end = min(request_end, range_end)
+
+        content, object_size, meta = await _fetch_range(bucket_name, object_key, range_start, request_end)
+        content_type = meta.content_type
+        last = object_size - 1 if range_end is None else min(range_end, object_size - 1)
+
+        # 无法按 UTF-8 解码的内容直接作为二进制内容块返回，不再嵌入 JSON 字符串
+        if not return_as_base64 and content and \
+                _decode_utf8(content, range_start + len(content) <= last)[0] is None:
+            return _binary_content(bucket_name, object_key, content, content_type,
+                                   range_start, object_size, last, fmt)
+
+        def _render(length: int) -> str:
+            chunk = content[:length]
+            next_start = range_start + len(chunk)
+            is_truncated = next_start <= last
+
+            encoding = "base64"
+            if not return_as_base64:
+                content_str, decoded = _decode_utf8(chunk, is_truncated)
+                if content_str is not None:
+                    encoding = "utf-8"
+                    # 截断处可能切断多字节字符，游标回退到完整字符的结尾
+                    next_start = range_start + decoded
+                    is_truncated = next_start <= last
+            if encoding == "base64":
+                content_str = base64.b64encode(chunk).decode('utf-8')
+
             result = {
                 "content": content_str,
-                "content_type": resp.content_type,
-                "content_length": resp.content_length,
-                "encoding": "base64"
+                "content_type": content_type,
+                "content_length": next_start - range_start,
+                "object_size": object_size,
+                "range_start": range_start,
+                "range_end": next_start - 1,
+                "encoding": encoding,
+                "is_truncated": is_truncated
             }
-        else:
-            try:
-                content_str = content.decode('utf-8')
-                result = {
-                    "content": content_str,
-                    "content_type": resp.content_type,
-                    "content_length": resp.content_length,
-                    "encoding": "utf-8"
-                }
-            except UnicodeDecodeError:
-                content_str = base64.b64encode(content).decode('utf-8')
-                result = {
-                    "content": content_str,
-                    "content_type": resp.content_type,
-                    "content_length": resp.content_length,
-                    "encoding": "base64"
-                }
-        
-        return [TextContent(type="text", text=json.dumps(result, indent=2, ensure_ascii=False))]
+            if is_truncated:
+                result["next_range_start"] = next_start
+            return dumps(result, fmt)
+
+        # 超出输出预算时按字节截断内容，剩余部分同样通过 next_range_start 继续读取
+        _, text = fit_to_budget(len(content), _render)
+        return [TextContent(type="text", text=text)]
+    except Exception as e:
+        return _failure("下载对象", e)
+
+async def batch_get(args: Dict[str, Any]) -> List[TextContent]:
+    """批量获取多个对象的元数据或内容（并发 HEAD/GET，合并为一次响应）"""
+    bucket_name = args["bucket_name"]
+    object_keys = args["object_keys"]
+    include_content = args.get("include_content", False)
+    max_bytes = args.get("max_bytes_per_object", 64 * 1024)
+    max_total_bytes = args.get("max_total_bytes", tos_config.max_response_bytes)
+    return_as_base64 = args.get("return_as_base64", False)
+    concurrency = args.get("concurrency", 16)
+    
+    try:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _fetch(key: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    if include_content:
+                        content, size, meta = await _fetch_range(bucket_name, key, 0, max_bytes - 1)
+                    else:
+                        meta = await _read_call(bucket_name, "head_object", key)
+                        content, size = None, meta.content_length
+                except Exception as e:
+                    return {"key": key, "status": "error", "error": _brief_error(e)}
+            item = {
+                "key": key,
+                "status": "ok",
+                "size": size,
+                "content_type": meta.content_type,
+                "etag": meta.etag,
+                "last_modified": str(meta.last_modified) if meta.last_modified else None
+            }
+            if content is not None:
+                item["_content"] = content
+                item["is_truncated"] = len(content) < size
+            return item
+
+        items = await asyncio.gather(*(_fetch(key) for key in object_keys))
+
+        # 按输入顺序累计内容大小，超出总预算的对象只返回元数据
+        budget = max_total_bytes
+        with_content = []
+        for item in items:
+            content = item.pop("_content", None)
+            if content is None:
+                continue
+            if len(content) > budget:
+                item["content_omitted"] = True
+                continue
+            budget -= len(content)
+            text = None if return_as_base64 else _decode_utf8(content, item["is_truncated"])[0]
+            if text is not None:
+                item["content"], item["encoding"] = text, "utf-8"
+            else:
+                item["content"], item["encoding"] = base64.b64encode(content).decode('utf-8'), "base64"
+            with_content.append(item)
+
+        fmt = output_format(args)
+
+        def _render(kept: int) -> str:
+            # 超出输出预算时，排在后面的对象去掉内容，只保留元数据
+            omitted = {id(item) for item in with_content[kept:]}
+            objects = [item if id(item) not in omitted else
+                       dict({k: v for k, v in item.items() if k not in ("content", "encoding")}, content_omitted=True)
+                       for item in items]
+            return dumps({
+                "bucket": bucket_name,
+                "count": len(items),
+                "errors": sum(1 for item in items if item["status"] == "error"),
+                "objects": objects
+            }, fmt)
+
+        _, text = fit_to_budget(len(with_content), _render)
+        return [TextContent(type="text", text=text)]
     except Exception as e:
-        return [TextContent(type="text", text=f"下载对象失败: {str(e)}")]
+        return _failure("批量获取对象", e)
+
+async def download_object_to_file(args: Dict[str, Any]) -> List[TextContent]:
+    """并发分段下载对象到本地文件"""
+    bucket_name = args["bucket_name"]
+    object_key = args["object_key"]
+    file_path = args["file_path"]
+    
+    try:
+        result = await download_object(await _client_for(bucket_name), bucket_name, object_key, file_path)
+        return [TextContent(type="text", text=dumps(result, output_format(args)))]
+    except Exception as e:
+        return _failure("下载对象到本地", e)
+
+def _object_entry(obj) -> Dict[str, Any]:
+    """将列举结果中的对象转换为输出字典"""
+    return {
+        "key": obj.key,
+        "last_modified": str(obj.last_modified) if obj.last_modified else None,
+        "size": obj.size,
+        "etag": obj.etag,
+        "storage_class": str(obj.storage_class) if obj.storage_class else None
+    }
+
+async def _iter_list_pages(bucket_name: str, prefix: str, delimiter: str,
+                           continuation_token: Optional[str] = None,
+                           limit: Optional[int] = None,
+                           page_size: int = 1000,
+                           start_after: Optional[str] = None) -> AsyncIterator[Any]:
+    """流水线式分页列举：调用方处理当前页时，下一页已在工作线程中预取
+
+    limit 限制返回的对象与公共前缀总数，每页的 max_keys 会按剩余数量收紧，
+    因此最后一页的 next_continuation_token 可以准确地续列。
+    """
+    def _fetch(token: Optional[str], max_keys: int):
+        return _read_call(bucket_name, "list_objects_type2",
+                          prefix=prefix, delimiter=delimiter,
+                          continuation_token=token, start_after=start_after if token is None else None,
+                          max_keys=max_keys, list_only_once=True)
+
+    remaining = limit
+    task = asyncio.ensure_future(_fetch(continuation_token, page_size if remaining is None else min(page_size, remaining)))
+    try:
+        while task is not None:
+            resp = await task
+            task = None
+            if remaining is not None:
+                remaining -= len(resp.contents) + len(resp.common_prefixes)
+            if resp.is_truncated and (remaining is None or remaining > 0):
+                task = asyncio.ensure_future(_fetch(resp.next_continuation_token,
+                                                    page_size if remaining is None else min(page_size, remaining)))
+            yield resp
+    finally:
+        if task is not None:
+            task.cancel()
 
 async def list_objects(args: Dict[str, Any]) -> List[TextContent]:
-    """列举对象"""
+    """列举对象（支持续列和自动翻页）"""
     bucket_name = args["bucket_name"]
     prefix = args.get("prefix", "")
     delimiter = args.get("delimiter", "")
     max_keys = args.get("max_keys", 1000)
+    continuation_token = args.get("continuation_token")
+    start_after = args.get("start_after")
+    all_pages = args.get("all_pages", False)
+    limit = args.get("limit", 100000)
+    # 自动翻页模式下结果可能很大，默认使用紧凑格式输出
+    fmt = output_format(args, "compact" if all_pages and tos_config.output_format == "pretty" else None)
     
     try:
-        resp = tos_client.list_objects_type2(bucket_name, prefix=prefix, delimiter=delimiter, max_keys=max_keys)
-        
         result = {
             "objects": [],
             "common_prefixes": [],
-            "is_truncated": resp.is_truncated,
-            "next_continuation_token": resp.next_continuation_token
+            "is_truncated": False,
+            "next_continuation_token": None
         }
-        
-        for obj in resp.contents:
-            result["objects"].append({
-                "key": obj.key,
-                "last_modified": str(obj.last_modified) if obj.last_modified else None,
-                "size": obj.size,
-                "etag": obj.etag,
-                "storage_class": str(obj.storage_class) if obj.storage_class else None
-            })
-            
-        for prefix in resp.common_prefixes:
-            result["common_prefixes"].append(prefix.prefix)
-        
-        return [TextContent(type="text", text=json.dumps(result, indent=2, ensure_ascii=False))]
+
+        if not all_pages:
+            limit = max_keys
+        page_count = 0
+        async for resp in _iter_list_pages(bucket_name, prefix, delimiter, continuation_token,
+                                           limit=limit, page_size=min(max_keys, 1000),
+                                           start_after=start_after):
+            page_count += 1
+            result["objects"].extend(_object_entry(obj) for obj in resp.contents)
+            result["common_prefixes"].extend(p.prefix for p in resp.common_prefixes)
+            result["is_truncated"] = resp.is_truncated
+            result["next_continuation_token"] = resp.next_continuation_token
+
+        if all_pages:
+            result["page_count"] = page_count
+            result["key_count"] = len(result["objects"]) + len(result["common_prefixes"])
+
+        objects, prefixes = result["objects"], result["common_prefixes"]
+        count = len(objects) + len(prefixes)
+        names = sorted([obj["key"] for obj in objects] + prefixes) if tos_config.max_output_bytes > 0 else []
+
+        def _render(kept: int) -> str:
+            output = dict(result)
+            if kept < count:
+                # 超出输出预算：只保留按字典序排在前面的 kept 个对象与公共前缀，
+                # 通过 next_start_after 从截断处继续列举
+                last = names[kept - 1] if kept else None
+                output["objects"] = [obj for obj in objects if last is not None and obj["key"] <= last]
+                output["common_prefixes"] = [p for p in prefixes if last is not None and p <= last]
+                output["is_truncated"] = True
+                output["output_truncated"] = True
+                if last is None:
+                    output["next_continuation_token"] = continuation_token
+                    output["next_start_after"] = start_after
+                else:
+                    output["next_continuation_token"] = None
+                    # 截断在公共前缀处时跳过该前缀下的全部对象
+                    output["next_start_after"] = last + "\U0010ffff" if last in prefixes else last
+                if all_pages:
+                    output["key_count"] = len(output["objects"]) + len(output["common_prefixes"])
+            if fmt == "columnar":
+                output["objects"] = columnar(output["objects"])
+            return dumps(output, fmt)
+
+        _, text = fit_to_budget(count, _render)
+        return [TextContent(type="text", text=text)]
+    except Exception as e:
+        return _failure("列举对象", e)
+
+# 按分隔符发现分片时最多接受的直接对象数，超过时说明前缀下的对象较为扁平，改为按键区间切分
+_DISCOVERY_DIRECT_LIMIT = 1000
+# 按键区间切分时，每个并发槽位对应的分片数（分片多于并发数时，先完成的槽位继续处理剩余分片）
+_SHARDS_PER_SLOT = 4
+# 采样键区间时最多进行的探测轮数（每轮对所有未细分的区间并发探测一次）
+_MAX_PROBE_ROUNDS = 24
+
+def _new_scan_stats() -> Dict[str, Any]:
+    return {"object_count": 0, "total_size": 0, "objects": []}
+
+def _add_scan_objects(stats: Dict[str, Any], objects: List[Any], max_objects: int) -> None:
+    """累计对象数与大小，只保留键名最小的 max_objects 个对象"""
+    for obj in objects:
+        stats["object_count"] += 1
+        stats["total_size"] += obj.size or 0
+    stats["objects"].extend(objects)
+    if len(stats["objects"]) > 2 * max_objects:
+        stats["objects"] = sorted(stats["objects"], key=lambda o: o.key)[:max_objects]
+
+async def _discover_delimiter_shards(bucket_name: str, prefix: str, delimiter: str, parallelism: int,
+                                     max_objects: int, max_depth: int = 2
+                                     ) -> Tuple[Optional[List[str]], Dict[str, Any]]:
+    """按分隔符逐层发现公共前缀作为分片，返回 (分片前缀列表, 直接位于各层前缀下的对象统计)
+
+    发现的前缀少于 parallelism，或直接对象超过 _DISCOVERY_DIRECT_LIMIT 时返回 None 作为
+    分片列表，由调用方改为按键区间切分，避免在此串行列举扁平前缀下的全部对象。
+    """
+    shards = [prefix]
+    direct = _new_scan_stats()
+    for _ in range(max_depth):
+        expanded = []
+        for shard in shards:
+            async for resp in _iter_list_pages(bucket_name, shard, delimiter):
+                _add_scan_objects(direct, resp.contents, max_objects)
+                if direct["object_count"] > _DISCOVERY_DIRECT_LIMIT:
+                    return None, direct
+                expanded.extend(p.prefix for p in resp.common_prefixes)
+        shards = expanded
+        # 分片数量足够或已无法继续细分时停止
+        if len(shards) >= parallelism or not shards:
+            break
+    if len(shards) < parallelism:
+        return None, direct
+    return sorted(shards), direct
+
+def _key_midpoint(low: str, high: str, prefix: str, alphabet: str) -> Optional[str]:
+    """把 prefix 之后的部分视为以 alphabet（有序字符表）中的字符为数字的定长数，返回 low 与 high
+    的中点，两者之间无法再细分时返回 None。不在字符表中的字符按不大于它的最近字符计算"""
+    base = len(alphabet)
+    width = max(len(low), len(high)) - len(prefix) + 1
+
+    def _to_int(key: str) -> int:
+        value = 0
+        for ch in key[len(prefix):].ljust(width, alphabet[0])[:width]:
+            value = value * base + max(0, bisect.bisect_right(alphabet, ch) - 1)
+        return value
+
+    a, b = _to_int(low), _to_int(high)
+    if b - a <= 1:
+        return None
+    mid = (a + b) // 2
+    digits = []
+    for _ in range(width):
+        mid, digit = divmod(mid, base)
+        digits.append(alphabet[digit])
+    return prefix + "".join(reversed(digits))
+
+async def _sample_range_shards(bucket_name: str, prefix: str, shard_count: int, max_objects: int
+                               ) -> Tuple[List[Tuple[Optional[str], Optional[str]]], Dict[str, Any]]:
+    """从实际存在的键中采样区间边界，返回 ([(start_after, end_at), ...], 第一页对象统计)
+
+    先列举第一页：未截断时无需分片。否则先逐字符探测剩余键的公共前缀（如日期目录），
+    再以第一页出现过的字符为数字把公共前缀之后的键空间视为数轴，对每个区间的中点以
+    start_after 探测（max_keys=1）下一个真实存在的键，逐轮二分直到采到足够的键；分片
+    边界取自这些真实键，因此数字、十六进制等键名也能切分均匀。
+    第一页的对象作为直接对象返回，各分片从第一页的最后一个键之后开始。
+    """
+    direct = _new_scan_stats()
+    first = await _read_call(bucket_name, "list_objects_type2", prefix=prefix, delimiter="",
+                             max_keys=1000, list_only_once=True)
+    _add_scan_objects(direct, first.contents, max_objects)
+    if not first.is_truncated or not first.contents:
+        return [], direct
+    last = first.contents[-1].key
+    semaphore = asyncio.Semaphore(shard_count)
+
+    async def _probe(after: str) -> Optional[str]:
+        async with semaphore:
+            resp = await _read_call(bucket_name, "list_objects_type2", prefix=prefix, delimiter="",
+                                    start_after=after, max_keys=1, list_only_once=True)
+        return resp.contents[0].key if resp.contents else None
+
+    following = await _probe(last)
+    if following is None:
+        return [(last, None)], direct
+    # 剩余的键都以 common 开头：下一个字符之后再无其他键时把该字符并入公共前缀
+    common = prefix
+    while len(common) < len(following):
+        char = following[len(common)]
+        if await _probe(common + char + "\U0010ffff") is not None:
+            break
+        common += char
+
+    chars = {ch for obj in first.contents for ch in obj.key[len(prefix):]}
+    chars.update(following[len(common):])
+    alphabet = "".join(sorted(chars))
+    if len(alphabet) < 2:
+        alphabet = alphabet + "\U0010ffff"
+    width = max(len(following), max(len(obj.key) for obj in first.contents)) - len(common) + 1
+    end = common + alphabet[-1] * width
+
+    samples = {following}
+    # 待细分的区间 (下界, 上界)：区间内的键尚未探测
+    intervals = [(last if last.startswith(common) else common, end)]
+    for _ in range(_MAX_PROBE_ROUNDS):
+        if len(samples) >= shard_count or not intervals:
+            break
+        mids = [_key_midpoint(low, high, common, alphabet) for low, high in intervals]
+        probes = [(interval, mid) for interval, mid in zip(intervals, mids) if mid is not None]
+        found = await asyncio.gather(*(_probe(mid) for _, mid in probes))
+        intervals = []
+        for ((low, high), mid), key in zip(probes, found):
+            intervals.append((low, mid))
+            if key is not None and key <= high:
+                samples.add(key)
+                # (mid, key) 之间没有对象
+                intervals.append((key, high))
+
+    ordered = sorted(samples)
+    step = max(1, len(ordered) / max(1, shard_count - 1))
+    bounds = sorted({ordered[int(i * step)] for i in range(shard_count - 1) if int(i * step) < len(ordered)})
+    ranges: List[Tuple[Optional[str], Optional[str]]] = []
+    lower: Optional[str] = last
+    for upper in bounds + [None]:
+        ranges.append((lower, upper))
+        lower = upper
+    return ranges, direct
+
+async def scan_prefix(args: Dict[str, Any]) -> List[TextContent]:
+    """并行分片扫描前缀下的全部对象，返回有序结果与汇总统计"""
+    bucket_name = args["bucket_name"]
+    prefix = args.get("prefix", "")
+    strategy = args.get("strategy", "delimiter")
+    delimiter = args.get("delimiter", "/")
+    parallelism = args.get("parallelism", 16)
+    max_objects = args.get("max_objects", 1000)
+    
+    try:
+        start = time.monotonic()
+        # 每个分片: (描述, 列举前缀, start_after, 上界)
+        shards: List[Tuple[Dict[str, Any], str, Optional[str], Optional[str]]] = []
+        if strategy not in ("delimiter", "start_after"):
+            return [TextContent(type="text", text=f"不支持的分片策略: {strategy}")]
+        used_strategy = strategy
+        prefixes = None
+        if strategy == "delimiter":
+            prefixes, direct = await _discover_delimiter_shards(bucket_name, prefix, delimiter, parallelism,
+                                                                max_objects)
+        if prefixes is not None:
+            shards = [({"prefix": p}, p, None, None) for p in prefixes]
+        else:
+            # 公共前缀不足以并行时改为按采样的键区间切分
+            used_strategy = "start_after"
+            ranges, direct = await _sample_range_shards(bucket_name, prefix, parallelism * _SHARDS_PER_SLOT,
+                                                        max_objects)
+            shards = [({"start_after": lower, "end_at": upper}, prefix, lower, upper) for lower, upper in ranges]
+
+        semaphore = asyncio.Semaphore(parallelism)
+
+        async def _scan(shard: Tuple[Dict[str, Any], str, Optional[str], Optional[str]]) -> Dict[str, Any]:
+            _, shard_prefix, start_after, upper = shard
+            stats = _new_scan_stats()
+            async with semaphore:
+                async for resp in _iter_list_pages(bucket_name, shard_prefix, "", start_after=start_after):
+                    contents = resp.contents
+                    if upper is not None and contents and contents[-1].key > upper:
+                        _add_scan_objects(stats, [obj for obj in contents if obj.key <= upper], max_objects)
+                        return stats
+                    _add_scan_objects(stats, contents, max_objects)
+            return stats
+
+        shard_stats = await asyncio.gather(*(_scan(shard) for shard in shards))
+
+        # 分片互不相交，每个分片保留了自身有序的前 max_objects 个对象，
+        # 合并排序后截取即为全局有序的前 max_objects 个对象
+        merged = list(direct["objects"])
+        for stats in shard_stats:
+            merged.extend(stats["objects"])
+        merged.sort(key=lambda obj: obj.key)
+        object_count = direct["object_count"] + sum(st["object_count"] for st in shard_stats)
+        total_size = direct["total_size"] + sum(st["total_size"] for st in shard_stats)
+
+        result = {
+            "bucket": bucket_name,
+            "prefix": prefix,
+            "strategy": used_strategy,
+            "shard_count": len(shards),
+            "object_count": object_count,
+            "total_size": total_size,
+            "elapsed_seconds": round(time.monotonic() - start, 3),
+            "objects": [_object_entry(obj) for obj in merged[:max_objects]],
+            "objects_truncated": object_count > max_objects,
+            "shards": [
+                dict(shard[0], object_count=st["object_count"], total_size=st["total_size"])
+                for shard, st in zip(shards, shard_stats)
+            ]
+        }
+        # 扫描结果可能很大，默认使用紧凑格式输出
+        fmt = output_format(args, "compact" if tos_config.output_format == "pretty" else None)
+        objects = result["objects"]
+
+        def _render(kept: int) -> str:
+            output = dict(result, objects=objects[:kept])
+            if kept < len(objects):
+                output["objects_truncated"] = True
+                output["output_truncated"] = True
+            if fmt == "columnar":
+                output["objects"] = columnar(output["objects"])
+            return dumps(output, fmt)
+
+        _, text = fit_to_budget(len(objects), _render)
+        return [TextContent(type="text", text=text)]
     except Exception as e:
-        return [TextContent(type="text", text=f"列举对象失败: {str(e)}")]
+        return _failure("扫描前缀", e)
 
 async def delete_object(args: Dict[str, Any]) -> List[TextContent]:
     """删除对象"""
@@ -178,10 +855,265 @@ async def delete_object(args: Dict[str, Any]) -> List[TextContent]:
     object_key = args["object_key"]
     
     try:
-        tos_client.delete_object(bucket_name, object_key)
+        client = await _client_for(bucket_name)
+        await run_sync(client.delete_object, bucket_name, object_key)
+        get_metadata_cache().invalidate(bucket=bucket_name, key=object_key)
         return [TextContent(type="text", text=f"成功删除对象: {object_key}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"删除对象失败: {str(e)}")]
+        return _failure("删除对象", e)
+
+async def delete_objects(args: Dict[str, Any]) -> List[TextContent]:
+    """批量删除对象（按键列表或前缀），每批最多 1000 个键并发提交"""
+    bucket_name = args["bucket_name"]
+    object_keys = args.get("object_keys")
+    prefix = args.get("prefix")
+    dry_run = args.get("dry_run", False)
+    concurrency = args.get("concurrency", 8)
+    
+    try:
+        if (object_keys is None) == (prefix is None):
+            return [TextContent(type="text", text="批量删除对象失败: object_keys 和 prefix 必须且只能指定一个")]
+
+        result = {
+            "bucket": bucket_name,
+            "dry_run": dry_run,
+            "matched": 0,
+            "deleted": 0,
+            "failed": 0,
+            "batches": 0,
+            "failures": []
+        }
+        max_failures = 1000
+        client = await _client_for(bucket_name)
+
+        def _record_failure(key: str, code: str, message: str):
+            result["failed"] += 1
+            if len(result["failures"]) < max_failures:
+                result["failures"].append({"key": key, "code": code, "message": message})
+
+        async def _delete_batch(keys: List[str]):
+            try:
+                resp = await run_sync(client.delete_multi_objects, bucket_name,
+                                      [tos.models2.ObjectTobeDeleted(key=key) for key in keys],
+                                      quiet=True)
+            except Exception as e:
+                for key in keys:
+                    _record_failure(key, type(e).__name__, str(e))
+                return
+            finally:
+                for key in keys:
+                    get_metadata_cache().invalidate(bucket=bucket_name, key=key)
+            for err in resp.error:
+                _record_failure(err.key, err.code, err.message)
+            result["deleted"] += len(keys) - len(resp.error)
+
+        async def _batches() -> AsyncIterator[List[str]]:
+            if object_keys is not None:
+                unique = list(dict.fromkeys(object_keys))
+                for i in range(0, len(unique), 1000):
+                    yield unique[i:i + 1000]
+                return
+            async for resp in _iter_list_pages(bucket_name, prefix, ""):
+                if resp.contents:
+                    yield [obj.key for obj in resp.contents]
+
+        async def _counted_batches() -> AsyncIterator[List[str]]:
+            async for keys in _batches():
+                result["matched"] += len(keys)
+                result["batches"] += 1
+                if not dry_run:
+                    yield keys
+
+        # 列举与删除流水线执行：每拿到一批键就提交删除，进行中的批次数受 concurrency 限制
+        await _run_bounded(_counted_batches(), _delete_batch, concurrency)
+
+        if dry_run:
+            del result["deleted"], result["failed"], result["failures"]
+        return [TextContent(type="text", text=dumps(result, output_format(args)))]
+    except Exception as e:
+        return _failure("批量删除对象", e)
+
+async def _report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None):
+    """向客户端发送进度通知（仅当请求携带 progressToken 时）"""
+    try:
+        ctx = request_ctx.get()
+    except LookupError:
+        return
+    token = ctx.meta.progressToken if ctx.meta else None
+    if token is None:
+        return
+    try:
+        await ctx.session.send_progress_notification(token, progress, total, message=message)
+    except Exception as e:
+        logger.debug(f"发送进度通知失败: {str(e)}")
+
+async def _run_bounded(items: AsyncIterable[T], worker: Callable[[T], Awaitable[None]], concurrency: int,
+                       progress: Optional[Callable[[], Tuple[float, float, str]]] = None,
+                       interval: float = 0.5) -> None:
+    """边迭代边执行：每取到一个条目就提交 worker，同时进行中的 worker 数不超过 concurrency
+
+    worker 应自行处理异常。progress 返回 (已完成数, 总数, 消息)，每个 worker 结束后最多每
+    interval 秒发送一次进度通知，迭代结束前总数尚未确定，不随通知发送；全部完成后再发送一次。
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = set()
+    items_done = False
+    last_report = 0.0
+
+    async def _report(force: bool = False):
+        nonlocal last_report
+        now = time.monotonic()
+        if progress is None or (not force and now - last_report < interval):
+            return
+        last_report = now
+        done, total, message = progress()
+        await _report_progress(done, total if items_done else None, message)
+
+    async def _run(item: T):
+        try:
+            await worker(item)
+        finally:
+            semaphore.release()
+        await _report()
+
+    async for item in items:
+        await semaphore.acquire()
+        task = asyncio.ensure_future(_run(item))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    items_done = True
+    await asyncio.gather(*tasks)
+    await _report(force=True)
+
+async def copy_single_object(args: Dict[str, Any]) -> List[TextContent]:
+    """服务端复制（或移动）单个对象"""
+    src_bucket = args["src_bucket"]
+    src_key = args["src_key"]
+    dst_bucket = args.get("dst_bucket", src_bucket)
+    dst_key = args["dst_key"]
+    delete_source = args.get("delete_source", False)
+    
+    try:
+        if src_bucket == dst_bucket and src_key == dst_key:
+            return [TextContent(type="text", text="复制对象失败: 源对象与目标对象相同")]
+        src_client = await _client_for(src_bucket)
+        dst_client = await _client_for(dst_bucket)
+        result = await copy_object(dst_client, src_bucket, src_key, dst_bucket, dst_key, src_client=src_client)
+        get_metadata_cache().invalidate(bucket=dst_bucket, key=dst_key)
+        if delete_source:
+            await run_sync(src_client.delete_object, src_bucket, src_key)
+            get_metadata_cache().invalidate(bucket=src_bucket, key=src_key)
+        result = {
+            "src_bucket": src_bucket,
+            "src_key": src_key,
+            "dst_bucket": dst_bucket,
+            "dst_key": dst_key,
+            "source_deleted": delete_source,
+            **result
+        }
+        return [TextContent(type="text", text=dumps(result, output_format(args)))]
+    except Exception as e:
+        return _failure("复制对象", e)
+
+async def copy_prefix(args: Dict[str, Any]) -> List[TextContent]:
+    """服务端批量复制（或移动）前缀下的所有对象，列举与复制流水线并发执行"""
+    src_bucket = args["src_bucket"]
+    src_prefix = args.get("src_prefix", "")
+    dst_bucket = args.get("dst_bucket", src_bucket)
+    dst_prefix = args.get("dst_prefix", "")
+    delete_source = args.get("delete_source", False)
+    concurrency = args.get("concurrency", 16)
+    
+    try:
+        # 同桶时两个前缀只要相互包含，列举就可能读到刚写入的对象，移动时还可能删掉它们
+        if src_bucket == dst_bucket and (dst_prefix.startswith(src_prefix) or src_prefix.startswith(dst_prefix)):
+            return [TextContent(type="text", text="批量复制对象失败: 同桶复制时源前缀与目标前缀不能相互包含")]
+
+        start_time = time.monotonic()
+        result = {
+            "src_bucket": src_bucket,
+            "src_prefix": src_prefix,
+            "dst_bucket": dst_bucket,
+            "dst_prefix": dst_prefix,
+            "delete_source": delete_source,
+            "matched": 0,
+            "copied": 0,
+            "failed": 0,
+            "bytes": 0,
+            "failures": []
+        }
+        if delete_source:
+            result["deleted"] = 0
+            result["delete_failed"] = 0
+            result["delete_failures"] = []
+        max_failures = 1000
+        to_delete: List[str] = []
+        src_client = await _client_for(src_bucket)
+        dst_client = await _client_for(dst_bucket)
+
+        def _record_failure(key: str, message: str):
+            result["failed"] += 1
+            if len(result["failures"]) < max_failures:
+                result["failures"].append({"key": key, "message": message})
+
+        def _record_delete_failure(key: str, message: str):
+            # 复制已经成功的对象只计入删除失败，不重复计入复制失败
+            result["delete_failed"] += 1
+            if len(result["delete_failures"]) < max_failures:
+                result["delete_failures"].append({"key": key, "message": message})
+
+        async def _flush_deletes(force: bool = False):
+            # 源对象只在复制成功后删除，按 1000 个键一批提交
+            while to_delete and (force or len(to_delete) >= 1000):
+                keys = to_delete[:1000]
+                del to_delete[:1000]
+                try:
+                    resp = await run_sync(src_client.delete_multi_objects, src_bucket,
+                                          [tos.models2.ObjectTobeDeleted(key=key) for key in keys],
+                                          quiet=True)
+                except Exception as e:
+                    for key in keys:
+                        _record_delete_failure(key, _brief_error(e))
+                    continue
+                for err in resp.error:
+                    _record_delete_failure(err.key, f"{err.code}: {err.message}")
+                result["deleted"] += len(keys) - len(resp.error)
+
+        def _progress() -> Tuple[float, float, str]:
+            return (result["copied"] + result["failed"], result["matched"],
+                    f"已复制 {result['copied']} 个对象，失败 {result['failed']} 个")
+
+        async def _copy(obj):
+            try:
+                dst_key = dst_prefix + obj.key[len(src_prefix):]
+                await copy_object(dst_client, src_bucket, obj.key, dst_bucket, dst_key,
+                                  size=obj.size, etag=obj.etag, src_client=src_client)
+                result["copied"] += 1
+                result["bytes"] += obj.size or 0
+                if delete_source:
+                    to_delete.append(obj.key)
+                    await _flush_deletes()
+            except Exception as e:
+                _record_failure(obj.key, _brief_error(e))
+
+        async def _objects():
+            async for resp in _iter_list_pages(src_bucket, src_prefix, ""):
+                for obj in resp.contents:
+                    result["matched"] += 1
+                    yield obj
+
+        await _run_bounded(_objects(), _copy, concurrency, _progress)
+        if delete_source:
+            await _flush_deletes(force=True)
+            get_metadata_cache().invalidate(bucket=src_bucket, prefix=src_prefix)
+        get_metadata_cache().invalidate(bucket=dst_bucket, prefix=dst_prefix)
+
+        elapsed = time.monotonic() - start_time
+        result["elapsed_seconds"] = round(elapsed, 3)
+        result["objects_per_second"] = round(result["copied"] / elapsed, 1) if elapsed > 0 else None
+        return [TextContent(type="text", text=dumps(result, output_format(args)))]
+    except Exception as e:
+        return _failure("批量复制对象", e)
 
 # 预签名 URL 功能实现
 async def presigned_url(args: Dict[str, Any]) -> List[TextContent]:
@@ -192,14 +1124,15 @@ async def presigned_url(args: Dict[str, Any]) -> List[TextContent]:
     expires = args.get("expires", 3600)
     
     try:
+        client = await _async_client_for(bucket_name) or await _client_for(bucket_name)
         if method == "GET":
-            url = tos_client.pre_signed_url(tos.HttpMethodType.Http_Method_Get, bucket_name, object_key, expires)
+            url = client.pre_signed_url(tos.HttpMethodType.Http_Method_Get, bucket_name, object_key, expires)
         elif method == "PUT":
-            url = tos_client.pre_signed_url(tos.HttpMethodType.Http_Method_Put, bucket_name, object_key, expires)
+            url = client.pre_signed_url(tos.HttpMethodType.Http_Method_Put, bucket_name, object_key, expires)
         elif method == "POST":
-            url = tos_client.pre_signed_url(tos.HttpMethodType.Http_Method_Post, bucket_name, object_key, expires)
+            url = client.pre_signed_url(tos.HttpMethodType.Http_Method_Post, bucket_name, object_key, expires)
         elif method == "DELETE":
-            url = tos_client.pre_signed_url(tos.HttpMethodType.Http_Method_Delete, bucket_name, object_key, expires)
+            url = client.pre_signed_url(tos.HttpMethodType.Http_Method_Delete, bucket_name, object_key, expires)
         else:
             return [TextContent(type="text", text=f"不支持的HTTP方法: {method}")]
         
@@ -210,11 +1143,53 @@ async def presigned_url(args: Dict[str, Any]) -> List[TextContent]:
             "bucket": bucket_name,
             "key": object_key
         }
-        return [TextContent(type="text", text=json.dumps(result, indent=2, ensure_ascii=False))]
+        return [TextContent(type="text", text=dumps(result, output_format(args)))]
     except Exception as e:
-        return [TextContent(type="text", text=f"生成预签名URL失败: {str(e)}")]
+        return _failure("生成预签名URL", e)
 
 # 图片处理功能实现
+async def _process_and_save(bucket_name: str, object_key: str, process: str, save_bucket: str, save_key: str,
+                            wait: bool = True) -> Tuple[int, bool]:
+    """执行持久化的图片 / 视频处理，返回 (处理结果字节数, 是否已确认回写)
+
+    通过 save_bucket 和 save_object 参数让 TOS 把处理结果回写到 save_bucket/save_key，
+    读完响应体即处理完成；wait 为 True 时再轮询确认回写的对象已可见。
+    """
+    client = await _client_for(bucket_name)
+
+    def _process() -> int:
+        resp = client.get_object(
+            bucket=bucket_name,
+            key=object_key,
+            process=process,
+            save_bucket=base64.b64encode(save_bucket.encode("utf-8")).decode("utf-8"),
+            save_object=base64.b64encode(save_key.encode("utf-8")).decode("utf-8")
+        )
+        return len(resp.read())
+
+    processed_size = await run_sync(_process)
+    saved = await _wait_for_object(save_bucket, save_key) if wait else False
+    get_metadata_cache().invalidate(bucket=save_bucket, key=save_key)
+    return processed_size, saved
+
+async def _presign_get(bucket_name: str, object_key: str, expires: int = 3600) -> str:
+    """对象的 GET 预签名 URL（本地计算，不发送请求）"""
+    client = await _async_client_for(bucket_name) or await _client_for(bucket_name)
+    return client.pre_signed_url(tos.HttpMethodType.Http_Method_Get, bucket_name, object_key, expires).signed_url
+
+def _render_save_key(template: str, key: str, prefix: str = "", index: int = 0, **extra: Any) -> str:
+    """按模板生成回写对象键名
+
+    可用占位符：{key} 源对象键名；{rel} 去掉 prefix 后的键名；{dir} 所在目录（含末尾的 /）；
+    {name} 不含扩展名的文件名；{ext} 扩展名（不含点）；{index} 从 0 开始的序号；以及 extra 中的字段。
+    """
+    dirname, _, filename = key.rpartition("/")
+    name, dot, ext = filename.rpartition(".")
+    if not dot or not name:
+        name, ext = filename, ""
+    return template.format(key=key, rel=key[len(prefix):] if key.startswith(prefix) else key,
+                           dir=dirname + "/" if dirname else "", name=name, ext=ext, index=index, **extra)
+
 async def image_process(args: Dict[str, Any]) -> List[TextContent]:
     """图片处理（支持持久化）"""
     bucket_name = args["bucket_name"]
@@ -224,50 +1199,160 @@ async def image_process(args: Dict[str, Any]) -> List[TextContent]:
     save_key = args["save_key"]
     
     try:
-        # 使用官方SDK写法，通过save_bucket和save_object参数执行图片处理和持久化
-        resp = tos_client.get_object(
-            bucket=bucket_name,
-            key=object_key,
-            process=process,
-            save_bucket=base64.b64encode(save_bucket.encode("utf-8")).decode("utf-8"),
-            save_object=base64.b64encode(save_key.encode("utf-8")).decode("utf-8")
-        )
-        
-        # 读取处理结果以确保处理完成
-        processed_data = resp.read()
-        
-        # 等待一下确保回写完成
-        import time
-        time.sleep(1.0)
-        
-        # 生成处理后对象的预签名 URL
-        download_url = tos_client.pre_signed_url(tos.HttpMethodType.Http_Method_Get, save_bucket, save_key, 3600)
+        processed_size, saved = await _process_and_save(bucket_name, object_key, process, save_bucket, save_key)
         
         result = {
-            "presigned_url": download_url.signed_url,
+            "presigned_url": await _presign_get(save_bucket, save_key),
             "source_bucket": bucket_name,
             "source_key": object_key,
             "save_bucket": save_bucket,
             "save_key": save_key,
             "process": process,
-            "processed_size": len(processed_data),
+            "processed_size": processed_size,
             "expires_in": 3600,
-            "status": "processed"
+            "status": "processed" if saved else "pending"
+        }
+        return [TextContent(type="text", text=dumps(result, output_format(args)))]
+    except Exception as e:
+        return _failure("图片处理", e)
+
+async def image_process_batch(args: Dict[str, Any]) -> List[TextContent]:
+    """批量图片处理：对键名列表或前缀下的对象并发执行持久化处理，按模板生成回写键名"""
+    bucket_name = args["bucket_name"]
+    object_keys = args.get("object_keys")
+    prefix = args.get("prefix", "")
+    suffixes = tuple(s.lower() for s in args.get("suffixes") or [])
+    max_objects = args.get("max_objects")
+    process = args["process"]
+    save_bucket = args.get("save_bucket", bucket_name)
+    template = args["save_key_template"]
+    wait_for_save = args.get("wait_for_save", True)
+    include_urls = args.get("include_presigned_urls", False)
+    expires = args.get("expires", 3600)
+    concurrency = args.get("concurrency", 16)
+
+    try:
+        if (object_keys is None) == ("prefix" not in args):
+            return [TextContent(type="text", text="批量图片处理失败: object_keys 和 prefix 必须且只能指定一个")]
+        try:
+            samples = {_render_save_key(template, "a/x.jpg", "", 0), _render_save_key(template, "b/y.png", "", 1)}
+        except (KeyError, IndexError, ValueError) as e:
+            return [TextContent(type="text", text=f"批量图片处理失败: save_key_template 无效: {str(e)}")]
+        if len(samples) < 2:
+            return [TextContent(type="text", text="批量图片处理失败: save_key_template 对不同对象生成了相同的键名，"
+                                                  "请加入 {key}、{rel}、{name} 或 {index}")]
+        if object_keys is not None:
+            object_keys = list(dict.fromkeys(object_keys))[:max_objects]
+            rendered = [_render_save_key(template, key, prefix, i) for i, key in enumerate(object_keys)]
+            duplicates = sorted(k for k, n in Counter(rendered).items() if n > 1)
+            if duplicates:
+                return [TextContent(type="text", text=f"批量图片处理失败: save_key_template 生成了重复的键名: "
+                                                      f"{', '.join(duplicates[:10])}")]
+
+        start_time = time.monotonic()
+        result = {
+            "bucket": bucket_name,
+            "prefix": prefix if object_keys is None else None,
+            "process": process,
+            "save_bucket": save_bucket,
+            "save_key_template": template,
+            "matched": 0,
+            "processed": 0,
+            "pending": 0,
+            "failed": 0,
+            "skipped": 0
         }
-        return [TextContent(type="text", text=json.dumps(result, indent=2, ensure_ascii=False))]
+        items: List[Dict[str, Any]] = []
+        # 回写到同一前缀时，列举可能返回刚生成的对象，记录下来避免重复处理
+        targets = set()
+
+        def _progress() -> Tuple[float, float, str]:
+            done = result["processed"] + result["pending"] + result["failed"]
+            return done, result["matched"], f"已处理 {done} 张图片，失败 {result['failed']} 张"
+
+        async def _process(item: Dict[str, Any]):
+            try:
+                item["size"], saved = await _process_and_save(bucket_name, item["key"], process, save_bucket,
+                                                              item["save_key"], wait=wait_for_save)
+                item["status"] = "processed" if saved or not wait_for_save else "pending"
+                if include_urls:
+                    item["presigned_url"] = await _presign_get(save_bucket, item["save_key"], expires)
+            except Exception as e:
+                item["status"] = "failed"
+                item["error"] = _brief_error(e)
+            result[item["status"]] += 1
+
+        async def _keys() -> AsyncIterator[str]:
+            if object_keys is not None:
+                for key in object_keys:
+                    yield key
+                return
+            async for resp in _iter_list_pages(bucket_name, prefix, ""):
+                for obj in resp.contents:
+                    yield obj.key
+
+        async def _items() -> AsyncIterator[Dict[str, Any]]:
+            async for key in _keys():
+                if max_objects is not None and result["matched"] >= max_objects:
+                    return
+                if object_keys is None and (key.endswith("/") or (suffixes and not key.lower().endswith(suffixes))
+                                            or (save_bucket == bucket_name and key in targets)):
+                    result["skipped"] += 1
+                    continue
+                save_key = _render_save_key(template, key, prefix, result["matched"])
+                result["matched"] += 1
+                item = {"key": key, "save_key": save_key, "status": None, "size": None, "error": None}
+                if include_urls:
+                    item["presigned_url"] = None
+                items.append(item)
+                if save_bucket == bucket_name and save_key == key:
+                    item["status"] = "failed"
+                    item["error"] = "回写对象与源对象相同"
+                    result["failed"] += 1
+                    continue
+                if save_key in targets:
+                    # 按前缀处理时无法预先渲染全部键名，与之前的对象重复时不再处理，避免相互覆盖
+                    item["status"] = "failed"
+                    item["error"] = "回写键名与其他对象重复"
+                    result["failed"] += 1
+                    continue
+                targets.add(save_key)
+                yield item
+
+        await _run_bounded(_items(), _process, concurrency, _progress)
+
+        elapsed = time.monotonic() - start_time
+        result["elapsed_seconds"] = round(elapsed, 3)
+        result["objects_per_second"] = round(result["matched"] / elapsed, 1) if elapsed > 0 else None
+        if include_urls:
+            result["expires_in"] = expires
+
+        # 条目可能很多，默认使用紧凑格式输出
+        fmt = output_format(args, "compact" if tos_config.output_format == "pretty" else None)
+
+        def _render(kept: int) -> str:
+            output = dict(result, results=items[:kept])
+            if kept < len(items):
+                output["results_truncated"] = True
+            if fmt == "columnar":
+                output["results"] = columnar(output["results"])
+            return dumps(output, fmt)
+
+        _, text = fit_to_budget(len(items), _render)
+        return [TextContent(type="text", text=text)]
     except Exception as e:
-        return [TextContent(type="text", text=f"图片处理失败: {str(e)}")]
+        return _failure("批量图片处理", e)
 
 async def image_info(args: Dict[str, Any]) -> List[TextContent]:
     """获取图片信息"""
     bucket_name = args["bucket_name"]
     object_key = args["object_key"]
     
-    try:
+    async def _load():
         # 使用 get_object 方法通过 style 参数获取图片信息
         # 设置处理参数为 image/info
-        resp = tos_client.get_object(bucket_name, object_key, process="image/info")
-        image_info_data = resp.read().decode('utf-8')
+        resp, data = await _read_processed(bucket_name, object_key, "image/info")
+        image_info_data = data.decode('utf-8')
         
         # 尝试解析JSON响应
         try:
@@ -287,71 +1372,140 @@ async def image_info(args: Dict[str, Any]) -> List[TextContent]:
                 "status": "success",
                 "note": "返回原始格式数据"
             }
-        
-        return [TextContent(type="text", text=json.dumps(result, indent=2, ensure_ascii=False))]
+        return result, resp.etag
+
+    try:
+        result = await get_metadata_cache().get_or_load("image_info", bucket_name, object_key, _load,
+                                                  revalidate=lambda: _current_etag(bucket_name, object_key))
+        return [TextContent(type="text", text=dumps(result, output_format(args)))]
     except Exception as e:
-        return [TextContent(type="text", text=f"获取图片信息失败: {str(e)}")]
+        return _failure("获取图片信息", e)
 
 
 # 视频处理功能实现
+# 多帧截帧时未指定 save_key_template 使用的回写键名模板
+_SNAPSHOT_KEY_TEMPLATE = "{dir}{name}_{time}.{format}"
+
+async def _video_duration_ms(bucket_name: str, object_key: str) -> float:
+    """通过（带缓存的）video/info 获取视频时长（毫秒）"""
+    info = (await _load_video_info(bucket_name, object_key))["video_info"]
+    try:
+        return float(info["format"]["duration"]) * 1000
+    except (TypeError, KeyError, ValueError):
+        raise ValueError("无法从 video/info 获取视频时长")
+
+async def _snapshot_times(bucket_name: str, object_key: str, args: Dict[str, Any]) -> Sequence[int]:
+    """截帧时间点（毫秒）：times 列表；每 interval 毫秒一帧；或在整个时长内均匀分布的 count 帧"""
+    times, interval, count = args.get("times"), args.get("interval"), args.get("count")
+    if sum(v is not None for v in (times, interval, count)) > 1:
+        raise ValueError("times、interval 与 count 只能指定一个")
+    if times is not None:
+        return [int(t) for t in times]
+    if interval is None and count is None:
+        return [int(args.get("time", 300))]
+    duration = await _video_duration_ms(bucket_name, object_key)
+    if interval is not None:
+        start = int(args.get("time", 0))
+        # 返回 range 而非列表：interval 过小时先由调用方按 max_frames 拒绝，不会生成巨大的列表
+        return range(start, max(start, int(duration)), max(1, int(interval)))
+    # 每帧取所在分段的中点，避开开头的黑帧和超出时长的末尾
+    return [int(duration * (i + 0.5) / count) for i in range(count)]
+
 async def video_snapshot(args: Dict[str, Any]) -> List[TextContent]:
-    """视频截帧（支持持久化）"""
+    """视频截帧（支持持久化），可一次并发截取多帧"""
     bucket_name = args["bucket_name"]
     object_key = args["object_key"]
-    time = args.get("time", 300)
     format = args.get("format", "jpg")
     save_bucket = args["save_bucket"]
-    save_key = args["save_key"]
+    save_key = args.get("save_key")
+    template = args.get("save_key_template")
+    max_frames = args.get("max_frames", 100)
+    concurrency = args.get("concurrency", 16)
     
     try:
-        # 构建视频截帧处理参数，时间单位为毫秒
-        process = f"video/snapshot,t_{int(time)},f_{format}"
-        
-        # 使用官方SDK写法，通过save_bucket和save_object参数执行视频截帧和持久化
-        resp = tos_client.get_object(
-            bucket=bucket_name,
-            key=object_key,
-            process=process,
-            save_bucket=base64.b64encode(save_bucket.encode("utf-8")).decode("utf-8"),
-            save_object=base64.b64encode(save_key.encode("utf-8")).decode("utf-8")
-        )
-        
-        # 读取处理结果以确保截帧完成
-        processed_data = resp.read()
-        
-        # 等待一下确保回写完成
-        import time as time_module
-        time_module.sleep(1.0)
-        
-        # 生成截帧图片的预签名 URL
-        download_url = tos_client.pre_signed_url(tos.HttpMethodType.Http_Method_Get, save_bucket, save_key, 3600)
-        
+        times = await _snapshot_times(bucket_name, object_key, args)
+        if not times:
+            return [TextContent(type="text", text="视频截帧失败: 没有需要截取的帧")]
+        if len(times) > max_frames:
+            return [TextContent(type="text", text=f"视频截帧失败: 共 {len(times)} 帧，超过 max_frames={max_frames}，"
+                                                  "请增大 interval 或 max_frames")]
+        multi = any(k in args for k in ("times", "interval", "count"))
+        if not multi and save_key is not None:
+            save_keys = [save_key]
+        else:
+            template = template or _SNAPSHOT_KEY_TEMPLATE
+            try:
+                save_keys = [_render_save_key(template, object_key, index=i, time=t, format=format)
+                             for i, t in enumerate(times)]
+            except (KeyError, IndexError, ValueError) as e:
+                return [TextContent(type="text", text=f"视频截帧失败: save_key_template 无效: {str(e)}")]
+            if len(set(save_keys)) < len(save_keys):
+                return [TextContent(type="text", text="视频截帧失败: save_key_template 生成了重复的键名，请加入 {time} 或 {index}")]
+
+        start_time = time.monotonic()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _snapshot(index: int) -> Dict[str, Any]:
+            frame = {"index": index, "time": times[index], "save_key": save_keys[index]}
+            # 构建视频截帧处理参数，时间单位为毫秒
+            process = f"video/snapshot,t_{times[index]},f_{format}"
+            async with semaphore:
+                try:
+                    size, saved = await _process_and_save(bucket_name, object_key, process, save_bucket,
+                                                          save_keys[index])
+                except Exception as e:
+                    if not multi:
+                        raise
+                    return dict(frame, status="failed", size=None, presigned_url=None, error=_brief_error(e))
+            return dict(frame, status="processed" if saved else "pending", size=size,
+                        presigned_url=await _presign_get(save_bucket, save_keys[index]), error=None)
+
+        frames = await asyncio.gather(*(_snapshot(i) for i in range(len(times))))
+
+        if not multi:
+            frame = frames[0]
+            result = {
+                "presigned_url": frame["presigned_url"],
+                "source_bucket": bucket_name,
+                "source_key": object_key,
+                "save_bucket": save_bucket,
+                "save_key": frame["save_key"],
+                "time": args.get("time", 300),
+                "format": format,
+                "processed_size": frame["size"],
+                "expires_in": 3600,
+                "status": frame["status"]
+            }
+            return [TextContent(type="text", text=dumps(result, output_format(args)))]
+
         result = {
-            "presigned_url": download_url.signed_url,
             "source_bucket": bucket_name,
             "source_key": object_key,
             "save_bucket": save_bucket,
-            "save_key": save_key,
-            "time": time,
             "format": format,
-            "processed_size": len(processed_data),
+            "frame_count": len(frames),
+            "processed": sum(f["status"] == "processed" for f in frames),
+            "pending": sum(f["status"] == "pending" for f in frames),
+            "failed": sum(f["status"] == "failed" for f in frames),
+            "elapsed_seconds": round(time.monotonic() - start_time, 3),
             "expires_in": 3600,
-            "status": "processed"
+            "frames": frames
         }
-        return [TextContent(type="text", text=json.dumps(result, indent=2, ensure_ascii=False))]
+        fmt = output_format(args)
+        if fmt == "columnar":
+            result["frames"] = columnar(frames)
+        return [TextContent(type="text", text=dumps(result, fmt))]
     except Exception as e:
-        return [TextContent(type="text", text=f"视频截帧失败: {str(e)}")]
+        return _failure("视频截帧", e)
 
-async def video_info(args: Dict[str, Any]) -> List[TextContent]:
-    """获取视频信息"""
-    bucket_name = args["bucket_name"]
-    object_key = args["object_key"]
+async def _load_video_info(bucket_name: str, object_key: str) -> Dict[str, Any]:
+    """获取视频信息（经元数据缓存，过期后用 ETag 校验续期）"""
     
-    try:
+    async def _load():
         # 使用 get_object 方法通过 style 参数获取视频信息
         # 设置处理参数为 video/info
-        resp = tos_client.get_object(bucket_name, object_key, process="video/info")
-        video_info_data = resp.read().decode('utf-8')
+        resp, data = await _read_processed(bucket_name, object_key, "video/info")
+        video_info_data = data.decode('utf-8')
         
         # 尝试解析JSON响应
         try:
@@ -371,7 +1525,91 @@ async def video_info(args: Dict[str, Any]) -> List[TextContent]:
                 "status": "success",
                 "note": "返回原始格式数据"
             }
-        
-        return [TextContent(type="text", text=json.dumps(result, indent=2, ensure_ascii=False))]
+        return result, resp.etag
+
+    return await get_metadata_cache().get_or_load("video_info", bucket_name, object_key, _load,
+                                                  revalidate=lambda: _current_etag(bucket_name, object_key))
+
+async def video_info(args: Dict[str, Any]) -> List[TextContent]:
+    """获取视频信息"""
+    bucket_name = args["bucket_name"]
+    object_key = args["object_key"]
+    
+    try:
+        result = await _load_video_info(bucket_name, object_key)
+        return [TextContent(type="text", text=dumps(result, output_format(args)))]
+    except Exception as e:
+        return _failure("获取视频信息", e)
+
+# 资源：对象以 tos://bucket/key 暴露为 MCP 资源
+OBJECT_RESOURCE_TEMPLATE = ResourceTemplate(
+    uriTemplate="tos://{bucket}/{key}",
+    name="tos-object",
+    description="TOS 对象内容，文本对象以文本返回，其余以二进制返回；"
+                "超过 TOS_MAX_RESPONSE_BYTES 的对象请使用 tos_get_object 分段读取"
+)
+
+async def list_object_resources() -> List[Resource]:
+    """列出 TOS_RESOURCE_BUCKETS 中各桶的前 TOS_RESOURCE_LIST_LIMIT 个对象"""
+    resources = []
+    limit = tos_config.resource_list_limit
+    for bucket_name in tos_config.resource_buckets:
+        try:
+            async for resp in _iter_list_pages(bucket_name, "", "", limit=limit, page_size=min(limit, 1000)):
+                for obj in resp.contents:
+                    resources.append(Resource(
+                        uri=_object_uri(bucket_name, obj.key),
+                        name=obj.key,
+                        mimeType=mimetypes.guess_type(obj.key)[0] or "application/octet-stream",
+                        size=obj.size
+                    ))
+        except Exception as e:
+            logger.warning(f"列举存储桶 {bucket_name} 的资源失败: {str(e)}")
+    return resources
+
+async def read_object_resource(uri: str) -> List[ReadResourceContents]:
+    """读取 tos://bucket/key 资源，对象超过 TOS_MAX_RESPONSE_BYTES 时报错"""
+    bucket_name, object_key = _parse_object_uri(uri)
+    limit = tos_config.max_response_bytes
+    content, object_size, meta = await _fetch_range(bucket_name, object_key, 0, limit - 1)
+    if len(content) < object_size:
+        raise ValueError(f"对象大小 {object_size} 超过 TOS_MAX_RESPONSE_BYTES ({limit})，"
+                         f"请使用 tos_get_object 分段读取")
+    content_type = meta.content_type or mimetypes.guess_type(object_key)[0]
+    text, _ = _decode_utf8(content, False)
+    if text is not None:
+        return [ReadResourceContents(content=text, mime_type=content_type or "text/plain")]
+    return [ReadResourceContents(content=content, mime_type=content_type or "application/octet-stream")]
+
+# 缓存统计
+async def cache_stats(args: Dict[str, Any]) -> List[TextContent]:
+    """获取缓存命中统计"""
+    try:
+        result = {"metadata": get_metadata_cache().stats()}
+        content_cache = get_content_cache()
+        if content_cache.enabled:
+            result["content"] = await run_sync(content_cache.stats)
+        return [TextContent(type="text", text=dumps(result, output_format(args)))]
+    except Exception as e:
+        return _failure("获取缓存统计", e)
+
+async def server_stats(args: Dict[str, Any]) -> List[TextContent]:
+    """获取按工具、按存储桶汇总的调用指标"""
+    metrics_format = args.get("metrics_format", "json")
+    include_buckets = args.get("include_buckets", True)
+    try:
+        if not tos_config.metrics_enabled:
+            return [TextContent(type="text", text="指标未启用（TOS_METRICS=false）")]
+        metrics = get_metrics()
+        if metrics_format == "prometheus":
+            text = metrics.prometheus()
+        else:
+            result = metrics.snapshot(include_buckets=include_buckets)
+            result["window"] = metrics.window
+            result["resilience"] = resilience_stats()
+            text = dumps(result, output_format(args))
+        if args.get("reset", False):
+            metrics.reset()
+        return [TextContent(type="text", text=text)]
     except Exception as e:
-        return [TextContent(type="text", text=f"获取视频信息失败: {str(e)}")]
\ No newline at end of file
+        return _failure("获取服务指标", e)
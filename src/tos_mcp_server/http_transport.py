@@ -0,0 +1,154 @@
+"""
+HTTP 传输层
+
+在一个进程内通过 SSE 或 Streamable HTTP 同时服务多个 MCP 会话。所有会话共用
+handlers 中的同一个 TOS 客户端（连接池）、工作线程池和缓存，避免每个客户端单独
+启动进程、重复建立连接。并发会话数受 TOS_MAX_SESSIONS 限制，超出时返回 503。
+启用指标时，TOS_METRICS_PATH（默认 /metrics）以 Prometheus 文本格式导出工具调用指标。
+"""
+
+import logging
+import contextlib
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from mcp.server import Server
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Mount, Route
+from starlette.types import Receive, Scope, Send
+
+from .config import tos_config
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# 当前请求预留的会话名额；会话任务在请求的上下文中创建，因此 run 中也能读取到
+_admission: ContextVar[Optional[Dict[str, bool]]] = ContextVar("tos_mcp_admission", default=None)
+
+
+class _SessionCounter:
+    """包装 MCP Server，统计正在运行和已预留（尚未启动）的会话数"""
+
+    def __init__(self, app: Server, max_sessions: int):
+        self.app = app
+        self.max_sessions = max_sessions
+        self.active = 0
+        self.reserved = 0
+
+    @property
+    def full(self) -> bool:
+        return self.max_sessions > 0 and self.active + self.reserved >= self.max_sessions
+
+    @contextlib.contextmanager
+    def admission(self) -> Iterator[None]:
+        """为本请求创建的会话预留名额，会话启动时转为活跃会话，未启动则在请求结束时释放
+
+        调用方检查 full 后应立即进入，两者之间没有 await，多个同时到达的请求不会都通过检查。
+        """
+        slot = {"pending": True}
+        self.reserved += 1
+        token = _admission.set(slot)
+        try:
+            yield
+        finally:
+            _admission.reset(token)
+            if slot["pending"]:
+                slot["pending"] = False
+                self.reserved -= 1
+
+    def create_initialization_options(self):
+        return self.app.create_initialization_options()
+
+    async def run(self, *args: Any, **kwargs: Any):
+        slot = _admission.get()
+        if slot is not None and slot["pending"]:
+            slot["pending"] = False
+            self.reserved -= 1
+        self.active += 1
+        logger.info(f"MCP 会话已建立，当前会话数: {self.active}")
+        try:
+            return await self.app.run(*args, **kwargs)
+        finally:
+            self.active -= 1
+            logger.info(f"MCP 会话已结束，当前会话数: {self.active}")
+
+
+def _too_many_sessions() -> Response:
+    return JSONResponse(
+        {"error": f"会话数已达上限 ({tos_config.max_sessions})，请稍后重试"},
+        status_code=503,
+        headers={"Retry-After": "5"}
+    )
+
+
+async def _metrics(_request: Request) -> Response:
+    return PlainTextResponse(get_metrics().prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _metrics_routes() -> List[Route]:
+    if not tos_config.metrics_enabled or not tos_config.metrics_path:
+        return []
+    return [Route(tos_config.metrics_path, endpoint=_metrics, methods=["GET"])]
+
+
+def build_app(server: Server, transport: str) -> Starlette:
+    """构建 SSE (/sse, /messages/) 或 Streamable HTTP (/mcp) 的 ASGI 应用，并挂载指标端点"""
+    sessions = _SessionCounter(server, tos_config.max_sessions)
+
+    if transport == "sse":
+        sse = SseServerTransport("/messages/")
+
+        async def handle_sse(request: Request) -> Response:
+            if sessions.full:
+                return _too_many_sessions()
+            with sessions.admission():
+                async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+                    await sessions.run(read_stream, write_stream, sessions.create_initialization_options())
+            return Response()
+
+        return Starlette(routes=[
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+            *_metrics_routes(),
+        ])
+
+    if transport == "streamable-http":
+        manager = StreamableHTTPSessionManager(app=sessions, stateless=tos_config.http_stateless)
+
+        class _StreamableHTTPApp:
+            async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+                # 不带会话 ID 的 POST 会创建新会话，此时检查会话上限并立即预留名额
+                request = Request(scope, receive)
+                if (request.method == "POST" and "mcp-session-id" not in request.headers
+                        and not tos_config.http_stateless):
+                    if sessions.full:
+                        await _too_many_sessions()(scope, receive, send)
+                        return
+                    with sessions.admission():
+                        await manager.handle_request(scope, receive, send)
+                    return
+                await manager.handle_request(scope, receive, send)
+
+        @contextlib.asynccontextmanager
+        async def lifespan(_app: Starlette) -> AsyncIterator[None]:
+            async with manager.run():
+                yield
+
+        return Starlette(routes=[Route("/mcp", endpoint=_StreamableHTTPApp()), *_metrics_routes()],
+                         lifespan=lifespan)
+
+    raise NotImplementedError(f"Transport {transport} not implemented")
+
+
+async def run_http_server(server: Server, transport: str, host: str, port: int) -> None:
+    """使用 uvicorn 运行 HTTP 传输"""
+    import uvicorn
+
+    app = build_app(server, transport)
+    config = uvicorn.Config(app, host=host, port=port, log_level="info")
+    logger.info(f"TOS MCP Server 监听 http://{host}:{port}，传输协议: {transport}")
+    await uvicorn.Server(config).serve()
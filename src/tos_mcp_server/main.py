@@ -3,6 +3,7 @@
 TOS MCP Server 主入口文件
 """
 
+import os
 import asyncio
 import logging
 import argparse
@@ -17,16 +18,31 @@ def main():
     parser = argparse.ArgumentParser(description="TOS MCP Server")
     parser.add_argument(
         "--transport", "-t",
-        choices=["stdio", "sse"],
+        choices=["stdio", "sse", "streamable-http"],
         default="stdio",
-        help="传输协议 (stdio 或 sse)"
+        help="传输协议 (stdio、sse 或 streamable-http)"
+    )
+    parser.add_argument(
+        "--host",
+        default=None,
+        help="HTTP 传输监听地址，默认读取 TOS_HTTP_HOST (127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port", "-p",
+        type=int,
+        default=None,
+        help="HTTP 传输监听端口，默认读取 TOS_HTTP_PORT (8000)"
     )
     
     args = parser.parse_args()
     
+    # 只做提示不退出：配置在首次工具调用时才加载，缺少密钥时由工具调用返回错误
+    if not os.getenv("TOS_ACCESS_KEY") or not os.getenv("TOS_SECRET_KEY"):
+        logger.warning("未设置 TOS_ACCESS_KEY 或 TOS_SECRET_KEY，调用 TOS 相关工具时将会失败")
+    
     try:
         logger.info(f"启动 TOS MCP Server，传输协议: {args.transport}")
-        asyncio.run(run_server(args.transport))
+        asyncio.run(run_server(args.transport, args.host, args.port))
     except Exception as e:
         logger.error(f"启动 TOS MCP Server 失败: {str(e)}")
         raise
@@ -0,0 +1,252 @@
+"""
+工具调用指标
+
+注册表分发的每次工具调用都会记录：耗时、请求与响应字节数、期间发往 TOS 的 HTTP
+请求数（含重试）以及错误类别，按工具和按存储桶分别汇总。
+
+当前调用的记录保存在 contextvar 中：run_sync 会把上下文带到工作线程，SDK 会话的
+响应钩子和异步客户端据此为所属调用计数；处理器捕获异常后通过 record_error 标记错误。
+
+汇总数据可通过 tos_server_stats 工具读取，也可以导出为 Prometheus 文本格式（HTTP
+传输下的 TOS_METRICS_PATH 端点）或按 TOS_METRICS_LOG_INTERVAL 周期性写入 JSON 日志。
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+import contextlib
+import contextvars
+from bisect import bisect_left
+from collections import Counter, deque
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from .config import tos_config
+
+logger = logging.getLogger(__name__)
+
+# 延迟直方图的桶上界（秒），与 Prometheus 默认桶相近并向上扩展到分钟级
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class CallRecord:
+    """一次工具调用的记录"""
+    __slots__ = ("tool", "bucket", "tos_requests", "response_bytes", "error", "_lock")
+
+    def __init__(self, tool: str, bucket: Optional[str]):
+        self.tool = tool
+        self.bucket = bucket
+        self.tos_requests = 0
+        self.response_bytes = 0
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def add_tos_request(self) -> None:
+        with self._lock:
+            self.tos_requests += 1
+
+
+_current: contextvars.ContextVar[Optional[CallRecord]] = contextvars.ContextVar("tos_mcp_call", default=None)
+
+
+def error_class(error: BaseException) -> str:
+    """错误类别：TOS 服务端错误带上错误码（如 TosServerError:NoSuchKey），其余为异常类名"""
+    code = getattr(error, "code", None)
+    if code and type(error).__name__ == "TosServerError":
+        return f"TosServerError:{code}"
+    return type(error).__name__
+
+
+class _Stats:
+    """一组调用的汇总：计数、错误、字节数、延迟直方图与最近延迟窗口（用于分位数）"""
+
+    def __init__(self, window: int):
+        self.calls = 0
+        self.errors: Counter = Counter()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.tos_requests = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.recent: deque = deque(maxlen=window)
+
+    def add(self, latency: float, request_bytes: int, response_bytes: int, tos_requests: int,
+            error: Optional[str]) -> None:
+        self.calls += 1
+        if error is not None:
+            self.errors[error] += 1
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        self.tos_requests += tos_requests
+        self.latency_sum += latency
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.recent.append(latency)
+
+    def summary(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+
+        def _pct(p: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))] * 1000, 2)
+
+        return {
+            "calls": self.calls,
+            "errors": sum(self.errors.values()),
+            "error_rate": round(sum(self.errors.values()) / self.calls, 4) if self.calls else None,
+            "error_classes": dict(self.errors),
+            "latency_ms": {
+                "mean": round(self.latency_sum / self.calls * 1000, 2) if self.calls else None,
+                "p50": _pct(0.5),
+                "p95": _pct(0.95),
+                "p99": _pct(0.99),
+                "max": round(recent[-1] * 1000, 2) if recent else None
+            },
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "tos_requests": self.tos_requests
+        }
+
+
+class Metrics:
+    """按工具、按存储桶汇总的调用指标（线程安全）"""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.started_at = time.time()
+        self._tools: Dict[str, _Stats] = {}
+        self._buckets: Dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def track(self, tool: str, arguments: Dict[str, Any]) -> Iterator[CallRecord]:
+        """记录 with 块内的一次工具调用，调用方在块内设置 record.response_bytes"""
+        bucket = arguments.get("bucket_name") or arguments.get("src_bucket")
+        record = CallRecord(tool, bucket if isinstance(bucket, str) else None)
+        token = _current.set(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record.error = record.error or error_class(e)
+            raise
+        finally:
+            _current.reset(token)
+            self.add(record, time.perf_counter() - start, _json_bytes(arguments))
+
+    def add(self, record: CallRecord, latency: float, request_bytes: int) -> None:
+        with self._lock:
+            targets = [self._tools.setdefault(record.tool, _Stats(self.window))]
+            if record.bucket:
+                targets.append(self._buckets.setdefault(record.bucket, _Stats(self.window)))
+            for stats in targets:
+                stats.add(latency, request_bytes, record.response_bytes, record.tos_requests, record.error)
+
+    def snapshot(self, include_buckets: bool = True) -> Dict[str, Any]:
+        """当前汇总（分位数基于每组最近 window 次调用）"""
+        with self._lock:
+            result = {
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "tools": {name: stats.summary() for name, stats in sorted(self._tools.items())}
+            }
+            if include_buckets:
+                result["buckets"] = {name: stats.summary() for name, stats in sorted(self._buckets.items())}
+        return result
+
+    def prometheus(self) -> str:
+        """Prometheus 文本格式（exposition format 0.0.4）"""
+        lines: List[str] = []
+        with self._lock:
+            for label, groups in (("tool", self._tools), ("bucket", self._buckets)):
+                prefix = f"tos_mcp_{label}"
+                lines += [f"# HELP {prefix}_calls_total 工具调用次数",
+                          f"# TYPE {prefix}_calls_total counter"]
+                lines += [f"{prefix}_calls_total{{{label}={_quote(name)}}} {s.calls}" for name, s in groups.items()]
+                lines += [f"# HELP {prefix}_errors_total 失败的工具调用次数（按错误类别）",
+                          f"# TYPE {prefix}_errors_total counter"]
+                for name, s in groups.items():
+                    lines += [f"{prefix}_errors_total{{{label}={_quote(name)},class={_quote(cls)}}} {n}"
+                              for cls, n in s.errors.items()]
+                for attr, help_text in (("request_bytes", "工具调用参数字节数"),
+                                        ("response_bytes", "工具响应字节数"),
+                                        ("tos_requests", "发往 TOS 的 HTTP 请求数")):
+                    lines += [f"# HELP {prefix}_{attr}_total {help_text}",
+                              f"# TYPE {prefix}_{attr}_total counter"]
+                    lines += [f"{prefix}_{attr}_total{{{label}={_quote(name)}}} {getattr(s, attr)}"
+                              for name, s in groups.items()]
+                lines += [f"# HELP {prefix}_latency_seconds 工具调用耗时",
+                          f"# TYPE {prefix}_latency_seconds histogram"]
+                for name, s in groups.items():
+                    cumulative = 0
+                    for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), s.latency_buckets):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{prefix}_latency_seconds_bucket{{{label}={_quote(name)},le=\"{le}\"}} "
+                                     f"{cumulative}")
+                    lines.append(f"{prefix}_latency_seconds_sum{{{label}={_quote(name)}}} {s.latency_sum}")
+                    lines.append(f"{prefix}_latency_seconds_count{{{label}={_quote(name)}}} {s.calls}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+            self._buckets.clear()
+            self.started_at = time.time()
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def _json_bytes(data: Any) -> int:
+    try:
+        return len(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+
+def content_bytes(blocks: Sequence[Any]) -> int:
+    """响应内容块的字节数：文本按 UTF-8 计算，图片与二进制资源按 base64 文本计算"""
+    total = 0
+    for block in blocks:
+        resource = getattr(block, "resource", None)
+        payload = getattr(block, "text", None) or getattr(block, "data", None)
+        if resource is not None:
+            payload = getattr(resource, "text", None) or getattr(resource, "blob", None)
+        if isinstance(payload, str):
+            total += len(payload.encode("utf-8"))
+    return total
+
+
+def record_error(error: BaseException) -> None:
+    """标记当前工具调用失败（处理器捕获异常并转为文本响应时调用）"""
+    record = _current.get()
+    if record is not None:
+        record.error = error_class(error)
+
+
+def record_tos_request(*_args: Any, **_kwargs: Any) -> None:
+    """为当前工具调用计一次 TOS HTTP 请求（也用作 requests 会话的 response 钩子）"""
+    record = _current.get()
+    if record is not None:
+        record.add_tos_request()
+
+
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """获取（必要时创建）全局指标"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(tos_config.metrics_window)
+    return _metrics
+
+
+async def log_metrics_periodically(interval: float) -> None:
+    """每 interval 秒以 JSON 写一条指标日志（不含按桶汇总，避免日志过长）"""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info("tos_mcp_metrics " + json.dumps(get_metrics().snapshot(include_buckets=False),
+                                                    ensure_ascii=False, separators=(",", ":")))
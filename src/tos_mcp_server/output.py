@@ -0,0 +1,68 @@
+"""
+工具响应序列化
+
+支持三种输出格式（全局由 TOS_OUTPUT_FORMAT 设置，调用时可通过 output_format 覆盖）：
+
+- pretty：两格缩进的 JSON，便于人工阅读（默认）
+- compact：不带缩进和多余空格的 JSON
+- columnar：在 compact 的基础上，把列举结果中的条目列表转为按字段存放的并行数组，
+  每个字段名只出现一次
+
+列举和读取类工具的响应还受 TOS_MAX_OUTPUT_BYTES 限制，超出时按条目（或字节）截断，
+并返回可继续读取的游标。
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+from .config import tos_config
+
+OUTPUT_FORMATS = ("pretty", "compact", "columnar")
+
+
+def output_format(args: Dict[str, Any], default: str = None) -> str:
+    """本次调用使用的输出格式：调用参数优先，其次为 default，最后为全局配置"""
+    fmt = args.get("output_format") or default or tos_config.output_format
+    return fmt if fmt in OUTPUT_FORMATS else "pretty"
+
+
+def dumps(data: Any, fmt: str = "pretty") -> str:
+    """按输出格式序列化为 JSON 文本"""
+    if fmt == "pretty":
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def columnar(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """把字段相同的字典列表转为 {字段: [值, ...]} 形式的并行数组"""
+    if not rows:
+        return {}
+    return {name: [row.get(name) for row in rows] for name in rows[0]}
+
+
+def text_bytes(text: str) -> int:
+    """响应文本的 UTF-8 字节数"""
+    return len(text.encode("utf-8"))
+
+
+def fit_to_budget(count: int, render: Callable[[int], str], budget: int = None) -> Tuple[int, str]:
+    """找出渲染结果不超过 budget 字节的最大条目数 n（0 <= n <= count），返回 (n, 文本)
+
+    render(n) 渲染只保留前 n 个条目的响应；budget 为 0 表示不限制。即使 n 为 0 仍超出
+    预算时返回 render(0)。
+    """
+    budget = tos_config.max_output_bytes if budget is None else budget
+    text = render(count)
+    if budget <= 0 or text_bytes(text) <= budget:
+        return count, text
+    lo, hi = 0, count - 1
+    best = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        candidate = render(mid)
+        if text_bytes(candidate) <= budget:
+            best = (mid, candidate)
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return best if best is not None else (0, render(0))
@@ -0,0 +1,94 @@
+"""
+工具注册表
+
+每个工具由一条 ToolSpec 声明（名称、描述、参数 schema、处理函数）。注册表在
+创建时一次性构建 MCP Tool 对象和参数校验器：list_tools 直接返回预先构建好的
+列表，call_tool 按名称 O(1) 查找处理函数，并在访问 TOS 之前完成参数校验。
+
+启用 TOS_METRICS 时，每次分发都通过 metrics.track 记录耗时、字节数与错误类别。
+"""
+
+import logging
+import contextvars
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from jsonschema import Draft202012Validator
+from jsonschema.exceptions import best_match
+from mcp.types import ContentBlock, TextContent, Tool
+
+from .config import tos_config
+from .metrics import content_bytes, get_metrics, record_error
+
+logger = logging.getLogger(__name__)
+
+ToolHandler = Callable[[Dict[str, Any]], Awaitable[List[ContentBlock]]]
+
+# 当前正在执行的工具名，供按工具配置的策略（如对冲、重试）查询
+current_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("tos_mcp_tool", default=None)
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """工具声明"""
+    name: str
+    description: str
+    input_schema: Dict[str, Any]
+    handler: ToolHandler
+
+
+class _RegisteredTool:
+    __slots__ = ("spec", "tool", "validator")
+
+    def __init__(self, spec: ToolSpec):
+        self.spec = spec
+        self.tool = Tool(name=spec.name, description=spec.description, inputSchema=spec.input_schema)
+        self.validator = Draft202012Validator(spec.input_schema)
+
+
+class ToolRegistry:
+    """按名称索引的工具注册表"""
+
+    def __init__(self, specs: Sequence[ToolSpec] = ()):
+        self._tools: Dict[str, _RegisteredTool] = {}
+        self._listing: List[Tool] = []
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: ToolSpec) -> None:
+        """注册一个工具，名称重复时报错"""
+        if spec.name in self._tools:
+            raise ValueError(f"工具重复注册: {spec.name}")
+        registered = _RegisteredTool(spec)
+        self._tools[spec.name] = registered
+        self._listing.append(registered.tool)
+
+    @property
+    def tools(self) -> List[Tool]:
+        """预先构建好的工具列表"""
+        return self._listing
+
+    async def call(self, name: str, arguments: Dict[str, Any]) -> List[ContentBlock]:
+        """校验参数并调用工具处理函数"""
+        registered = self._tools.get(name)
+        if registered is None:
+            return [TextContent(type="text", text=f"未知工具: {name}")]
+        arguments = arguments or {}
+        token = current_tool.set(name)
+        try:
+            if not tos_config.metrics_enabled:
+                return await self._dispatch(registered, arguments)
+            with get_metrics().track(name, arguments) as record:
+                result = await self._dispatch(registered, arguments)
+                record.response_bytes = content_bytes(result)
+                return result
+        finally:
+            current_tool.reset(token)
+
+    async def _dispatch(self, registered: _RegisteredTool, arguments: Dict[str, Any]) -> List[ContentBlock]:
+        error = best_match(registered.validator.iter_errors(arguments))
+        if error is not None:
+            record_error(error)
+            path = ".".join(str(p) for p in error.absolute_path)
+            return [TextContent(type="text", text=f"参数校验失败{f' ({path})' if path else ''}: {error.message}")]
+        return await registered.spec.handler(arguments)
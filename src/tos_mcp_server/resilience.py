@@ -0,0 +1,239 @@
+"""
+幂等读请求的对冲与重试
+
+按工具启用（TOS_HEDGE_TOOLS / TOS_RETRY_TOOLS，均为 "工具名=值" 的逗号分隔列表）：
+
+- 对冲：请求在最近延迟的指定分位数（如 p95）内仍未返回时，再发送一个相同的请求，
+  先成功返回的结果生效，另一个被取消。延迟按操作（get_object、head_object 等）
+  分别统计，样本不足时不对冲。
+- 重试：服务端 5xx / 429 和网络错误按带全抖动的指数退避重试。
+
+对冲和重试都要从全局的重试预算中取令牌：每个原始请求存入 TOS_RETRY_BUDGET_RATIO
+个令牌，另按每秒 TOS_RETRY_BUDGET_MIN_PER_SECOND 个补充保底；令牌不足时直接放弃
+对冲或重试，从而把额外请求限制在原始请求的固定比例内，避免故障时形成重试风暴。
+
+只用于不修改数据的请求（GET / HEAD / 列举 / 图片与视频信息），写请求仍只依赖 SDK
+自身的重试。
+"""
+
+import sys
+import time
+import socket
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from .config import tos_config
+from .registry import current_tool
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 对冲前至少需要的延迟样本数
+MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """最近 window 次成功请求的延迟，分位数按需重新排序计算"""
+
+    def __init__(self, window: int = 512):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._sorted: List[float] = []
+        self._stale = 0
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+        self._stale += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 分位数（0 < q < 1），样本不足 MIN_SAMPLES 时返回 None"""
+        if len(self._samples) < MIN_SAMPLES:
+            return None
+        # 每新增 1/16 窗口的样本才重新排序一次
+        if self._stale > max(1, len(self._samples) // 16) or not self._sorted:
+            self._sorted = sorted(self._samples)
+            self._stale = 0
+        return self._sorted[min(len(self._sorted) - 1, int(len(self._sorted) * q))]
+
+
+class RetryBudget:
+    """令牌桶式重试预算（只在事件循环线程中使用）"""
+
+    def __init__(self, ratio: float, min_per_second: float, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self.exhausted = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self) -> None:
+        """记一次原始请求"""
+        self._refill()
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """为一次对冲或重试取出一个令牌，预算不足时返回 False"""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+def backoff_delay(attempt: int, base: Optional[float] = None, cap: Optional[float] = None) -> float:
+    """第 attempt 次重试（从 1 开始）的等待时间：[0, min(cap, base * 2^(attempt-1))] 内均匀分布"""
+    base = tos_config.retry_base_delay if base is None else base
+    cap = tos_config.retry_max_delay if cap is None else cap
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def _is_transport_error(error: Optional[BaseException]) -> bool:
+    """连接、超时和连接中断等传输层错误；只检查已经加载的 HTTP 库，不额外导入"""
+    if isinstance(error, (ConnectionError, TimeoutError, socket.timeout, asyncio.TimeoutError)):
+        return True
+    requests = sys.modules.get("requests")
+    if requests is not None and isinstance(error, (requests.exceptions.ConnectionError,
+                                                   requests.exceptions.Timeout,
+                                                   requests.exceptions.ChunkedEncodingError)):
+        return True
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(error, (httpx.TimeoutException, httpx.NetworkError,
+                                                    httpx.RemoteProtocolError))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """服务端 5xx / 429、网络错误和超时可以重试，其余（4xx、参数错误等）直接失败
+
+    TosClientError 既用于包装网络错误，也用于桶名非法等本地参数校验，只有 cause
+    为传输层错误时才重试。
+    """
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    if type(error).__name__ == "TosClientError":
+        return _is_transport_error(getattr(error, "cause", None))
+    return _is_transport_error(error)
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+_budget: Optional[RetryBudget] = None
+_stats = {"hedged": 0, "hedge_wins": 0, "retries": 0}
+
+
+def get_retry_budget() -> RetryBudget:
+    """获取（必要时创建）全局重试预算"""
+    global _budget
+    if _budget is None:
+        _budget = RetryBudget(tos_config.retry_budget_ratio, tos_config.retry_budget_min_per_second)
+    return _budget
+
+
+def _tracker(op: str) -> LatencyTracker:
+    tracker = _trackers.get(op)
+    if tracker is None:
+        tracker = _trackers[op] = LatencyTracker()
+    return tracker
+
+
+async def _timed(op: str, attempt: Callable[[], Awaitable[T]]) -> T:
+    start = time.perf_counter()
+    result = await attempt()
+    _tracker(op).record(time.perf_counter() - start)
+    return result
+
+
+async def _hedged(op: str, attempt: Callable[[], Awaitable[T]], percentile: float) -> T:
+    threshold = _tracker(op).quantile(percentile)
+    first = asyncio.ensure_future(_timed(op, attempt))
+    if threshold is None:
+        return await first
+    try:
+        done, _ = await asyncio.wait({first}, timeout=max(threshold, tos_config.hedge_min_delay))
+    except asyncio.CancelledError:
+        # asyncio.wait 被取消时不会取消等待中的任务
+        first.cancel()
+        raise
+    if done or not get_retry_budget().withdraw():
+        return await first
+
+    _stats["hedged"] += 1
+    second = asyncio.ensure_future(_timed(op, attempt))
+    pending = {first, second}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        _stats["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+                # 4xx 等确定性错误无需等待另一个请求
+                if not is_retryable(error):
+                    raise error
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def call_read(op: str, attempt: Callable[[], Awaitable[T]]) -> T:
+    """按当前工具的策略执行幂等读操作：attempt 每次调用都发起一次完整的请求
+
+    op 用于区分延迟统计（如 get_object / head_object / list_objects）。当前工具未配置
+    对冲或重试时直接执行一次。
+    """
+    tool = current_tool.get()
+    percentile = tos_config.hedge_percentiles.get(tool)
+    retries = tos_config.read_retries.get(tool, 0)
+    if percentile is None and retries <= 0:
+        return await attempt()
+
+    budget = get_retry_budget()
+    budget.deposit()
+    tries = 0
+    while True:
+        try:
+            if percentile is not None:
+                return await _hedged(op, attempt, percentile)
+            return await _timed(op, attempt)
+        except Exception as e:
+            if tries >= retries or not is_retryable(e) or not budget.withdraw():
+                raise
+            tries += 1
+            _stats["retries"] += 1
+            delay = backoff_delay(tries)
+            logger.debug(f"{tool} {op} 失败，{delay:.3f}s 后进行第 {tries} 次重试: {str(e)}")
+            await asyncio.sleep(delay)
+
+
+def resilience_stats() -> Dict[str, Any]:
+    """对冲与重试统计，以及各操作当前的对冲阈值参考（p50 / p95，毫秒）"""
+    budget = get_retry_budget()
+
+    def _ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        **_stats,
+        "budget_tokens": round(budget.tokens, 2),
+        "budget_exhausted": budget.exhausted,
+        "latency_ms": {op: {"p50": _ms(t.quantile(0.5)), "p95": _ms(t.quantile(0.95))}
+                       for op, t in sorted(_trackers.items())}
+    }
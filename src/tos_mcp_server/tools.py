@@ -0,0 +1,751 @@
+"""
+TOS MCP Server 工具声明
+
+新增工具只需在 TOOLS 中添加一条 ToolSpec。
+"""
+
+from typing import List
+
+from .handlers import (
+    create_bucket, list_buckets, get_bucket_meta, delete_bucket,
+    put_object, get_object, batch_get, download_object_to_file, list_objects, scan_prefix,
+    delete_object, delete_objects, copy_single_object, copy_prefix,
+    presigned_url, image_process, image_process_batch, image_info,
+    video_snapshot, video_info, cache_stats, server_stats
+)
+from .registry import ToolSpec
+
+# 列举、读取类工具共用的输出格式参数
+_OUTPUT_FORMAT = {
+    "type": "string",
+    "description": "输出格式：pretty 缩进 JSON；compact 紧凑 JSON；columnar 紧凑 JSON 且列表条目按字段存为并行数组。"
+                   "默认由 TOS_OUTPUT_FORMAT 决定",
+    "enum": ["pretty", "compact", "columnar"]
+}
+
+TOOLS: List[ToolSpec] = [
+    # 桶管理工具
+    ToolSpec(
+        name="tos_create_bucket",
+        description="创建 TOS 存储桶",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "acl": {
+                    "type": "string",
+                    "description": "访问控制权限",
+                    "enum": ["private", "public-read", "public-read-write"],
+                    "default": "private"
+                }
+            },
+            "required": ["bucket_name"]
+        },
+        handler=create_bucket
+    ),
+    ToolSpec(
+        name="tos_list_buckets",
+        description="列举 TOS 存储桶",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "output_format": _OUTPUT_FORMAT
+            }
+        },
+        handler=list_buckets
+    ),
+    ToolSpec(
+        name="tos_get_bucket_meta",
+        description="获取存储桶元数据",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                }
+            },
+            "required": ["bucket_name"]
+        },
+        handler=get_bucket_meta
+    ),
+    ToolSpec(
+        name="tos_delete_bucket",
+        description="删除 TOS 存储桶",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                }
+            },
+            "required": ["bucket_name"]
+        },
+        handler=delete_bucket
+    ),
+
+    # 对象管理工具
+    ToolSpec(
+        name="tos_put_object",
+        description="上传对象到 TOS，超过分片阈值时自动使用并发分片上传。分片任务创建后失败时错误信息中会给出 "
+                    "upload_id，可凭其续传；创建分片任务本身失败时尚未上传任何数据，也没有 upload_id，直接重新上传即可",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_key": {
+                    "type": "string",
+                    "description": "对象键名"
+                },
+                "content": {
+                    "type": "string",
+                    "description": "文件内容（base64编码）或文本内容，与 file_path 二选一"
+                },
+                "file_path": {
+                    "type": "string",
+                    "description": "要上传的本地文件路径，与 content 二选一，大文件按分片分块读取"
+                },
+                "content_type": {
+                    "type": "string",
+                    "description": "内容类型",
+                    "default": "application/octet-stream"
+                },
+                "is_base64": {
+                    "type": "boolean",
+                    "description": "内容是否为base64编码",
+                    "default": False
+                },
+                "upload_id": {
+                    "type": "string",
+                    "description": "续传未完成的分片上传任务时传入之前错误信息中给出的 upload_id；"
+                                   "只复用大小和 MD5 都与本地数据一致的已上传分片，其余分片重新上传"
+                }
+            },
+            "required": ["bucket_name", "object_key"]
+        },
+        handler=put_object
+    ),
+    ToolSpec(
+        name="tos_get_object",
+        description="从 TOS 下载对象，支持按字节范围分段读取，大对象会被截断并返回 next_range_start 用于继续读取。"
+                    "文本内容在 JSON 中返回，二进制内容以图片（ImageContent）或内嵌资源（EmbeddedResource）返回",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_key": {
+                    "type": "string",
+                    "description": "对象键名"
+                },
+                "return_as_base64": {
+                    "type": "boolean",
+                    "description": "是否以base64格式在 JSON 中返回内容（不使用图片/内嵌资源内容块）",
+                    "default": False
+                },
+                "range_start": {
+                    "type": "integer",
+                    "description": "读取起始字节位置（包含），分段读取时传入上次返回的 next_range_start",
+                    "default": 0,
+                    "minimum": 0
+                },
+                "range_end": {
+                    "type": "integer",
+                    "description": "读取结束字节位置（包含），不填表示读到对象末尾",
+                    "minimum": 0
+                },
+                "max_bytes": {
+                    "type": "integer",
+                    "description": "单次返回的最大字节数，超出部分通过 next_range_start 继续读取，默认由 TOS_MAX_RESPONSE_BYTES 决定",
+                    "minimum": 1
+                },
+                "output_format": _OUTPUT_FORMAT
+            },
+            "required": ["bucket_name", "object_key"]
+        },
+        handler=get_object
+    ),
+    ToolSpec(
+        name="tos_batch_get",
+        description="批量获取多个对象的元数据（HEAD）或开头部分内容（GET），并发请求并合并为一次响应",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_keys": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "对象键名列表"
+                },
+                "include_content": {
+                    "type": "boolean",
+                    "description": "是否返回对象内容，为 false 时只返回元数据",
+                    "default": False
+                },
+                "max_bytes_per_object": {
+                    "type": "integer",
+                    "description": "每个对象最多读取的字节数",
+                    "default": 65536,
+                    "minimum": 1
+                },
+                "max_total_bytes": {
+                    "type": "integer",
+                    "description": "所有对象内容的总字节上限，超出后其余对象只返回元数据，默认由 TOS_MAX_RESPONSE_BYTES 决定",
+                    "minimum": 0
+                },
+                "return_as_base64": {
+                    "type": "boolean",
+                    "description": "是否以base64格式返回内容",
+                    "default": False
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "并发请求数",
+                    "default": 16,
+                    "minimum": 1
+                },
+                "output_format": _OUTPUT_FORMAT
+            },
+            "required": ["bucket_name", "object_keys"]
+        },
+        handler=batch_get
+    ),
+    ToolSpec(
+        name="tos_download_object",
+        description="将 TOS 对象并发分段下载到本地文件，校验 CRC64，中断后再次调用会从检查点续传",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_key": {
+                    "type": "string",
+                    "description": "对象键名"
+                },
+                "file_path": {
+                    "type": "string",
+                    "description": "保存到本地的文件路径"
+                }
+            },
+            "required": ["bucket_name", "object_key", "file_path"]
+        },
+        handler=download_object_to_file
+    ),
+    ToolSpec(
+        name="tos_list_objects",
+        description="列举 TOS 对象，支持通过 continuation_token 续列，以及自动翻页列举大量对象",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "prefix": {
+                    "type": "string",
+                    "description": "对象键前缀",
+                    "default": ""
+                },
+                "delimiter": {
+                    "type": "string",
+                    "description": "分隔符",
+                    "default": ""
+                },
+                "max_keys": {
+                    "type": "integer",
+                    "description": "最大返回对象数量（自动翻页模式下为每页数量）",
+                    "default": 1000
+                },
+                "continuation_token": {
+                    "type": "string",
+                    "description": "续列标记，传入上次返回的 next_continuation_token 从该位置继续列举"
+                },
+                "start_after": {
+                    "type": "string",
+                    "description": "从该键之后开始列举；响应超出 TOS_MAX_OUTPUT_BYTES 被截断时，传入返回的 next_start_after 继续列举"
+                },
+                "all_pages": {
+                    "type": "boolean",
+                    "description": "是否自动翻页列举，直到列完或达到 limit",
+                    "default": False
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "自动翻页模式下最多返回的对象与公共前缀总数，达到后可凭 next_continuation_token 续列",
+                    "default": 100000
+                },
+                "output_format": _OUTPUT_FORMAT
+            },
+            "required": ["bucket_name"]
+        },
+        handler=list_objects
+    ),
+    ToolSpec(
+        name="tos_scan_prefix",
+        description="并行分片扫描前缀下的全部对象（适用于海量对象的桶），返回有序结果以及对象数量、总大小等汇总统计",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "prefix": {
+                    "type": "string",
+                    "description": "扫描的对象键前缀",
+                    "default": ""
+                },
+                "strategy": {
+                    "type": "string",
+                    "description": "分片策略：delimiter 按分隔符发现的公共前缀分片，公共前缀不足 parallelism 个时自动改用 start_after；start_after 按采样得到的真实键切分键区间",
+                    "enum": ["delimiter", "start_after"],
+                    "default": "delimiter"
+                },
+                "delimiter": {
+                    "type": "string",
+                    "description": "delimiter 策略下发现分片使用的分隔符",
+                    "default": "/"
+                },
+                "parallelism": {
+                    "type": "integer",
+                    "description": "并发扫描的分片数",
+                    "default": 16,
+                    "minimum": 1
+                },
+                "max_objects": {
+                    "type": "integer",
+                    "description": "结果中最多返回的对象条目数（汇总统计始终覆盖全部对象）",
+                    "default": 1000,
+                    "minimum": 0
+                },
+                "output_format": _OUTPUT_FORMAT
+            },
+            "required": ["bucket_name"]
+        },
+        handler=scan_prefix
+    ),
+    ToolSpec(
+        name="tos_delete_object",
+        description="删除 TOS 对象",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_key": {
+                    "type": "string",
+                    "description": "对象键名"
+                }
+            },
+            "required": ["bucket_name", "object_key"]
+        },
+        handler=delete_object
+    ),
+    ToolSpec(
+        name="tos_delete_objects",
+        description="批量删除 TOS 对象：按键列表或前缀匹配，每批最多 1000 个键并发删除，支持只统计不删除的 dry_run 模式",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_keys": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "要删除的对象键列表，与 prefix 二选一"
+                },
+                "prefix": {
+                    "type": "string",
+                    "description": "删除该前缀下的全部对象，与 object_keys 二选一"
+                },
+                "dry_run": {
+                    "type": "boolean",
+                    "description": "仅统计将被删除的对象数量，不实际删除",
+                    "default": False
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "并发提交的删除批次数",
+                    "default": 8,
+                    "minimum": 1
+                }
+            },
+            "required": ["bucket_name"]
+        },
+        handler=delete_objects
+    ),
+    ToolSpec(
+        name="tos_copy_object",
+        description="服务端复制 TOS 对象（可跨桶），大对象自动使用并发分片复制，数据不经过本服务；delete_source 为 true 时复制成功后删除源对象（移动）",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "src_bucket": {
+                    "type": "string",
+                    "description": "源存储桶名称"
+                },
+                "src_key": {
+                    "type": "string",
+                    "description": "源对象键"
+                },
+                "dst_bucket": {
+                    "type": "string",
+                    "description": "目标存储桶名称，默认与源存储桶相同"
+                },
+                "dst_key": {
+                    "type": "string",
+                    "description": "目标对象键"
+                },
+                "delete_source": {
+                    "type": "boolean",
+                    "description": "复制成功后删除源对象",
+                    "default": False
+                }
+            },
+            "required": ["src_bucket", "src_key", "dst_key"]
+        },
+        handler=copy_single_object
+    ),
+    ToolSpec(
+        name="tos_copy_prefix",
+        description="服务端批量复制或移动前缀下的所有 TOS 对象：边列举边并发复制，源前缀替换为目标前缀，支持进度通知",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "src_bucket": {
+                    "type": "string",
+                    "description": "源存储桶名称"
+                },
+                "src_prefix": {
+                    "type": "string",
+                    "description": "源对象前缀",
+                    "default": ""
+                },
+                "dst_bucket": {
+                    "type": "string",
+                    "description": "目标存储桶名称，默认与源存储桶相同"
+                },
+                "dst_prefix": {
+                    "type": "string",
+                    "description": "目标对象前缀",
+                    "default": ""
+                },
+                "delete_source": {
+                    "type": "boolean",
+                    "description": "复制成功后删除源对象（移动）；删除失败的对象单独计入 delete_failed / delete_failures",
+                    "default": False
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "并发复制的对象数",
+                    "default": 16,
+                    "minimum": 1
+                }
+            },
+            "required": ["src_bucket"]
+        },
+        handler=copy_prefix
+    ),
+
+    # 预签名 URL 工具
+    ToolSpec(
+        name="tos_presigned_url",
+        description="生成预签名 URL",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_key": {
+                    "type": "string",
+                    "description": "对象键名"
+                },
+                "method": {
+                    "type": "string",
+                    "description": "HTTP方法",
+                    "enum": ["GET", "PUT", "POST", "DELETE"],
+                    "default": "GET"
+                },
+                "expires": {
+                    "type": "integer",
+                    "description": "过期时间（秒）",
+                    "default": 3600
+                }
+            },
+            "required": ["bucket_name", "object_key"]
+        },
+        handler=presigned_url
+    ),
+
+    ToolSpec(
+        name="tos_image_info",
+        description="获取图片信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_key": {
+                    "type": "string",
+                    "description": "图片对象键名"
+                }
+            },
+            "required": ["bucket_name", "object_key"]
+        },
+        handler=image_info
+    ),
+    # 图片处理工具
+    ToolSpec(
+        name="tos_image_process",
+        description="图片处理（组合操作，支持多种处理参数）",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_key": {
+                    "type": "string",
+                    "description": "图片对象键名"
+                },
+                "process": {
+                    "type": "string",
+                    "description": "图片处理参数。参数格式通常为 'image/操作,参数'，如: 'image/resize,h_100' 或 'image/format,jpg'。常用操作包括：resize(缩放),format(格式转换),quality(质量),crop(裁剪),rotate(旋转)等。"
+                },
+                "save_bucket": {
+                    "type": "string",
+                    "description": "保存的存储桶名称"
+                },
+                "save_key": {
+                    "type": "string",
+                    "description": "保存的对象键名"
+                }
+            },
+            "required": ["bucket_name", "object_key", "process", "save_bucket", "save_key"]
+        },
+        handler=image_process
+    ),
+    ToolSpec(
+        name="tos_image_process_batch",
+        description="批量图片处理：对键名列表或前缀下的所有图片并发执行持久化处理，回写键名由模板生成，返回逐个对象的处理状态",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_keys": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "图片对象键名列表，与 prefix 二选一"
+                },
+                "prefix": {
+                    "type": "string",
+                    "description": "处理该前缀下的所有对象（边列举边处理），与 object_keys 二选一"
+                },
+                "suffixes": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "按前缀处理时只处理这些后缀的对象（不区分大小写），如 ['.jpg', '.png']"
+                },
+                "max_objects": {
+                    "type": "integer",
+                    "description": "最多处理的对象数",
+                    "minimum": 1
+                },
+                "process": {
+                    "type": "string",
+                    "description": "图片处理参数，与 tos_image_process 相同，如: 'image/resize,w_200'"
+                },
+                "save_bucket": {
+                    "type": "string",
+                    "description": "保存的存储桶名称，默认与源存储桶相同"
+                },
+                "save_key_template": {
+                    "type": "string",
+                    "description": "回写对象键名模板。占位符：{key} 源键名；{rel} 去掉 prefix 后的键名；{dir} 所在目录（含末尾 /）；"
+                                   "{name} 不含扩展名的文件名；{ext} 扩展名；{index} 序号。如 'thumbs/{rel}' 或 '{dir}{name}_200.{ext}'"
+                },
+                "wait_for_save": {
+                    "type": "boolean",
+                    "description": "是否轮询确认每个回写对象已可见，为 false 时处理请求返回即视为完成",
+                    "default": True
+                },
+                "include_presigned_urls": {
+                    "type": "boolean",
+                    "description": "是否为每个回写对象返回预签名 URL",
+                    "default": False
+                },
+                "expires": {
+                    "type": "integer",
+                    "description": "预签名 URL 过期时间（秒）",
+                    "default": 3600
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "并发处理的图片数",
+                    "default": 16,
+                    "minimum": 1
+                },
+                "output_format": _OUTPUT_FORMAT
+            },
+            "required": ["bucket_name", "process", "save_key_template"]
+        },
+        handler=image_process_batch
+    ),
+
+    # 视频处理工具
+    ToolSpec(
+        name="tos_video_snapshot",
+        description="视频截帧（支持持久化）。可通过 times / interval / count 一次并发截取多帧（如生成预览图），耗时约等于最慢的单帧",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_key": {
+                    "type": "string",
+                    "description": "视频对象键名"
+                },
+                "time": {
+                    "type": "number",
+                    "description": "截帧时间点（毫秒），如300表示第300毫秒；与 interval 一起使用时为起始时间",
+                    "default": 300
+                },
+                "times": {
+                    "type": "array",
+                    "items": {"type": "number", "minimum": 0},
+                    "description": "多帧截帧：截帧时间点列表（毫秒）"
+                },
+                "interval": {
+                    "type": "number",
+                    "description": "多帧截帧：从 time（默认 0）开始每隔该毫秒数截取一帧，直到视频结束（时长来自 video/info）",
+                    "exclusiveMinimum": 0
+                },
+                "count": {
+                    "type": "integer",
+                    "description": "多帧截帧：在整个视频时长内均匀截取的帧数（时长来自 video/info）",
+                    "minimum": 1
+                },
+                "format": {
+                    "type": "string",
+                    "description": "输出格式",
+                    "enum": ["jpg", "png"],
+                    "default": "jpg"
+                },
+                "save_bucket": {
+                    "type": "string",
+                    "description": "保存截帧图片的存储桶名称"
+                },
+                "save_key": {
+                    "type": "string",
+                    "description": "单帧截帧时保存截帧图片的对象键名"
+                },
+                "save_key_template": {
+                    "type": "string",
+                    "description": "多帧截帧时的回写键名模板。占位符：{time} 时间点（毫秒）；{index} 帧序号；{format} 输出格式；"
+                                   "{key} / {dir} / {name} / {ext} 为视频对象的键名、目录、文件名与扩展名。默认 '{dir}{name}_{time}.{format}'"
+                },
+                "max_frames": {
+                    "type": "integer",
+                    "description": "单次调用最多截取的帧数",
+                    "default": 100,
+                    "minimum": 1
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "并发截帧数",
+                    "default": 16,
+                    "minimum": 1
+                },
+                "output_format": _OUTPUT_FORMAT
+            },
+            "required": ["bucket_name", "object_key", "save_bucket"]
+        },
+        handler=video_snapshot
+    ),
+    ToolSpec(
+        name="tos_video_info",
+        description="获取视频信息",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "bucket_name": {
+                    "type": "string",
+                    "description": "存储桶名称"
+                },
+                "object_key": {
+                    "type": "string",
+                    "description": "视频对象键名"
+                }
+            },
+            "required": ["bucket_name", "object_key"]
+        },
+        handler=video_info
+    ),
+
+    # 缓存与服务指标工具
+    ToolSpec(
+        name="tos_cache_stats",
+        description="获取本服务缓存的命中率、条目数和占用字节数",
+        input_schema={
+            "type": "object",
+            "properties": {}
+        },
+        handler=cache_stats
+    ),
+    ToolSpec(
+        name="tos_server_stats",
+        description="获取本服务的调用指标：按工具和按存储桶统计调用次数、延迟分位数（p50/p95/p99）、"
+                    "请求与响应字节数、发往 TOS 的 HTTP 请求数以及错误类别",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "metrics_format": {
+                    "type": "string",
+                    "description": "json 返回汇总结果；prometheus 返回 Prometheus 文本格式",
+                    "enum": ["json", "prometheus"],
+                    "default": "json"
+                },
+                "include_buckets": {
+                    "type": "boolean",
+                    "description": "是否包含按存储桶的汇总（仅 json）",
+                    "default": True
+                },
+                "reset": {
+                    "type": "boolean",
+                    "description": "读取后清零所有指标",
+                    "default": False
+                },
+                "output_format": _OUTPUT_FORMAT
+            }
+        },
+        handler=server_stats
+    )
+]
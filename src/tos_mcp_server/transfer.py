@@ -0,0 +1,423 @@
+"""
+对象传输引擎
+
+大对象上传在超过阈值后切换为分片上传：分片通过工作线程池并发上传、单个分片失败
+时独立重试，任务中断后可以凭 upload_id 续传，只补传尚未完成的分片。
+
+大对象下载按范围切分后并发拉取，每个分段直接写入预分配本地文件的对应偏移，
+完成后校验 CRC64；下载进度记录在检查点文件中，中断后再次下载只补拉缺失的分段。
+
+对象复制完全在服务端完成：小对象使用 CopyObject，大对象使用并发的 UploadPartCopy，
+数据不经过 MCP 进程。
+"""
+
+import os
+import json
+import hashlib
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from .client import tos
+from .config import tos_config
+from .executor import run_sync
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# TOS 分片上传限制
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+
+class DownloadError(Exception):
+    """下载未完成，再次下载同一文件时会从检查点续传"""
+
+    def __init__(self, checkpoint_path: str, message: str):
+        super().__init__(f"下载未完成，重新下载将从检查点 {checkpoint_path} 续传: {message}")
+        self.checkpoint_path = checkpoint_path
+
+
+class MultipartUploadError(Exception):
+    """分片上传未完成，可通过 upload_id 续传"""
+
+    def __init__(self, upload_id: str, message: str):
+        super().__init__(f"分片上传未完成 (upload_id: {upload_id})，可传入 upload_id 续传: {message}")
+        self.upload_id = upload_id
+
+
+async def with_retries(func: Callable[[], Awaitable[T]], retries: int, base_delay: float = 0.2,
+                       retry_if: Optional[Callable[[Exception], bool]] = None) -> T:
+    """执行异步操作，失败时按带抖动的指数退避重试；retry_if 返回 False 的错误直接抛出"""
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as e:
+            if attempt >= retries or (retry_if is not None and not retry_if(e)):
+                raise
+            delay = base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+            attempt += 1
+            logger.warning(f"操作失败，{delay:.2f}s 后进行第 {attempt} 次重试: {str(e)}")
+            await asyncio.sleep(delay)
+
+
+def _precondition_failed(error: Exception) -> bool:
+    """If-Match 等条件不满足（412），说明对象已变化，重试没有意义"""
+    return getattr(error, "status_code", None) == 412
+
+
+def _choose_part_size(size: int, base: Optional[int] = None) -> int:
+    """选择分片大小，保证分片数不超过 TOS 上限"""
+    part_size = max(base or tos_config.part_size, MIN_PART_SIZE)
+    while size > part_size * MAX_PARTS:
+        part_size *= 2
+    return part_size
+
+
+def _list_uploaded_parts(client, bucket: str, key: str, upload_id: str) -> Dict[int, Any]:
+    """列举 upload_id 下已上传的分片"""
+    parts = {}
+    marker = None
+    while True:
+        resp = client.list_parts(bucket, key, upload_id, part_number_marker=marker)
+        for part in resp.parts:
+            parts[part.part_number] = part
+        if not resp.is_truncated:
+            return parts
+        marker = resp.next_part_number_marker
+
+
+def _local_part_md5(data: Optional[bytes], file_path: Optional[str], offset: int, length: int,
+                    chunk_size: int = 1024 * 1024) -> str:
+    """计算本地数据（内存或文件）指定区间的 MD5"""
+    md5 = hashlib.md5()
+    if data is not None:
+        md5.update(data[offset:offset + length])
+        return md5.hexdigest()
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            md5.update(chunk)
+            remaining -= len(chunk)
+    return md5.hexdigest()
+
+
+def _matching_parts(candidates: Dict[int, str], data: Optional[bytes], file_path: Optional[str],
+                    part_size: int, size: int) -> Dict[int, str]:
+    """筛选 ETag 与本地对应数据 MD5 一致的已上传分片，返回 {分片号: ETag}"""
+    matched = {}
+    for number, etag in candidates.items():
+        offset = (number - 1) * part_size
+        length = min(part_size, size - offset)
+        if (etag or "").strip('"').lower() == _local_part_md5(data, file_path, offset, length):
+            matched[number] = etag
+    return matched
+
+
+async def upload_object(client, bucket: str, key: str,
+                        data: Optional[bytes] = None,
+                        file_path: Optional[str] = None,
+                        content_type: str = "application/octet-stream",
+                        upload_id: Optional[str] = None,
+                        async_client=None) -> Dict[str, Any]:
+    """上传内存数据或本地文件，超过分片阈值（或指定 upload_id 续传）时使用并发分片上传
+
+    指定 async_client 时，内存中的小对象直接通过异步客户端上传。
+    """
+    if (data is None) == (file_path is None):
+        raise ValueError("content 和 file_path 必须且只能指定一个")
+
+    size = len(data) if data is not None else os.path.getsize(file_path)
+
+    if upload_id is None and size < tos_config.multipart_threshold:
+        if data is not None and async_client is not None:
+            resp = await async_client.put_object(bucket, key, content=data, content_type=content_type)
+        elif data is not None:
+            resp = await run_sync(client.put_object, bucket, key,
+                                  content=data,
+                                  content_type=content_type,
+                                  content_length=size)
+        else:
+            resp = await run_sync(client.put_object_from_file, bucket, key, file_path,
+                                  content_type=content_type)
+        return {"etag": resp.etag, "size": size, "mode": "single"}
+
+    part_size = _choose_part_size(size)
+    part_count = max(1, (size + part_size - 1) // part_size)
+
+    done: Dict[int, Any] = {}
+    if upload_id is None:
+        # CreateMultipartUpload 不是幂等操作：响应丢失后重试会留下无人中止的分片任务，只调用一次
+        resp = await run_sync(client.create_multipart_upload, bucket, key, content_type=content_type)
+        upload_id = resp.upload_id
+    else:
+        # 续传：只保留大小与本次切分一致、且 ETag 与本地数据 MD5 相同的已完成分片，
+        # 避免把修改过（大小不变）的本地文件拼接成损坏的对象
+        uploaded = await run_sync(_list_uploaded_parts, client, bucket, key, upload_id)
+        candidates = {}
+        for number, part in uploaded.items():
+            if number > part_count:
+                continue
+            expected = min(part_size, size - (number - 1) * part_size)
+            if getattr(part, "size", None) == expected:
+                candidates[number] = part.etag
+        done = await run_sync(_matching_parts, candidates, data, file_path, part_size, size)
+    resumed = len(done)
+
+    semaphore = asyncio.Semaphore(tos_config.part_concurrency)
+
+    def _upload_part(number: int):
+        offset = (number - 1) * part_size
+        length = min(part_size, size - offset)
+        if data is not None:
+            return client.upload_part(bucket, key, upload_id, number,
+                                      content=data[offset:offset + length],
+                                      content_length=length)
+        return client.upload_part_from_file(bucket, key, upload_id, number,
+                                            file_path=file_path, offset=offset, part_size=length)
+
+    async def _worker(number: int):
+        async with semaphore:
+            resp = await with_retries(lambda: run_sync(_upload_part, number), tos_config.part_retries)
+            done[number] = resp.etag
+
+    pending = [n for n in range(1, part_count + 1) if n not in done]
+    results = await asyncio.gather(*(_worker(n) for n in pending), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        raise MultipartUploadError(upload_id, f"{len(errors)} 个分片上传失败: {str(errors[0])}")
+
+    parts: List[Any] = [tos.models2.UploadedPart(number, done[number]) for number in range(1, part_count + 1)]
+    try:
+        resp = await with_retries(
+            lambda: run_sync(client.complete_multipart_upload, bucket, key, upload_id, parts=parts),
+            tos_config.part_retries
+        )
+    except Exception as e:
+        raise MultipartUploadError(upload_id, f"合并分片失败: {str(e)}") from e
+
+    return {
+        "etag": resp.etag,
+        "size": size,
+        "mode": "multipart",
+        "upload_id": upload_id,
+        "part_size": part_size,
+        "part_count": part_count,
+        "resumed_parts": resumed
+    }
+
+
+def _load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def _prepare_file(path: str, size: int) -> None:
+    """创建（或保留已有的）临时文件并预分配到对象大小"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "ab") as f:
+        f.truncate(size)
+
+
+def _discard_download(temp_path: str, checkpoint_path: str) -> None:
+    """删除下载临时文件与检查点"""
+    for path in (temp_path, checkpoint_path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _download_range(client, bucket: str, key: str, etag: str, path: str,
+                    start: int, length: int, chunk_size: int = 1024 * 1024) -> int:
+    """拉取一个分段并按偏移写入本地文件，返回该分段的 CRC64"""
+    resp = client.get_object(bucket, key, range_start=start, range_end=start + length - 1, if_match=etag)
+    crc = tos.utils.Crc64()
+    written = 0
+    with open(path, "r+b") as f:
+        f.seek(start)
+        while True:
+            chunk = resp.read(chunk_size)
+            if not chunk:
+                break
+            f.write(chunk)
+            crc.update(chunk)
+            written += len(chunk)
+    if written != length:
+        raise IOError(f"分段 {start}-{start + length - 1} 数据长度不符: 期望 {length}，实际 {written}")
+    return crc.crc
+
+
+async def download_object(client, bucket: str, key: str, file_path: str) -> Dict[str, Any]:
+    """并发分段下载对象到本地文件，支持检查点续传和 CRC64 校验"""
+    head = await run_sync(client.head_object, bucket, key)
+    size = head.content_length or 0
+    part_size = _choose_part_size(size)
+    part_count = (size + part_size - 1) // part_size
+
+    temp_path = file_path + ".tosdownload"
+    checkpoint_path = file_path + ".tos-checkpoint"
+
+    checkpoint = await run_sync(_load_checkpoint, checkpoint_path)
+    if not (checkpoint and checkpoint.get("bucket") == bucket and checkpoint.get("key") == key
+            and checkpoint.get("etag") == head.etag and checkpoint.get("size") == size
+            and checkpoint.get("part_size") == part_size and os.path.exists(temp_path)):
+        # 检查点不存在或对象已变化，重新下载
+        checkpoint = {"bucket": bucket, "key": key, "etag": head.etag, "size": size,
+                      "part_size": part_size, "parts": {}}
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    parts: Dict[str, int] = checkpoint["parts"]
+    resumed = len(parts)
+
+    await run_sync(_prepare_file, temp_path, size)
+
+    semaphore = asyncio.Semaphore(tos_config.part_concurrency)
+    checkpoint_lock = asyncio.Lock()
+
+    async def _worker(number: int):
+        start = (number - 1) * part_size
+        length = min(part_size, size - start)
+        async with semaphore:
+            crc = await with_retries(
+                lambda: run_sync(_download_range, client, bucket, key, head.etag, temp_path, start, length),
+                tos_config.part_retries,
+                retry_if=lambda e: not _precondition_failed(e)
+            )
+        async with checkpoint_lock:
+            parts[str(number)] = crc
+            await run_sync(_save_checkpoint, checkpoint_path, checkpoint)
+
+    pending = [n for n in range(1, part_count + 1) if str(n) not in parts]
+    results = await asyncio.gather(*(_worker(n) for n in pending), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if any(isinstance(e, Exception) and _precondition_failed(e) for e in errors):
+        # 对象在下载过程中被修改，已下载的分段属于旧版本，丢弃检查点，下次从头下载
+        await run_sync(_discard_download, temp_path, checkpoint_path)
+        raise IOError("对象在下载过程中已被修改（ETag 不匹配），已丢弃检查点，请重新下载")
+    if errors:
+        raise DownloadError(checkpoint_path, f"{len(errors)} 个分段下载失败: {str(errors[0])}")
+
+    # 合并各分段 CRC64 与服务端记录比对
+    crc_calc = tos.utils.Crc64()
+    crc = 0
+    for number in range(1, part_count + 1):
+        length = min(part_size, size - (number - 1) * part_size)
+        crc = crc_calc.combine(crc, parts[str(number)], length)
+    if head.hash_crc64_ecma is not None and crc != head.hash_crc64_ecma:
+        await run_sync(_discard_download, temp_path, checkpoint_path)
+        raise IOError(f"CRC64 校验失败: 本地 {crc}，服务端 {head.hash_crc64_ecma}")
+
+    await run_sync(os.replace, temp_path, file_path)
+    if os.path.exists(checkpoint_path):
+        await run_sync(os.remove, checkpoint_path)
+
+    return {
+        "file_path": os.path.abspath(file_path),
+        "size": size,
+        "etag": head.etag,
+        "crc64": str(crc),
+        "part_size": part_size,
+        "part_count": part_count,
+        "resumed_parts": resumed
+    }
+
+
+async def copy_object(client, src_bucket: str, src_key: str,
+                      dst_bucket: str, dst_key: str,
+                      size: Optional[int] = None, etag: Optional[str] = None,
+                      src_client=None) -> Dict[str, Any]:
+    """服务端复制对象，超过复制阈值时使用并发 UploadPartCopy
+
+    client 为目标桶所在地域的客户端；源桶位于其他地域时通过 src_client 读取源对象元数据。
+    """
+    src_client = src_client or client
+    head = None
+    if size is None or etag is None:
+        head = await run_sync(src_client.head_object, src_bucket, src_key)
+        size, etag = head.content_length or 0, head.etag
+
+    if size < tos_config.copy_threshold:
+        resp = await with_retries(
+            lambda: run_sync(client.copy_object, dst_bucket, dst_key, src_bucket, src_key,
+                             copy_source_if_match=etag),
+            tos_config.part_retries
+        )
+        return {"etag": resp.etag, "size": size, "mode": "single"}
+
+    part_size = _choose_part_size(size, tos_config.copy_part_size)
+    part_count = (size + part_size - 1) // part_size
+
+    # 分片复制不会继承源对象的元数据，需要在创建任务时显式带上
+    if head is None:
+        head = await run_sync(src_client.head_object, src_bucket, src_key, if_match=etag)
+    # CreateMultipartUpload 不是幂等操作，只调用一次；失败时尚未复制任何分片，直接返回错误
+    resp = await run_sync(client.create_multipart_upload, dst_bucket, dst_key,
+                          content_type=head.content_type, meta=head.meta or None)
+    upload_id = resp.upload_id
+
+    semaphore = asyncio.Semaphore(tos_config.part_concurrency)
+    done: Dict[int, str] = {}
+
+    async def _worker(number: int):
+        start = (number - 1) * part_size
+        end = min(start + part_size, size) - 1
+        async with semaphore:
+            resp = await with_retries(
+                lambda: run_sync(client.upload_part_copy, dst_bucket, dst_key, upload_id, number,
+                                 src_bucket, src_key,
+                                 copy_source_range_start=start,
+                                 copy_source_range_end=end,
+                                 copy_source_if_match=etag),
+                tos_config.part_retries
+            )
+            done[number] = resp.etag
+
+    async def _abort():
+        # 复制可以从源对象完整重做，失败时直接清理未完成的分片任务
+        try:
+            await run_sync(client.abort_multipart_upload, dst_bucket, dst_key, upload_id)
+        except Exception as e:
+            logger.warning(f"取消分片复制失败 (upload_id: {upload_id}): {str(e)}")
+
+    results = await asyncio.gather(*(_worker(n) for n in range(1, part_count + 1)), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        await _abort()
+        raise IOError(f"{len(errors)} 个分片复制失败: {str(errors[0])}")
+
+    parts: List[Any] = [tos.models2.UploadedPart(n, done[n]) for n in range(1, part_count + 1)]
+    try:
+        resp = await with_retries(
+            lambda: run_sync(client.complete_multipart_upload, dst_bucket, dst_key, upload_id, parts=parts),
+            tos_config.part_retries
+        )
+    except Exception as e:
+        await _abort()
+        raise IOError(f"合并复制分片失败: {str(e)}") from e
+
+    return {
+        "etag": resp.etag,
+        "size": size,
+        "mode": "multipart",
+        "part_size": part_size,
+        "part_count": part_count
+    }
@@ -0,0 +1,55 @@
+"""
+测试公共夹具
+
+需要访问 TOS 的测试共用一个进程内的模拟服务（benchmarks/fake_tos.py），每个测试
+使用独立的存储桶；配置通过 tos_settings 临时覆盖，测试结束后自动恢复。
+"""
+
+import dataclasses
+import os
+import uuid
+
+import pytest
+
+from fake_tos import FAKE_REGION, FakeTosServer, fake_endpoint
+from tos_mcp_server import config
+from tos_mcp_server.client import get_client, set_client
+
+
+@pytest.fixture(scope="session")
+def fake_server():
+    """进程内的 TOS 模拟服务，默认客户端指向该服务"""
+    with FakeTosServer() as fake:
+        host, port = fake.address
+        os.environ.update(TOS_ACCESS_KEY="fake-ak", TOS_SECRET_KEY="fake-sk", TOS_REGION=FAKE_REGION,
+                          TOS_ENDPOINT=fake_endpoint(), TOS_PROXY_HOST=host, TOS_PROXY_PORT=str(port),
+                          TOS_MAX_RETRY_COUNT="0")
+        config._config = None
+        set_client(fake.make_client())
+        yield fake
+
+
+@pytest.fixture
+def bucket(fake_server):
+    """本测试独占的存储桶，结束时删除并恢复模拟服务的故障注入设置"""
+    name = "test-" + uuid.uuid4().hex[:12]
+    fake_server.store.create_bucket(name)
+    yield name
+    fake_server.error_rate = 0.0
+    fake_server.bandwidth = 0.0
+    with fake_server.store.lock:
+        fake_server.store.buckets.pop(name, None)
+
+
+@pytest.fixture
+def tos_client(fake_server):
+    return get_client()
+
+
+@pytest.fixture
+def tos_settings(monkeypatch):
+    """临时覆盖配置项，例如 tos_settings(part_retries=0)"""
+    def _apply(**overrides):
+        monkeypatch.setattr(config, "_config", dataclasses.replace(config.get_config(), **overrides))
+    return _apply
+
@@ -0,0 +1,67 @@
+"""
+tos_get_object 分段读取测试：读取范围切断多字节 UTF-8 字符时的处理
+"""
+
+import json
+
+import pytest
+
+from tos_mcp_server.handlers import _decode_utf8, get_object
+
+# 2、3、4 字节的 UTF-8 字符
+CHARS = {2: "é", 3: "中", 4: "😀"}
+
+
+@pytest.mark.parametrize("width", sorted(CHARS))
+def test_char_cut_at_end_of_range(width):
+    encoded = ("ab" + CHARS[width]).encode("utf-8")
+    for kept in range(1, width):
+        content = encoded[:2 + kept]
+        # 后面还有数据：截断的字符留给下一段读取
+        assert _decode_utf8(content, True) == ("ab", 2)
+        # 已经读到对象末尾：内容本身不完整，按二进制处理
+        assert _decode_utf8(content, False) == (None, 0)
+    assert _decode_utf8(encoded, True) == ("ab" + CHARS[width], len(encoded))
+
+
+@pytest.mark.parametrize("width", sorted(CHARS))
+def test_char_cut_at_start_of_range(width):
+    encoded = (CHARS[width] + "cd").encode("utf-8")
+    for skipped in range(1, width):
+        content = encoded[skipped:]
+        # 以续字节开头的内容不是合法的 UTF-8 文本
+        assert _decode_utf8(content, True) == (None, 0)
+        assert _decode_utf8(content, False) == (None, 0)
+
+
+@pytest.mark.parametrize("width", sorted(CHARS))
+def test_range_inside_a_single_char(width):
+    encoded = CHARS[width].encode("utf-8")
+    for kept in range(1, width):
+        # 没有任何完整字符时不能返回空文本，否则游标无法前进
+        assert _decode_utf8(encoded[:kept], True) == (None, 0)
+
+
+def test_invalid_bytes_before_end_are_not_treated_as_cut():
+    assert _decode_utf8(b"ab\xffcd\xe4\xb8", True) == (None, 0)
+
+
+# 每段至少能容纳一个最长（4 字节）的字符
+@pytest.mark.parametrize("max_bytes", [4, 5, 7, 16])
+async def test_paged_reads_reassemble_text(fake_server, bucket, max_bytes):
+    text = "ab" + "".join(CHARS.values()) * 3 + "z"
+    fake_server.store.put(bucket, "text.txt", text.encode("utf-8"), "text/plain")
+    pieces = []
+    start = 0
+    while True:
+        result = await get_object({"bucket_name": bucket, "object_key": "text.txt", "range_start": start,
+                                   "max_bytes": max_bytes, "output_format": "compact"})
+        data = json.loads(result[0].text)
+        assert data["encoding"] == "utf-8"
+        pieces.append(data["content"])
+        if not data["is_truncated"]:
+            break
+        # 游标总是停在完整字符的边界上
+        assert data["next_range_start"] > start
+        start = data["next_range_start"]
+    assert "".join(pieces) == text
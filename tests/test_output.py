@@ -0,0 +1,74 @@
+"""
+输出格式与输出预算（fit_to_budget）测试
+"""
+
+import json
+
+import pytest
+
+from tos_mcp_server.output import OUTPUT_FORMATS, columnar, dumps, fit_to_budget, text_bytes
+
+ROWS = [{"key": f"目录/对象-{i:03d}", "size": i * 10, "etag": f"{i:032x}"} for i in range(40)]
+
+
+def _renderer(fmt: str):
+    def _render(kept: int) -> str:
+        rows = ROWS[:kept]
+        output = {"bucket": "b", "objects": columnar(rows) if fmt == "columnar" else rows,
+                  "is_truncated": kept < len(ROWS)}
+        return dumps(output, fmt)
+    return _render
+
+
+@pytest.mark.parametrize("fmt", OUTPUT_FORMATS)
+def test_result_that_fits_is_returned_unchanged(fmt):
+    render = _renderer(fmt)
+    full = render(len(ROWS))
+    assert fit_to_budget(len(ROWS), render, text_bytes(full)) == (len(ROWS), full)
+    assert fit_to_budget(len(ROWS), render, 0) == (len(ROWS), full)
+
+
+@pytest.mark.parametrize("fmt", OUTPUT_FORMATS)
+def test_keeps_the_largest_prefix_within_budget(fmt):
+    render = _renderer(fmt)
+    for budget in (text_bytes(render(1)), text_bytes(render(17)) + 3, text_bytes(render(len(ROWS))) - 1):
+        kept, text = fit_to_budget(len(ROWS), render, budget)
+        assert text == render(kept)
+        assert text_bytes(text) <= budget
+        assert text_bytes(render(kept + 1)) > budget
+        json.loads(text)
+
+
+@pytest.mark.parametrize("fmt", OUTPUT_FORMATS)
+def test_budget_smaller_than_envelope_returns_empty_result(fmt):
+    render = _renderer(fmt)
+    envelope = text_bytes(render(0))
+    assert fit_to_budget(len(ROWS), render, envelope) == (0, render(0))
+    # 连不含条目的响应都超出预算时仍返回它，而不是空文本
+    assert fit_to_budget(len(ROWS), render, envelope - 1) == (0, render(0))
+    assert fit_to_budget(len(ROWS), render, 1) == (0, render(0))
+
+
+def test_budget_counts_utf8_bytes():
+    render = _renderer("compact")
+    budget = len(render(5))
+    # 键名含中文，字符数对应的预算装不下 5 个条目
+    kept, text = fit_to_budget(len(ROWS), render, budget)
+    assert kept < 5
+    assert text_bytes(text) <= budget
+
+
+def test_default_budget_comes_from_config(tos_settings):
+    render = _renderer("pretty")
+    tos_settings(max_output_bytes=text_bytes(render(3)))
+    assert fit_to_budget(len(ROWS), render)[0] == 3
+    tos_settings(max_output_bytes=0)
+    assert fit_to_budget(len(ROWS), render)[0] == len(ROWS)
+
+
+def test_formats_differ_only_in_layout():
+    pretty, compact, col = (json.loads(_renderer(fmt)(5)) for fmt in ("pretty", "compact", "columnar"))
+    assert pretty == compact
+    assert col["objects"] == {name: [row[name] for row in ROWS[:5]] for name in ROWS[0]}
+    assert text_bytes(_renderer("columnar")(40)) < text_bytes(_renderer("compact")(40)) \
+        < text_bytes(_renderer("pretty")(40))
@@ -0,0 +1,130 @@
+"""
+tos_scan_prefix 分片测试：无论按分隔符还是按采样键区间切分，每个键都必须恰好被一个
+分片（或发现阶段的直接对象）覆盖
+"""
+
+import hashlib
+import json
+
+import pytest
+
+from tos_mcp_server.handlers import (_discover_delimiter_shards, _key_midpoint, _sample_range_shards,
+                                     scan_prefix)
+
+
+def _flat():
+    return [f"data/obj-{i:05d}.bin" for i in range(3000)]
+
+
+def _hex():
+    return [f"data/{hashlib.md5(str(i).encode()).hexdigest()}" for i in range(2500)]
+
+
+def _nested():
+    keys = [f"data/top-{i}.txt" for i in range(5)]
+    for a in range(12):
+        keys.append(f"data/d{a:02d}/index.html")
+        for b in range(6):
+            keys.extend(f"data/d{a:02d}/s{b}/f{c:03d}.jpg" for c in range(25))
+    return keys
+
+
+def _skewed():
+    # 绝大部分键位于同一个日期目录下，其余目录只有少量对象
+    keys = [f"data/2024-06-01/{i:06d}.log" for i in range(2600)]
+    keys += [f"data/2024-06-{d:02d}/{i:06d}.log" for d in range(2, 6) for i in range(3)]
+    keys += ["data/README", "data/z/last"]
+    return keys
+
+
+KEY_SETS = {"flat": _flat, "hex": _hex, "nested": _nested, "skewed": _skewed}
+
+
+@pytest.fixture(params=sorted(KEY_SETS))
+def keys(request, fake_server, bucket):
+    keys = sorted(KEY_SETS[request.param]())
+    for key in keys:
+        fake_server.store.put(bucket, key, key.encode())
+    return keys
+
+
+def test_key_midpoint_between_bounds():
+    alphabet = "0123456789abcdef"
+    mid = _key_midpoint("p/0", "p/f", "p/", alphabet)
+    assert "p/0" < mid < "p/f"
+    # 中点比两端多一位，字典序相邻的键之间仍可细分
+    assert "p/00" < _key_midpoint("p/00", "p/01", "p/", "01") < "p/01"
+    # 以最小字符补齐后相同的键之间无法再细分
+    assert _key_midpoint("p/0", "p/0", "p/", alphabet) is None
+    assert _key_midpoint("p/0", "p/00", "p/", alphabet) is None
+
+
+async def test_sample_range_shards_cover_every_key_once(keys, bucket):
+    ranges, direct = await _sample_range_shards(bucket, "data/", 16, len(keys))
+    direct_keys = [obj.key for obj in direct["objects"]]
+    assert direct["object_count"] == len(direct_keys)
+    assert direct_keys == keys[:len(direct_keys)]
+
+    assert ranges, "键数超过一页时应切分出区间"
+    assert ranges[0][0] == direct_keys[-1]
+    assert ranges[-1][1] is None
+    for (_, upper), (lower, _) in zip(ranges, ranges[1:]):
+        assert upper == lower
+
+    for key in keys[len(direct_keys):]:
+        hits = [r for r in ranges if key > r[0] and (r[1] is None or key <= r[1])]
+        assert len(hits) == 1, key
+
+
+async def test_sample_range_shards_single_page(fake_server, bucket):
+    for i in range(10):
+        fake_server.store.put(bucket, f"data/{i}", b"x")
+    ranges, direct = await _sample_range_shards(bucket, "data/", 16, 100)
+    assert ranges == []
+    assert direct["object_count"] == 10
+
+
+async def test_delimiter_shards_cover_every_key_once(fake_server, bucket):
+    keys = sorted(_nested())
+    for key in keys:
+        fake_server.store.put(bucket, key, b"x")
+    shards, direct = await _discover_delimiter_shards(bucket, "data/", "/", 8, len(keys))
+    assert shards is not None
+    for a in shards:
+        assert not any(b != a and b.startswith(a) for b in shards)
+
+    direct_keys = {obj.key for obj in direct["objects"]}
+    assert direct["object_count"] == len(direct_keys)
+    for key in keys:
+        owners = [s for s in shards if key.startswith(s)]
+        assert len(owners) + (key in direct_keys) == 1, key
+
+
+async def test_delimiter_shards_fall_back_for_flat_prefix(fake_server, bucket):
+    for key in _flat():
+        fake_server.store.put(bucket, key, b"x")
+    shards, direct = await _discover_delimiter_shards(bucket, "data/", "/", 8, 100)
+    assert shards is None
+    # 直接对象统计只保留键名最小的部分对象
+    assert len(direct["objects"]) <= 2 * 100
+
+
+@pytest.mark.parametrize("strategy", ["delimiter", "start_after"])
+async def test_scan_prefix_returns_every_key_once(keys, bucket, strategy):
+    result = await scan_prefix({"bucket_name": bucket, "prefix": "data/", "strategy": strategy,
+                                "parallelism": 4, "max_objects": len(keys), "output_format": "compact"})
+    data = json.loads(result[0].text)
+    assert data["object_count"] == len(keys)
+    assert data["total_size"] == sum(len(key) for key in keys)
+    assert [obj["key"] for obj in data["objects"]] == keys
+    assert not data["objects_truncated"]
+    assert sum(shard["object_count"] for shard in data["shards"]) <= len(keys)
+
+
+async def test_scan_prefix_truncates_to_smallest_keys(keys, bucket):
+    result = await scan_prefix({"bucket_name": bucket, "prefix": "data/", "parallelism": 4,
+                                "max_objects": 50, "output_format": "compact"})
+    data = json.loads(result[0].text)
+    assert data["object_count"] == len(keys)
+    assert [obj["key"] for obj in data["objects"]] == keys[:50]
+    assert data["objects_truncated"]
@@ -0,0 +1,187 @@
+"""
+分片上传、分段下载的续传与故障处理测试
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+from tos_mcp_server.transfer import (MIN_PART_SIZE, DownloadError, MultipartUploadError, download_object,
+                                     upload_object)
+
+PART = MIN_PART_SIZE
+
+
+def _payload(size: int, seed: int = 0) -> bytes:
+    block = bytes((i * 31 + seed) % 251 for i in range(4096))
+    return (block * (size // len(block) + 1))[:size]
+
+
+@pytest.fixture
+def recorded_parts(monkeypatch, tos_client):
+    """按方法记录实际发送的分片号（upload_part_from_file 内部会再调用 upload_part）"""
+    sent = {"upload_part": [], "upload_part_from_file": []}
+    for name in sent:
+        original = getattr(tos_client, name)
+
+        def _record(bucket, key, upload_id, part_number, *args, _name=name, _original=original, **kwargs):
+            sent[_name].append(part_number)
+            return _original(bucket, key, upload_id, part_number, *args, **kwargs)
+
+        monkeypatch.setattr(tos_client, name, _record)
+    return sent
+
+
+@pytest.mark.parametrize("source", ["data", "file"])
+async def test_resume_resends_only_missing_or_changed_parts(fake_server, bucket, tos_client, tos_settings,
+                                                            recorded_parts, tmp_path, source):
+    tos_settings(part_size=PART, multipart_threshold=PART)
+    original = _payload(4 * PART + 1234)
+    upload_id = tos_client.create_multipart_upload(bucket, "obj").upload_id
+    for number in (1, 2, 3):
+        tos_client.upload_part(bucket, "obj", upload_id, number,
+                               content=original[(number - 1) * PART:number * PART])
+
+    # 本地修改第 2 个分片（大小不变），第 4、5 个分片尚未上传
+    edited = bytearray(original)
+    edited[PART + 10] ^= 0xFF
+    edited = bytes(edited)
+    recorded_parts["upload_part"].clear()
+
+    if source == "data":
+        result = await upload_object(tos_client, bucket, "obj", data=edited, upload_id=upload_id)
+    else:
+        path = tmp_path / "obj.bin"
+        path.write_bytes(edited)
+        result = await upload_object(tos_client, bucket, "obj", file_path=str(path), upload_id=upload_id)
+
+    assert result["mode"] == "multipart"
+    assert result["part_count"] == 5
+    assert result["resumed_parts"] == 2
+    method = "upload_part" if source == "data" else "upload_part_from_file"
+    assert sorted(recorded_parts[method]) == [2, 4, 5]
+    assert fake_server.store.buckets[bucket]["obj"].data == edited
+
+
+async def test_resume_ignores_parts_with_different_size(fake_server, bucket, tos_client, tos_settings,
+                                                        recorded_parts):
+    tos_settings(part_size=PART, multipart_threshold=PART)
+    data = _payload(2 * PART + 1)
+    upload_id = tos_client.create_multipart_upload(bucket, "obj").upload_id
+    tos_client.upload_part(bucket, "obj", upload_id, 1, content=data[:PART - 1])
+    recorded_parts["upload_part"].clear()
+
+    result = await upload_object(tos_client, bucket, "obj", data=data, upload_id=upload_id)
+    assert result["resumed_parts"] == 0
+    assert sorted(recorded_parts["upload_part"]) == [1, 2, 3]
+    assert fake_server.store.buckets[bucket]["obj"].data == data
+
+
+async def test_create_multipart_upload_is_not_retried(monkeypatch, bucket, tos_client, tos_settings):
+    tos_settings(part_size=PART, multipart_threshold=PART, part_retries=3)
+    calls = []
+
+    def _fail(*args, **kwargs):
+        calls.append(args)
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(tos_client, "create_multipart_upload", _fail)
+    with pytest.raises(ConnectionError) as excinfo:
+        await upload_object(tos_client, bucket, "obj", data=_payload(PART + 1))
+    # 创建失败时还没有 upload_id，不应包装为可续传的错误
+    assert not isinstance(excinfo.value, MultipartUploadError)
+    assert len(calls) == 1
+
+
+def _download_files(path) -> dict:
+    return {suffix: os.path.exists(str(path) + suffix) for suffix in ("", ".tosdownload", ".tos-checkpoint")}
+
+
+async def test_download_resumes_from_checkpoint(fake_server, bucket, tos_client, tos_settings, tmp_path):
+    tos_settings(part_size=PART, part_retries=0, part_concurrency=2)
+    data = _payload(6 * PART + 99)
+    fake_server.store.put(bucket, "big", data)
+    target = tmp_path / "big.bin"
+
+    # 注入随机 500 错误，直到出现部分分段已完成的中断下载
+    random.seed(5)
+    fake_server.error_rate = 0.5
+    for _ in range(50):
+        try:
+            await download_object(tos_client, bucket, "big", str(target))
+        except DownloadError as e:
+            with open(e.checkpoint_path) as f:
+                done = len(json.load(f)["parts"])
+            if 0 < done < 7:
+                break
+        for suffix in ("", ".tosdownload", ".tos-checkpoint"):
+            if os.path.exists(str(target) + suffix):
+                os.remove(str(target) + suffix)
+    else:
+        pytest.fail("未能构造出部分完成的下载")
+    assert _download_files(target) == {"": False, ".tosdownload": True, ".tos-checkpoint": True}
+
+    fake_server.error_rate = 0.0
+    result = await download_object(tos_client, bucket, "big", str(target))
+    assert result["resumed_parts"] == done
+    assert result["part_count"] == 7
+    assert target.read_bytes() == data
+    assert _download_files(target) == {"": True, ".tosdownload": False, ".tos-checkpoint": False}
+
+
+async def test_download_fails_fast_when_object_changes(monkeypatch, fake_server, bucket, tos_client,
+                                                       tos_settings, tmp_path):
+    tos_settings(part_size=PART, part_retries=3)
+    fake_server.store.put(bucket, "big", _payload(3 * PART))
+    target = tmp_path / "big.bin"
+    head_object = tos_client.head_object
+    ranged_gets = []
+    get_object = tos_client.get_object
+
+    def _head_then_modify(*args, **kwargs):
+        # 读取元数据之后、分段下载之前对象被覆盖，分段请求的 If-Match 将返回 412
+        resp = head_object(*args, **kwargs)
+        fake_server.store.put(bucket, "big", _payload(3 * PART, seed=1))
+        return resp
+
+    def _count_get(*args, **kwargs):
+        ranged_gets.append(kwargs.get("range_start"))
+        return get_object(*args, **kwargs)
+
+    monkeypatch.setattr(tos_client, "head_object", _head_then_modify)
+    monkeypatch.setattr(tos_client, "get_object", _count_get)
+    with pytest.raises(IOError, match="ETag"):
+        await download_object(tos_client, bucket, "big", str(target))
+    # 412 不重试：每个分段只请求一次
+    assert len(ranged_gets) == 3
+    assert _download_files(target) == {"": False, ".tosdownload": False, ".tos-checkpoint": False}
+
+    monkeypatch.setattr(tos_client, "head_object", head_object)
+    await download_object(tos_client, bucket, "big", str(target))
+    assert target.read_bytes() == _payload(3 * PART, seed=1)
+
+
+async def test_download_discards_files_after_crc_mismatch(fake_server, bucket, tos_client, tos_settings,
+                                                          tmp_path):
+    tos_settings(part_size=PART)
+    data = _payload(2 * PART + 7)
+    fake_server.store.put(bucket, "big", data)
+    target = tmp_path / "big.bin"
+    head = tos_client.head_object(bucket, "big")
+
+    # 检查点中记录了错误的分段 CRC（例如临时文件被外部改写）
+    with open(str(target) + ".tosdownload", "wb") as f:
+        f.truncate(len(data))
+    with open(str(target) + ".tos-checkpoint", "w") as f:
+        json.dump({"bucket": bucket, "key": "big", "etag": head.etag, "size": len(data),
+                   "part_size": PART, "parts": {"1": 12345}}, f)
+
+    with pytest.raises(IOError, match="CRC64"):
+        await download_object(tos_client, bucket, "big", str(target))
+    assert _download_files(target) == {"": False, ".tosdownload": False, ".tos-checkpoint": False}
+
+    result = await download_object(tos_client, bucket, "big", str(target))
+    assert result["resumed_parts"] == 0
+    assert target.read_bytes() == data